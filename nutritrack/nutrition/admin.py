@@ -1,6 +1,8 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import FoodCategory, Food, MealPlan, MealEntry, RecipeTemplate, RecipeIngredient
+from . import catalogue
+from .models import FoodCategory, Food, MealPlan, MealEntry, RecipeTemplate, RecipeIngredient, DailyNutritionRollup
+from .models import WeekTemplate, WeekTemplateEntry, FoodPortion, FoodChange
 
 @admin.register(FoodCategory)
 class FoodCategoryAdmin(admin.ModelAdmin):
@@ -8,9 +10,14 @@ class FoodCategoryAdmin(admin.ModelAdmin):
     search_fields = ['name']
     
     def food_count(self, obj):
-        return obj.food_set.count()
+        return catalogue.food_count(obj.pk)
     food_count.short_description = 'Foods'
 
+class FoodPortionInline(admin.TabularInline):
+    model = FoodPortion
+    extra = 0
+    fields = ['unit', 'grams', 'description']
+
 @admin.register(Food)
 class FoodAdmin(admin.ModelAdmin):
     list_display = ['name', 'category', 'calories', 'protein', 'is_custom', 'created_by']
@@ -18,6 +25,7 @@ class FoodAdmin(admin.ModelAdmin):
     search_fields = ['name', 'category__name']
     ordering = ['category', 'name']
     readonly_fields = ['created_at', 'updated_at']
+    inlines = [FoodPortionInline]
     
     fieldsets = (
         ('Basic Information', {
@@ -26,6 +34,13 @@ class FoodAdmin(admin.ModelAdmin):
         ('Nutrition (per 100g)', {
             'fields': ('calories', 'protein', 'carbs', 'fats', 'fiber', 'sodium')
         }),
+        ('Portions', {
+            'fields': ('density', 'grams_per_piece', 'grams_per_serving'),
+            'description': 'Used to convert ml/cups/spoons, pieces and servings to grams, unless the food has a '
+                           'portion below for that unit. Leave empty for the defaults (water density, 100g). '
+                           'Existing entries and the totals using this food are updated by '
+                           '"manage.py propagate_food_changes".'
+        }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
@@ -67,12 +82,40 @@ class RecipeIngredientInline(admin.TabularInline):
 
 @admin.register(RecipeTemplate)
 class RecipeTemplateAdmin(admin.ModelAdmin):
-    list_display = ['name', 'user', 'ingredient_count', 'total_calories', 'created_at']
+    list_display = ['name', 'user', 'ingredient_count', 'calories_total', 'total_grams', 'created_at']
     list_filter = ['user', 'created_at']
     search_fields = ['name', 'description']
+    list_select_related = ['user']
+    readonly_fields = RecipeTemplate.TOTAL_FIELDS + ['ingredient_count', 'total_grams']
     inlines = [RecipeIngredientInline]
 
 @admin.register(RecipeIngredient)
 class RecipeIngredientAdmin(admin.ModelAdmin):
     list_display = ['recipe', 'food', 'quantity', 'unit', 'scaled_calories']
     list_filter = ['recipe', 'food__category']
+
+@admin.register(DailyNutritionRollup)
+class DailyNutritionRollupAdmin(admin.ModelAdmin):
+    list_display = ['user', 'date', 'goal_calories', 'calories_total', 'entry_count', 'updated_at']
+    list_filter = ['date', 'user']
+    ordering = ['-date']
+    readonly_fields = [field.name for field in DailyNutritionRollup._meta.fields]
+
+class WeekTemplateEntryInline(admin.TabularInline):
+    model = WeekTemplateEntry
+    extra = 0
+    fields = ['weekday', 'meal_type', 'food', 'quantity', 'unit']
+
+@admin.register(WeekTemplate)
+class WeekTemplateAdmin(admin.ModelAdmin):
+    list_display = ['name', 'user', 'updated_at']
+    list_filter = ['user']
+    search_fields = ['name']
+    inlines = [WeekTemplateEntryInline]
+
+@admin.register(FoodChange)
+class FoodChangeAdmin(admin.ModelAdmin):
+    list_display = ['food', 'reweigh', 'created_at', 'claimed_at', 'processed_at']
+    list_filter = ['reweigh', 'processed_at']
+    list_select_related = ['food']
+    search_fields = ['food__name']
@@ -0,0 +1,170 @@
+"""Set-based nutrition analytics.
+
+Everything here is computed by the database from the narrow per-day
+DailyNutritionRollup table, so a report costs the same handful of queries
+for a week or for a year.
+"""
+import asyncio
+from datetime import date, datetime, timedelta
+
+from django.db.models import Avg, Count, DateField, F, Max, Min, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Cast, TruncMonth, TruncWeek
+
+from .models import DailyNutritionRollup
+
+DEFAULT_DAYS = 30
+GRANULARITIES = {
+    'day': None,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+MACROS = ['calories', 'protein', 'carbs', 'fats']
+
+# a day "meets the goal" at 80% of the calorie goal; the consistency score is
+# the share of logged days that do
+GOAL_MET = Q(calories_total__gte=F('goal_calories') * 0.8)
+ROLLING_DAYS = 7
+
+
+def parse_params(params, today=None):
+    """Read ?start=&end=&granularity= (YYYY-MM-DD), falling back to the last 30 days by day."""
+    today = today or date.today()
+    end_date = _parse_date(params.get('end')) or today
+    start_date = _parse_date(params.get('start')) or end_date - timedelta(days=DEFAULT_DAYS)
+    if start_date > end_date:
+        start_date, end_date = end_date, start_date
+
+    granularity = params.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        granularity = 'day'
+    return start_date, end_date, granularity
+
+
+def _parse_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+def _aggregates():
+    """sum/avg/min/max of every macro plus goal counters, for aggregate() or annotate()."""
+    expressions = {
+        'days_logged': Count('id'),
+        'goal_hits': Count('id', filter=GOAL_MET),
+    }
+    for macro in MACROS:
+        field = f'{macro}_total'
+        expressions[f'{macro}_sum'] = Sum(field)
+        expressions[f'{macro}_avg'] = Avg(field)
+        expressions[f'{macro}_min'] = Min(field)
+        expressions[f'{macro}_max'] = Max(field)
+    return expressions
+
+
+def _add_rates(row):
+    days = row['days_logged']
+    row['goal_hit_rate'] = row['goal_hits'] / days * 100 if days else 0
+    row['consistency_score'] = row['goal_hit_rate']
+    return row
+
+
+def _rolling_calories():
+    """Average calories of the days logged in the ROLLING_DAYS calendar days up to each row's date.
+
+    A correlated subquery on the (user, date) index rather than a window over
+    rows, so gaps in logging don't stretch the window past a week.
+    """
+    window = DailyNutritionRollup.objects.filter(
+        user=OuterRef('user'),
+        date__gt=Cast(OuterRef('date') - timedelta(days=ROLLING_DAYS), DateField()),
+        date__lte=OuterRef('date'),
+    )
+    return Subquery(window.order_by().values('user').annotate(avg=Avg('calories_total')).values('avg'))
+
+
+def _daily_query(plans):
+    return plans.annotate(rolling_calories=_rolling_calories()).order_by('date').values(
+        'date', 'goal_calories', 'calories_total', 'protein_total', 'carbs_total', 'fats_total',
+        'rolling_calories',
+    )
+
+
+def _daily_row(row):
+    return {
+        'date': row['date'],
+        'calories': row['calories_total'],
+        'protein': round(row['protein_total'], 1),
+        'carbs': round(row['carbs_total'], 1),
+        'fats': round(row['fats_total'], 1),
+        'goal_met': row['calories_total'] >= row['goal_calories'] * 0.8,  # GOAL_MET
+        'progress': min(100, round(row['calories_total'] / row['goal_calories'] * 100)),
+        'rolling_calories': round(row['rolling_calories'] or 0),
+    }
+
+
+def daily_rows(plans):
+    """One row per logged day, with its 7-day rolling calorie average."""
+    return [_daily_row(row) for row in _daily_query(plans)]
+
+
+def _rollup_query(plans, granularity):
+    trunc = GRANULARITIES[granularity]
+    if trunc is None:
+        return None
+    return (
+        plans.annotate(period=trunc('date'))
+        .order_by()
+        .values('period')
+        .annotate(**_aggregates())
+        .order_by('period')
+    )
+
+
+def rollups(plans, granularity):
+    """Weekly or monthly GROUP BY rollups of the plans, oldest period first."""
+    rows = _rollup_query(plans, granularity)
+    return [_add_rates(row) for row in rows] if rows is not None else []
+
+
+def build_report(user, start_date, end_date, granularity='day'):
+    """Daily rows, period rollups and summary stats for a user's date range."""
+    plans = DailyNutritionRollup.objects.filter(user=user, date__range=[start_date, end_date])
+    summary = plans.order_by().aggregate(**_aggregates())
+    return _report(daily_rows(plans), rollups(plans, granularity), summary, start_date, end_date)
+
+
+async def abuild_report(user, start_date, end_date, granularity='day'):
+    """build_report() for async views, with its three queries issued concurrently."""
+    plans = DailyNutritionRollup.objects.filter(user=user, date__range=[start_date, end_date])
+    rollup_rows = _rollup_query(plans, granularity)
+    days, periods, summary = await asyncio.gather(
+        _alist(_daily_query(plans)),
+        _alist(rollup_rows),
+        plans.order_by().aaggregate(**_aggregates()),
+    )
+    return _report([_daily_row(row) for row in days], [_add_rates(row) for row in periods],
+                   summary, start_date, end_date)
+
+
+async def _alist(queryset):
+    return [row async for row in queryset] if queryset is not None else []
+
+
+def _report(days, period_rows, summary, start_date, end_date):
+    summary = _add_rates(summary)
+    summary.update({
+        'avg_calories': round(summary['calories_avg'] or 0),
+        'avg_protein': round(summary['protein_avg'] or 0, 1),
+        'goal_success_rate': summary['goal_hit_rate'],
+        'best_day': max(days, key=lambda d: d['calories']) if days else None,
+    })
+
+    return {
+        'analytics_data': days,
+        'rollups': period_rows,
+        'summary_stats': summary,
+        'total_days': (end_date - start_date).days + 1,
+    }
@@ -0,0 +1,315 @@
+"""JSON API, version 1 (mounted at /api/v1/).
+
+Compact payloads for the mobile front end: meal plans with their stored
+totals and entries, foods, and recipes with their stored totals. The one
+write is batch logging (log_entries), which adds a whole meal in a single
+POST.
+
+Every endpoint answers conditional GETs. The ETag and Last-Modified come
+from one cheap "stamp" lookup per request (a plan's updated_at, the
+catalogue version, ...), so an unchanged resource costs that lookup and a
+304 - no MealEntry rows, foods or templates are read. MealPlan.updated_at
+moves on every totals change (see MealPlan.add_to_totals and
+refresh_totals), which covers adding, editing and deleting entries; the
+catalogue version is mixed into ETags of payloads that show food names.
+Those payloads send no Last-Modified: renaming a food doesn't touch the
+plan or recipe, so an If-Modified-Since check would keep answering 304.
+"""
+import hashlib
+import json
+from datetime import date, datetime, timedelta
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
+
+from .autocomplete import food_index, MAX_LIMIT
+from . import copying
+from .cache import catalogue_version
+from .forms import BatchMealEntryFormSet
+from .models import DailyNutritionRollup, Food, FoodPortion, MealPlan, RecipeTemplate
+from .pagination import CATALOGUE_ORDER, paginate
+
+# longest date range one plans request may cover
+MAX_RANGE_DAYS = 366
+
+
+def api_login_required(view):
+    """login_required for JSON clients: a 401 instead of a redirect to the login page."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'Authentication required'}, status=401)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def conditional(stamp):
+    """condition() fed from one `stamp(request, *args, **kwargs)` call returning (etag source, last modified).
+
+    Either may be None, e.g. for a resource that doesn't exist yet.
+    """
+    def cached_stamp(request, *args, **kwargs):
+        if not hasattr(request, '_api_stamp'):
+            request._api_stamp = stamp(request, *args, **kwargs)
+        return request._api_stamp
+
+    def etag(request, *args, **kwargs):
+        source = cached_stamp(request, *args, **kwargs)[0]
+        return hashlib.md5(str(source).encode()).hexdigest() if source is not None else None
+
+    def last_modified(request, *args, **kwargs):
+        return cached_stamp(request, *args, **kwargs)[1]
+
+    def decorator(view):
+        return api_login_required(
+            cache_control(private=True, no_cache=True)(condition(etag_func=etag, last_modified_func=last_modified)(view))
+        )
+    return decorator
+
+
+def _error(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None
+
+
+def _totals(obj):
+    """The stored totals of a plan, rollup or recipe."""
+    return {
+        'calories': obj.total_calories(),
+        'protein': obj.total_protein(),
+        'carbs': obj.total_carbs(),
+        'fats': obj.total_fats(),
+        'fiber': obj.total_fiber(),
+        'sodium': obj.total_sodium(),
+    }
+
+
+def _food(food):
+    return {
+        'id': food.pk,
+        'name': food.name,
+        'category': food.category_id,
+        'calories': food.calories,
+        'protein': food.protein,
+        'carbs': food.carbs,
+        'fats': food.fats,
+        'fiber': food.fiber,
+        'sodium': food.sodium,
+        'is_custom': food.is_custom,
+    }
+
+
+# -- meal plans ---------------------------------------------------------------
+
+def _plans_range(request):
+    end = _parse_date(request.GET.get('end')) or date.today()
+    start = _parse_date(request.GET.get('start')) or end - timedelta(days=6)
+    if start > end or (end - start).days >= MAX_RANGE_DAYS:
+        return None
+    return start, end
+
+
+def _plans_stamp(request):
+    dates = _plans_range(request)
+    if dates is None:
+        return None, None
+    stamp = DailyNutritionRollup.objects.filter(user=request.user, date__range=dates).aggregate(
+        days=Count('pk'), updated=Max('updated_at'))
+    return (dates, stamp['days'], stamp['updated']), stamp['updated']
+
+
+@conditional(_plans_stamp)
+def plans(request):
+    """Daily totals for ?start=&end= (defaults to the last 7 days), read from the rollups."""
+    dates = _plans_range(request)
+    if dates is None:
+        return _error(f'start must be on or before end, at most {MAX_RANGE_DAYS} days apart')
+    days = DailyNutritionRollup.objects.filter(user=request.user, date__range=dates).order_by('date')
+    return JsonResponse({
+        'start': dates[0],
+        'end': dates[1],
+        'plans': [{
+            'id': day.meal_plan_id,
+            'date': day.date,
+            'goal_calories': day.goal_calories,
+            'entry_count': day.entry_count,
+            'totals': _totals(day),
+        } for day in days],
+    })
+
+
+def _plan_stamp(request, date_str):
+    day = _parse_date(date_str)
+    stamp = day and MealPlan.objects.filter(user=request.user, date=day).values_list('pk', 'updated_at').first()
+    if stamp is None:
+        return None, None
+    # entries show food names, so no Last-Modified (see the module docstring)
+    return (stamp, catalogue_version()), None
+
+
+@conditional(_plan_stamp)
+def plan_detail(request, date_str):
+    """One day: goal, stored totals and entries. Days without a plan are empty (and not created)."""
+    day = _parse_date(date_str)
+    if day is None:
+        return _error('Dates are YYYY-MM-DD')
+    plan = MealPlan.objects.filter(user=request.user, date=day).first()
+    if plan is None:
+        return JsonResponse({'id': None, 'date': day, 'goal_calories': None, 'notes': '',
+                             'entry_count': 0, 'totals': _totals(MealPlan()), 'entries': []})
+    entries = plan.mealentry_set.select_related('food')
+    return JsonResponse({
+        'id': plan.pk,
+        'date': plan.date,
+        'goal_calories': plan.goal_calories,
+        'notes': plan.notes,
+        'entry_count': plan.entry_count,
+        'totals': _totals(plan),
+        'updated_at': plan.updated_at,
+        'entries': [{
+            'id': entry.pk,
+            'meal_type': entry.meal_type,
+            'food': entry.food_id,
+            'food_name': entry.food.name,
+            'quantity': entry.quantity,
+            'unit': entry.unit,
+            'grams': entry.grams,
+            'calories': entry.scaled_calories(),
+        } for entry in entries],
+    })
+
+
+@api_login_required
+@require_POST
+def log_entries(request, date_str):
+    """Log {"items": [{"food", "quantity", "unit", "meal_type"}, ...]} to one day in one transaction.
+
+    Every item is validated first (one Food lookup for all of them); a bad
+    item rejects the batch with a 400 listing the errors per item.
+    """
+    day = _parse_date(date_str)
+    if day is None:
+        return _error('Dates are YYYY-MM-DD')
+    try:
+        items = json.loads(request.body).get('items')
+    except (ValueError, AttributeError):
+        items = None
+    if not isinstance(items, list):
+        return _error('Send a JSON object with a list of "items"')
+
+    formset = BatchMealEntryFormSet.from_items(items)
+    if not formset.is_valid():
+        return JsonResponse({
+            'error': 'Invalid items',
+            'items': [form.errors.get_json_data() for form in formset.forms],
+            'batch': formset.non_form_errors().get_json_data(),
+        }, status=400)
+    created = copying.log_entries(request.user, day, formset.rows())
+    plan = MealPlan.objects.get(user=request.user, date=day)
+    return JsonResponse({
+        'id': plan.pk,
+        'date': plan.date,
+        'created': created,
+        'entry_count': plan.entry_count,
+        'totals': _totals(plan),
+        'updated_at': plan.updated_at,
+    }, status=201)
+
+
+# -- foods --------------------------------------------------------------------
+
+def _catalogue_stamp(request, *args, **kwargs):
+    # any Food, FoodCategory or FoodPortion write bumps the version; no query
+    return (catalogue_version(), request.GET.urlencode(), args, kwargs), None
+
+
+@conditional(_catalogue_stamp)
+def foods(request):
+    """?q= prefix matches from the autocomplete index, otherwise the catalogue a cursor page at a time."""
+    query = request.GET.get('q', '')
+    if query:
+        return JsonResponse({'results': food_index.search(query, limit=MAX_LIMIT), 'next': None})
+    page = paginate(Food.objects.all(), CATALOGUE_ORDER, request.GET.get('cursor'))
+    if page.invalid:
+        return _error('Invalid cursor')
+    return JsonResponse({'results': [_food(food) for food in page], 'next': page.next_cursor})
+
+
+@conditional(_catalogue_stamp)
+def food_detail(request, food_id):
+    food = get_object_or_404(Food, pk=food_id)
+    payload = _food(food)
+    payload.update(
+        density=food.density,
+        grams_per_piece=food.grams_per_piece,
+        grams_per_serving=food.grams_per_serving,
+        portions=FoodPortion.weights_for([food.pk]).get(food.pk, {}),
+    )
+    return JsonResponse(payload)
+
+
+# -- recipes ------------------------------------------------------------------
+
+def _recipes_stamp(request):
+    stamp = RecipeTemplate.objects.filter(user=request.user).aggregate(
+        recipes=Count('pk'), updated=Max('updated_at'))
+    return (stamp['recipes'], stamp['updated'], request.GET.get('cursor')), stamp['updated']
+
+
+@conditional(_recipes_stamp)
+def recipes(request):
+    """The user's recipes with their stored totals, newest first, a cursor page at a time."""
+    page = paginate(RecipeTemplate.objects.filter(user=request.user), ['-created_at', '-pk'],
+                    request.GET.get('cursor'))
+    if page.invalid:
+        return _error('Invalid cursor')
+    return JsonResponse({
+        'results': [{
+            'id': recipe.pk,
+            'name': recipe.name,
+            'ingredient_count': recipe.ingredient_count,
+            'total_grams': recipe.total_grams,
+            'totals': _totals(recipe),
+        } for recipe in page],
+        'next': page.next_cursor,
+    })
+
+
+def _recipe_stamp(request, recipe_id):
+    updated = RecipeTemplate.objects.filter(pk=recipe_id, user=request.user).values_list('updated_at', flat=True).first()
+    if updated is None:
+        return None, None
+    return (recipe_id, updated, catalogue_version()), None
+
+
+@conditional(_recipe_stamp)
+def recipe_detail(request, recipe_id):
+    recipe = get_object_or_404(RecipeTemplate, pk=recipe_id, user=request.user)
+    ingredients = recipe.recipeingredient_set.select_related('food')
+    return JsonResponse({
+        'id': recipe.pk,
+        'name': recipe.name,
+        'description': recipe.description,
+        'ingredient_count': recipe.ingredient_count,
+        'total_grams': recipe.total_grams,
+        'totals': _totals(recipe),
+        'updated_at': recipe.updated_at,
+        'ingredients': [{
+            'food': ingredient.food_id,
+            'food_name': ingredient.food.name,
+            'quantity': ingredient.quantity,
+            'unit': ingredient.unit,
+            'grams': ingredient.grams,
+            'calories': ingredient.scaled_calories(),
+        } for ingredient in ingredients],
+    })
@@ -5,17 +5,5 @@ class NutritionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'nutrition'
 
-def ready(self):
-        from django.db.models.signals import post_save
-        from django.contrib.auth.models import User
-        from .models import UserProfile
-        from django.dispatch import receiver
-
-        @receiver(post_save, sender=User)
-        def create_user_profile(sender, instance, created, **kwargs):
-            if created:
-                UserProfile.objects.create(user=instance)
-
-        @receiver(post_save, sender=User)
-        def save_user_profile(sender, instance, **kwargs):
-            instance.userprofile.save()
\ No newline at end of file
+    def ready(self):
+        from . import signals  # noqa: F401 - registers the receivers
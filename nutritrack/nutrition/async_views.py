@@ -0,0 +1,95 @@
+"""Async versions of the dashboard, weekly and analytics pages, for ASGI servers.
+
+nutrition/urls.py routes to these instead of the views in views.py when
+NUTRITION_ASYNC_VIEWS is on, which asgi.py does by default. They read
+through Django's async ORM and the cache's async API, and start the reads
+that don't depend on each other together with asyncio.gather: the
+dashboard's plan, entries and recent days plus the catalogue snapshot, and
+the analytics report's daily rows, period rollups and summary.
+
+Django still runs every async query through sync_to_async on the
+request's own database thread, so within one request the queries reach the
+database one after another; the gain is that a request waiting on the
+database doesn't hold a worker thread, so a single ASGI process serves
+many slow requests at once. See the `benchmark_servers` command for the
+WSGI/ASGI comparison.
+
+Templates are rendered in that thread too (render may touch the database,
+e.g. request.user's profile in base.html).
+"""
+import asyncio
+from datetime import date, timedelta
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import render
+
+from . import analytics
+from . import cache as nutrition_cache
+from . import catalogue
+from .models import DailyNutritionRollup, MealEntry, MealPlan, group_by_meal
+from .views import MEAL_SECTIONS, analytics_context, week_context, week_start_for
+
+
+async def _alist(queryset):
+    return [obj async for obj in queryset]
+
+
+async def _render(request, template_name, context):
+    return await sync_to_async(render)(request, template_name, context)
+
+
+async def _auth_user(request):
+    user = await request.auser()
+    # the same object for the templates, instead of a second lookup through the lazy request.user
+    request.user = user
+    return user
+
+
+@login_required
+async def dashboard(request):
+    user = await _auth_user(request)
+    today = date.today()
+
+    async def build_user_data():
+        (meal_plan, created), entries, recent_plans = await asyncio.gather(
+            MealPlan.objects.aget_or_create(user=user, date=today, defaults={'goal_calories': 2000}),
+            _alist(MealEntry.objects.filter(meal_plan__user=user, meal_plan__date=today).select_related('food')),
+            _alist(DailyNutritionRollup.objects.filter(user=user).exclude(date=today).order_by('-date')[:7]),
+        )
+        return {
+            'meal_plan': meal_plan,
+            'meals': group_by_meal(entries, MEAL_SECTIONS),
+            'recent_plans': recent_plans,
+        }
+
+    # cached like the sync dashboard (see views.dashboard and cache.py)
+    version = await nutrition_cache.acatalogue_version()
+    context, snapshot = await asyncio.gather(
+        nutrition_cache.auser_cached('dashboard', user.pk, f'summary:{today}:{version}', build_user_data),
+        catalogue.asnapshot(),
+    )
+    context = dict(context, total_foods=snapshot['total_foods'], food_categories=snapshot['categories'])
+    return await _render(request, 'nutrition/dashboard.html', context)
+
+
+@login_required
+async def weekly_view(request):
+    user = await _auth_user(request)
+    today = date.today()
+    week_start = week_start_for(request, today)
+    rollups = await _alist(DailyNutritionRollup.objects.filter(
+        user=user, date__range=[week_start, week_start + timedelta(days=6)],
+    ))
+    context = week_context(user, week_start, today, rollups)
+    return await _render(request, 'nutrition/weekly_view.html', context)
+
+
+@login_required
+async def nutrition_analytics(request):
+    """Nutrition analytics for ?start=&end=&granularity= (defaults to the last 30 days)"""
+    user = await _auth_user(request)
+    start_date, end_date, granularity = analytics.parse_params(request.GET)
+    report = await analytics.abuild_report(user, start_date, end_date, granularity)
+    context = analytics_context(report, start_date, end_date, granularity)
+    return await _render(request, 'nutrition/analytics.html', context)
@@ -0,0 +1,144 @@
+"""In-process prefix index for the food autocomplete endpoint.
+
+Every word of every food name is kept in one sorted list, so the foods
+matching a prefix are a contiguous slice found with a binary search.
+Only the first few hundred entries of that slice are ever looked at, which
+keeps a lookup well under a millisecond however big the catalogue is.
+
+The index is built lazily on the first lookup and rebuilt when the catalogue
+version changes (bumped by the Food signals, see cache.py), with
+AUTOCOMPLETE_TTL seconds as a backstop for per-process cache backends.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+from .cache import catalogue_version
+from .models import Food, FoodPortion
+
+WORD_RE = re.compile(r'\w+')
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 20
+# how many word entries a single lookup may scan before giving up on more matches
+MAX_SCAN = 500
+
+
+def _words(text):
+    return WORD_RE.findall(text.lower())
+
+
+class FoodPrefixIndex:
+    """Sorted (word, name, food id) entries plus one compact record per food."""
+
+    def __init__(self, max_foods=None, ttl=None):
+        self.max_foods = max_foods or getattr(settings, 'AUTOCOMPLETE_MAX_FOODS', 200_000)
+        self.ttl = ttl if ttl is not None else getattr(settings, 'AUTOCOMPLETE_TTL', 300)
+        self._lock = threading.Lock()
+        self._stale = True
+        self._built_at = 0
+        self._version = None
+        # (keys, food_ids, records) swapped in as one tuple so readers never see a half-built index
+        self._data = ([], [], {})
+
+    def mark_stale(self):
+        self._stale = True
+
+    def needs_rebuild(self):
+        return (
+            self._stale
+            or self._version != catalogue_version()
+            or time.monotonic() - self._built_at > self.ttl
+        )
+
+    def rebuild(self):
+        version = catalogue_version()
+        rows = (
+            Food.objects.order_by('name', 'pk')
+            .values_list('id', 'name', 'calories', 'protein', 'carbs', 'fats',
+                         'density', 'grams_per_piece', 'grams_per_serving')[:self.max_foods]
+        )
+        portions = {}
+        for food_id, unit, grams in FoodPortion.objects.values_list('food_id', 'unit', 'grams').iterator(chunk_size=5000):
+            portions.setdefault(food_id, {})[unit] = grams
+        records = {}
+        entries = []
+        for food_id, name, *nutrition in rows.iterator(chunk_size=5000):
+            records[food_id] = (name, *nutrition, portions.get(food_id))
+            lowered = name.lower()
+            # for equal words, names starting with it ("Chicken Breast") sort ahead of "Butter Chicken"
+            for position, word in enumerate(dict.fromkeys(_words(name))):
+                entries.append((word, min(position, 1), lowered, food_id))
+        entries.sort()
+
+        self._data = ([entry[0] for entry in entries], [entry[3] for entry in entries], records)
+        self._built_at = time.monotonic()
+        self._version = version
+
+    def _current(self):
+        if self.needs_rebuild():
+            with self._lock:
+                if self.needs_rebuild():
+                    # clear the flag first so edits made during the rebuild mark it stale again
+                    self._stale = False
+                    self.rebuild()
+        return self._data
+
+    def get(self, food_id):
+        """Autocomplete result dict for one food id, or None if it isn't indexed."""
+        records = self._current()[2]
+        record = records.get(food_id)
+        return self._result(food_id, record) if record else None
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Top `limit` foods with a word starting with the first query word and containing the rest."""
+        terms = _words(query)
+        if not terms:
+            return []
+        keys, food_ids, records = self._current()
+        first, rest = terms[0], terms[1:]
+
+        results = []
+        seen = set()
+        start = bisect_left(keys, first)
+        for i in range(start, min(start + MAX_SCAN, len(keys))):
+            if not keys[i].startswith(first):
+                break
+            food_id = food_ids[i]
+            if food_id in seen:
+                continue
+            seen.add(food_id)
+            record = records[food_id]
+            if rest and not self._matches_rest(record[0], rest):
+                continue
+            results.append(self._result(food_id, record))
+            if len(results) >= limit:
+                break
+        return results
+
+    @staticmethod
+    def _matches_rest(name, terms):
+        words = _words(name)
+        return all(any(word.startswith(term) for word in words) for term in terms)
+
+    @staticmethod
+    def _result(food_id, record):
+        name, calories, protein, carbs, fats, density, grams_per_piece, grams_per_serving, portions = record
+        return {
+            'id': food_id,
+            'name': name,
+            'calories': calories,
+            'protein': protein or 0,
+            'carbs': carbs or 0,
+            'fats': fats or 0,
+            # portion weights for the unit conversion in the previews (None = default)
+            'density': density,
+            'grams_per_piece': grams_per_piece,
+            'grams_per_serving': grams_per_serving,
+            'portions': portions or {},
+        }
+
+
+food_index = FoodPrefixIndex()
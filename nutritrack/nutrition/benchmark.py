@@ -0,0 +1,208 @@
+"""Latency and query-count benchmarks for the hot views.
+
+Used by the `benchmark` management command (JSON reports, baseline
+comparison) and by the query-budget tests in tests.py. Requests go through
+the Django test client, so the numbers include middleware, the view and
+template rendering but not the web server.
+
+load_test() and running_server() are for the `benchmark_servers` command:
+they start the project under a real server (threaded runserver for WSGI,
+uvicorn for ASGI, which then serves the async views) and measure p50/p99
+latency over HTTP with many requests in flight at once.
+"""
+import importlib.util
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from .models import RecipeTemplate
+
+# maximum queries per request on the default seeded dataset; going over is a regression
+QUERY_BUDGETS = {
+    'dashboard': 17,  # first visit of the day creates the plan and its rollup
+    'weekly_view': 5,
+    'nutrition_analytics': 6,
+    'food_search': 6,
+    'my_recipes': 5,
+    'recipe_detail': 6,
+}
+# a view is flagged when its median latency grows by more than this fraction
+LATENCY_TOLERANCE = 0.25
+# views with an async version (see async_views.py)
+ASYNC_VIEWS = ['dashboard', 'weekly_view', 'nutrition_analytics']
+# how each server is started: python arguments and the environment it gets
+SERVERS = {
+    'wsgi': (['-m', 'django', 'runserver', '{host}:{port}', '--noreload', '--skip-checks'],
+             {'NUTRITION_ASYNC_VIEWS': '0'}),
+    'asgi': (['-m', 'uvicorn', 'nutritrack.asgi:application', '--host', '{host}', '--port', '{port}',
+              '--log-level', 'warning'],
+             {'NUTRITION_ASYNC_VIEWS': '1'}),
+}
+
+
+def hot_view_urls(user):
+    """(view name, url) for every benchmarked view, using the user's own data."""
+    urls = [
+        ('dashboard', reverse('nutrition:dashboard')),
+        ('weekly_view', reverse('nutrition:weekly_view')),
+        ('nutrition_analytics', reverse('nutrition:nutrition_analytics') + '?granularity=week'),
+        ('food_search', reverse('nutrition:food_search') + '?q=chicken'),
+        ('my_recipes', reverse('nutrition:my_recipes')),
+    ]
+    recipe = RecipeTemplate.objects.filter(user=user).order_by('pk').first()
+    if recipe:
+        urls.append(('recipe_detail', reverse('nutrition:recipe_detail', args=[recipe.pk])))
+    return urls
+
+
+def seed_dataset(users=4, days=30, seed=42):
+    """Load the load_data demo users and meal patterns (plus generated users) quietly."""
+    call_command('load_data', users=users, days=days, seed=seed, stdout=StringIO())
+
+
+def run_benchmarks(user, iterations=10, warmup=1):
+    """Time every hot view for `user`; returns {view: stats} with latency in milliseconds."""
+    client = Client()
+    client.force_login(user)
+    results = {}
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        for name, url in hot_view_urls(user):
+            for _ in range(warmup):
+                client.get(url)
+            timings = []
+            for _ in range(iterations):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    timings.append((time.perf_counter() - started) * 1000)
+            results[name] = {
+                'url': url,
+                'status': response.status_code,
+                'queries': len(queries),
+                'query_budget': QUERY_BUDGETS.get(name),
+                'median_ms': round(statistics.median(timings), 2),
+                'p95_ms': round(_percentile(timings, 95), 2),
+                'min_ms': round(min(timings), 2),
+                'max_ms': round(max(timings), 2),
+            }
+    return results
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def find_regressions(results, baseline=None, tolerance=LATENCY_TOLERANCE):
+    """Human readable problems: errors, blown query budgets and slowdowns against a baseline report."""
+    problems = []
+    previous = (baseline or {}).get('views', {})
+    for name, stats in results.items():
+        if stats['status'] != 200:
+            problems.append(f"{name}: HTTP {stats['status']}")
+        if stats['query_budget'] is not None and stats['queries'] > stats['query_budget']:
+            problems.append(f"{name}: {stats['queries']} queries, budget is {stats['query_budget']}")
+        before = previous.get(name)
+        if not before:
+            continue
+        if stats['queries'] > before['queries']:
+            problems.append(f"{name}: {before['queries']} -> {stats['queries']} queries")
+        if stats['median_ms'] > before['median_ms'] * (1 + tolerance):
+            problems.append(f"{name}: median {before['median_ms']}ms -> {stats['median_ms']}ms")
+    return problems
+
+
+def asgi_server_available():
+    return importlib.util.find_spec('uvicorn') is not None
+
+
+def session_cookies(user):
+    """Cookies of a fresh logged-in session for `user`, to send to a running server."""
+    client = Client()
+    client.force_login(user)
+    return {name: morsel.value for name, morsel in client.cookies.items()}
+
+
+@contextmanager
+def running_server(kind, port, host='127.0.0.1', startup_timeout=30):
+    """Run the project under the `kind` server ('wsgi' or 'asgi') in a subprocess; yields its base url."""
+    args, env = SERVERS[kind]
+    args = [arg.format(host=host, port=port) for arg in args]
+    base_url = f'http://{host}:{port}'
+    with tempfile.TemporaryFile() as log:
+        process = subprocess.Popen(
+            [sys.executable, *args], cwd=settings.BASE_DIR, env={**os.environ, **env},
+            stdout=subprocess.DEVNULL, stderr=log,
+        )
+        try:
+            deadline = time.monotonic() + startup_timeout
+            while True:
+                try:
+                    urllib.request.urlopen(base_url + reverse('nutrition:login'), timeout=5).close()
+                    break
+                except (urllib.error.URLError, OSError):
+                    if process.poll() is not None or time.monotonic() > deadline:
+                        log.seek(0)
+                        output = log.read().decode(errors='replace').strip()
+                        raise RuntimeError(f'{kind} server did not start: {output[-500:]}')
+                    time.sleep(0.2)
+            yield base_url
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+
+def load_test(base_url, urls, cookies, requests=200, concurrency=20, warmup=5):
+    """GET each (view name, url) `requests` times, `concurrency` at once; returns {view: stats} in ms."""
+    cookie = '; '.join(f'{name}={value}' for name, value in cookies.items())
+
+    def fetch(url):
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(urllib.request.Request(base_url + url, headers={'Cookie': cookie}),
+                                        timeout=60) as response:
+                response.read()
+                # a redirect to the login page means the session wasn't accepted
+                ok = response.status == 200 and response.geturl() == base_url + url
+        except (urllib.error.URLError, OSError):
+            ok = False
+        return (time.perf_counter() - started) * 1000, ok
+
+    results = {}
+    with ThreadPoolExecutor(concurrency) as pool:
+        for name, url in urls:
+            list(pool.map(fetch, [url] * warmup))
+            started = time.perf_counter()
+            samples = list(pool.map(fetch, [url] * requests))
+            elapsed = time.perf_counter() - started
+            timings = [ms for ms, _ in samples]
+            results[name] = {
+                'url': url,
+                'requests': requests,
+                'errors': sum(1 for _, ok in samples if not ok),
+                'p50_ms': round(_percentile(timings, 50), 2),
+                'p99_ms': round(_percentile(timings, 99), 2),
+                'mean_ms': round(statistics.mean(timings), 2),
+                'requests_per_second': round(requests / elapsed, 1),
+            }
+    return results
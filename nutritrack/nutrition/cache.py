@@ -0,0 +1,169 @@
+"""Cached page data with generation-key invalidation.
+
+Every user has a generation number in the cache, and so does the food
+catalogue. Cached values embed the generation in their key, so bumping it
+(see invalidate_user / invalidate_catalogue, called from signals.py and the
+bulk totals writers) makes all of that user's cached data unreachable at
+once without having to know which keys exist. Stale entries simply expire.
+That only reaches every worker through a shared backend (file or redis); with
+the per-process locmem backend other workers keep their copy until it
+expires, so settings give it a short NUTRITION_CACHE_TIMEOUT.
+
+Hits and misses per section are counted in the cache itself, so the
+numbers are shared by every worker process; see cache_stats().
+
+The a-prefixed twins (auser_cached, acatalogue_version, ...) are for the
+async views: they go through the cache's async API and await their builder.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+SECTIONS = ['dashboard', 'catalogue']
+DEFAULT_TIMEOUT = 60 * 15
+CATALOGUE_KEY = 'nutrition:catalogue:generation'
+_missing = object()
+
+
+def get_cache():
+    return caches[getattr(settings, 'NUTRITION_CACHE_ALIAS', 'default')]
+
+
+def _generation(key):
+    cache = get_cache()
+    generation = cache.get(key)
+    if generation is None:
+        # start from the clock rather than 1, so an evicted generation never
+        # comes back with a number that old entries were stored under
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key)
+    return generation
+
+
+async def _ageneration(key):
+    cache = get_cache()
+    generation = await cache.aget(key)
+    if generation is None:
+        await cache.aadd(key, time.time_ns(), None)
+        generation = await cache.aget(key)
+    return generation
+
+
+def _bump(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def _user_key(user_id):
+    return f'nutrition:user:{user_id}:generation'
+
+
+def invalidate_user(user_id):
+    _bump(_user_key(user_id))
+
+
+def invalidate_users(user_ids):
+    for user_id in set(user_ids):
+        invalidate_user(user_id)
+
+
+def invalidate_catalogue():
+    _bump(CATALOGUE_KEY)
+
+
+def catalogue_version():
+    """Changes whenever a Food or FoodCategory is written."""
+    return _generation(CATALOGUE_KEY)
+
+
+async def acatalogue_version():
+    return await _ageneration(CATALOGUE_KEY)
+
+
+def _count(section, outcome):
+    cache = get_cache()
+    key = f'nutrition:stats:{section}:{outcome}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+async def _acount(section, outcome):
+    cache = get_cache()
+    key = f'nutrition:stats:{section}:{outcome}'
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aset(key, 1, None)
+
+
+def _timeout(timeout):
+    return timeout or getattr(settings, 'NUTRITION_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def cached(section, key, build, timeout=None):
+    """Return the cached value for `key`, building and storing it on a miss."""
+    cache = get_cache()
+    value = cache.get(key, _missing)
+    if value is not _missing:
+        _count(section, 'hits')
+        return value
+    _count(section, 'misses')
+    value = build()
+    cache.set(key, value, _timeout(timeout))
+    return value
+
+
+async def acached(section, key, build, timeout=None):
+    """cached() for async callers; `build` is a coroutine function."""
+    cache = get_cache()
+    value = await cache.aget(key, _missing)
+    if value is not _missing:
+        await _acount(section, 'hits')
+        return value
+    await _acount(section, 'misses')
+    value = await build()
+    await cache.aset(key, value, _timeout(timeout))
+    return value
+
+
+def user_cached(section, user_id, name, build, timeout=None):
+    key = f'nutrition:{section}:{user_id}:{_generation(_user_key(user_id))}:{name}'
+    return cached(section, key, build, timeout)
+
+
+async def auser_cached(section, user_id, name, build, timeout=None):
+    key = f'nutrition:{section}:{user_id}:{await _ageneration(_user_key(user_id))}:{name}'
+    return await acached(section, key, build, timeout)
+
+
+def catalogue_cached(name, build, timeout=None):
+    key = f'nutrition:catalogue:{catalogue_version()}:{name}'
+    return cached('catalogue', key, build, timeout)
+
+
+async def acatalogue_cached(name, build, timeout=None):
+    key = f'nutrition:catalogue:{await acatalogue_version()}:{name}'
+    return await acached('catalogue', key, build, timeout)
+
+
+def cache_stats():
+    """Hit/miss counters per section, for monitoring."""
+    cache = get_cache()
+    counters = cache.get_many([f'nutrition:stats:{section}:{outcome}'
+                               for section in SECTIONS for outcome in ('hits', 'misses')])
+    stats = {}
+    for section in SECTIONS:
+        hits = counters.get(f'nutrition:stats:{section}:hits', 0)
+        misses = counters.get(f'nutrition:stats:{section}:misses', 0)
+        stats[section] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses) * 100, 1) if hits + misses else None,
+        }
+    return stats
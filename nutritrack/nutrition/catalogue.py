@@ -0,0 +1,79 @@
+"""Snapshot of the food catalogue metadata: categories with food counts and the food total.
+
+The snapshot is stored in the cache under the catalogue version (bumped by
+the Food/FoodCategory signals, see cache.py) and memoised per process, so
+reading it costs one cache lookup for the version and no queries.
+asnapshot() is the same for async views, with the two queries of a
+rebuild issued concurrently.
+"""
+import asyncio
+
+from django.db.models import Count
+
+from .cache import acatalogue_cached, acatalogue_version, catalogue_cached, catalogue_version
+from .models import Food, FoodCategory
+
+# (version, snapshot), replaced as a whole so concurrent readers never see it half updated
+_memo = (None, None)
+
+
+def _categories():
+    return FoodCategory.objects.annotate(food_count=Count('food')).order_by('name')
+
+
+def _snapshot(categories, total_foods):
+    return {
+        'total_foods': total_foods,
+        'categories': categories,
+        'food_counts': {category.pk: category.food_count for category in categories},
+    }
+
+
+def _build():
+    return _snapshot(list(_categories()), Food.objects.count())
+
+
+async def _abuild():
+    async def categories():
+        return [category async for category in _categories()]
+
+    return _snapshot(*await asyncio.gather(categories(), Food.objects.acount()))
+
+
+def snapshot():
+    global _memo
+    version = catalogue_version()
+    memo_version, data = _memo
+    if memo_version != version:
+        data = catalogue_cached('snapshot', _build)
+        _memo = (version, data)
+    return data
+
+
+async def asnapshot():
+    global _memo
+    version = await acatalogue_version()
+    memo_version, data = _memo
+    if memo_version != version:
+        data = await acatalogue_cached('snapshot', _abuild)
+        _memo = (version, data)
+    return data
+
+
+def categories():
+    """FoodCategory objects (ordered by name) annotated with food_count."""
+    return snapshot()['categories']
+
+
+def total_foods():
+    return snapshot()['total_foods']
+
+
+def food_count(category_id):
+    return snapshot()['food_counts'].get(category_id, 0)
+
+
+def category_choices(empty_label=None):
+    """(id, label) choices for a category <select>, without a query."""
+    choices = [('', empty_label)] if empty_label else []
+    return choices + [(category.pk, str(category)) for category in categories()]
@@ -0,0 +1,163 @@
+"""Copying meal entries onto other days.
+
+Used by copy_yesterday, copy_day and add_recipe_to_meal. The sources (a
+day's or a meal's entries, a recipe's ingredients, or every entry in a
+date range) are read with one SELECT, missing target plans are created in
+bulk, and the new entries go in with one bulk_create inside a transaction,
+followed by one totals refresh for the touched days. The query count does
+not depend on how many entries or days are copied.
+
+Copying days is idempotent: a target day only gets an entry when it has
+fewer entries of that food in that meal than the sources, so copying the
+same day twice (or double-submitting a form) doesn't log everything twice.
+Adding a recipe is not - eating the same dish twice logs it twice.
+
+Week templates (a saved week of entries, see WeekTemplate) are applied
+the same way, with a policy for days that already have meals:
+'merge' adds what is missing, 'skip' leaves those days alone and
+'replace' deletes their entries first.
+
+Batch logging (log_entries, several foods of a meal in one form or API
+request) also takes the same path without the idempotency check: a food
+logged twice in one batch was eaten twice.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+
+from .models import MealPlan, MealEntry, WeekTemplate, WeekTemplateEntry, fill_grams
+from .signals import defer_totals
+
+# longest "repeat this day" run accepted from a request
+MAX_REPEAT_DAYS = 31
+# longest run of weeks a template can be applied to at once
+MAX_TEMPLATE_WEEKS = 12
+CONFLICT_POLICIES = [
+    ('merge', 'Merge: add what is missing'),
+    ('skip', 'Skip days that already have meals'),
+    ('replace', 'Replace existing meals'),
+]
+
+
+def following_days(day, count):
+    """The `count` dates after `day`."""
+    return [day + timedelta(days=i) for i in range(1, count + 1)]
+
+
+def clone_entries(sources, user, dates, meal_type=None, plan_defaults=None, policy='merge'):
+    """Copy `sources` into the user's plan of every date in `dates`.
+
+    `sources` is an iterable or queryset of MealEntry or RecipeIngredient
+    (anything with food_id, quantity and unit). Entries keep their meal
+    type unless `meal_type` is given, which recipe ingredients need.
+    Plans that don't exist yet are created with `plan_defaults`.
+    `policy` is 'merge' (only add what is missing) or 'append' (add
+    everything, for recipes). Returns the number of entries created.
+    """
+    rows = [(meal_type or source.meal_type, source.food_id, source.quantity, source.unit)
+            for source in sources]
+    return _copy(user, {day: rows for day in dates}, plan_defaults, policy=policy)
+
+
+def clone_days(user, start, end, to_start, plan_defaults=None):
+    """Copy everything the user logged from `start` to `end` to the same days counted from `to_start`."""
+    shift = to_start - start
+    rows_by_date = defaultdict(list)
+    entries = MealEntry.objects.filter(
+        meal_plan__user=user, meal_plan__date__range=[start, end],
+    ).values_list('meal_plan__date', 'meal_type', 'food_id', 'quantity', 'unit')
+    for day, *row in entries:
+        rows_by_date[day + shift].append(tuple(row))
+    return _copy(user, rows_by_date, plan_defaults)
+
+
+def save_week_template(user, week_start, name):
+    """Save the user's entries of the 7 days from `week_start` as the template `name` (overwriting it).
+
+    Entries are stored by weekday, so the week doesn't have to start on a Monday.
+    """
+    entries = MealEntry.objects.filter(
+        meal_plan__user=user, meal_plan__date__range=[week_start, week_start + timedelta(days=6)],
+    ).values_list('meal_plan__date', 'meal_type', 'food_id', 'quantity', 'unit')
+    with transaction.atomic():
+        template, created = WeekTemplate.objects.update_or_create(user=user, name=name)
+        if not created:
+            template.entries.all().delete()
+        WeekTemplateEntry.objects.bulk_create([
+            WeekTemplateEntry(
+                template=template, weekday=day.weekday(),
+                meal_type=meal_type, food_id=food_id, quantity=quantity, unit=unit,
+            )
+            for day, meal_type, food_id, quantity, unit in entries
+        ])
+    return template
+
+
+def apply_week_template(template, first_week, weeks=1, policy='merge'):
+    """Stamp the template onto `weeks` weeks, the first starting on the Monday `first_week`.
+
+    Returns the number of entries created.
+    """
+    if policy not in dict(CONFLICT_POLICIES):
+        raise ValueError(f'unknown conflict policy "{policy}"')
+    rows_by_date = defaultdict(list)
+    entries = template.entries.values_list('weekday', 'meal_type', 'food_id', 'quantity', 'unit')
+    for weekday, *row in entries:
+        for week in range(weeks):
+            rows_by_date[first_week + timedelta(weeks=week, days=weekday)].append(tuple(row))
+    return _copy(template.user, rows_by_date, policy=policy)
+
+
+def log_entries(user, day, rows, plan_defaults=None):
+    """Log every (meal_type, food_id, quantity, unit) row to the user's plan of `day`.
+
+    The foods must exist (see BatchMealEntryFormSet). Returns the number of entries created.
+    """
+    return _copy(user, {day: list(rows)}, plan_defaults, policy='append')
+
+
+def _copy(user, rows_by_date, plan_defaults=None, policy='merge'):
+    """Add the (meal_type, food_id, quantity, unit) rows to each date's plan, skipping ones already there.
+
+    Besides the CONFLICT_POLICIES, 'append' (recipes and batch logging) adds every row.
+    """
+    if not any(rows_by_date.values()):
+        return 0
+    dates = list(rows_by_date)
+    with transaction.atomic():
+        MealPlan.objects.bulk_create(
+            [MealPlan(user=user, date=day, **(plan_defaults or {})) for day in dates],
+            ignore_conflicts=True,
+        )
+        plans = MealPlan.objects.filter(user=user, date__in=dates)
+        plan_ids = dict(plans.values_list('date', 'id'))
+        existing = Counter() if policy == 'append' else Counter(
+            MealEntry.objects.filter(meal_plan_id__in=plan_ids.values())
+            .values_list('meal_plan_id', 'meal_type', 'food_id')
+        )
+        planned = {plan_id for plan_id, _, _ in existing}
+        if policy == 'replace' and planned:
+            with defer_totals():
+                MealEntry.objects.filter(meal_plan_id__in=planned).delete()
+            existing.clear()
+
+        new_entries = []
+        for day, rows in rows_by_date.items():
+            plan_id = plan_ids[day]
+            if policy == 'skip' and plan_id in planned:
+                continue
+            copied = Counter()
+            for meal_type, food_id, quantity, unit in rows:
+                key = (plan_id, meal_type, food_id)
+                copied[key] += 1
+                if copied[key] <= existing[key]:
+                    continue
+                new_entries.append(MealEntry(
+                    meal_plan_id=plan_id, food_id=food_id,
+                    meal_type=meal_type, quantity=quantity, unit=unit,
+                ))
+        MealEntry.objects.bulk_create(fill_grams(new_entries))
+        # bulk_create skips the signals; this also gives new empty plans their rollup
+        plans.refresh_totals()
+    return len(new_entries)
@@ -3,13 +3,66 @@ from .models import Food, FoodCategory
 from .models import MealEntry
 from .models import RecipeTemplate
 from .models import RecipeIngredient
-from django.forms import inlineformset_factory
+from django.forms import inlineformset_factory, formset_factory
+from django.core.exceptions import ValidationError
+from django.urls import reverse_lazy
+from django.utils.html import format_html
+from .autocomplete import food_index
+from . import catalogue
+from . import units
+import json
+from .copying import CONFLICT_POLICIES, MAX_TEMPLATE_WEEKS
+from datetime import timedelta
+
+
+class FoodAutocompleteWidget(forms.Widget):
+    """Search box backed by /food/autocomplete/ with the chosen food id in a hidden input.
+
+    Replaces the <select> that rendered every Food as an option. The hidden
+    input carries the food's nutrition in data-* attributes for the live previews.
+    """
+    url = reverse_lazy('nutrition:food_autocomplete')
+
+    class Media:
+        js = ['js/food_autocomplete.js']
+
+    def id_for_label(self, id_):
+        return f'{id_}_search' if id_ else id_
+
+    def render(self, name, value, attrs=None, renderer=None):
+        attrs = self.build_attrs(self.attrs, attrs)
+        food_id = attrs.pop('id', '')
+        css_class = attrs.pop('class', 'form-input')
+        food = None
+        if value not in (None, ''):
+            try:
+                food = food_index.get(int(value))
+            except (TypeError, ValueError):
+                pass
+        food = food or {}
+        return format_html(
+            '<div class="food-autocomplete" data-autocomplete-url="{}" data-ml-per-unit="{}">'
+            '<input type="hidden" name="{}" id="{}" value="{}" data-calories="{}" '
+            'data-protein="{}" data-carbs="{}" data-fats="{}" data-density="{}" '
+            'data-grams-per-piece="{}" data-grams-per-serving="{}" data-portions="{}">'
+            '<input type="text" class="{} food-autocomplete-input" id="{}" value="{}" '
+            'placeholder="Start typing a food..." autocomplete="off"{}>'
+            '<ul class="food-autocomplete-results" hidden></ul>'
+            '</div>',
+            self.url, json.dumps(units.ML_PER_UNIT), name, food_id, food.get('id', ''),
+            food.get('calories', ''), food.get('protein', ''), food.get('carbs', ''), food.get('fats', ''),
+            food.get('density') or '', food.get('grams_per_piece') or '', food.get('grams_per_serving') or '',
+            json.dumps(food.get('portions') or {}),
+            css_class, self.id_for_label(food_id), food.get('name', ''),
+            format_html(' required') if attrs.get('required') else '',
+        )
 
 
 class CustomFoodForm(forms.ModelForm):
     class Meta:
         model = Food
-        fields = ['name', 'category', 'calories', 'protein', 'carbs', 'fats', 'fiber', 'sodium']
+        fields = ['name', 'category', 'calories', 'protein', 'carbs', 'fats', 'fiber', 'sodium',
+                  'density', 'grams_per_piece', 'grams_per_serving']
         widgets = {
             'name': forms.TextInput(attrs={'class': 'form-input', 'placeholder': 'Food name'}),
             'category': forms.Select(attrs={'class': 'form-input form-select'}),
@@ -19,11 +72,15 @@ class CustomFoodForm(forms.ModelForm):
             'fats': forms.NumberInput(attrs={'class': 'form-input', 'min': 0, 'step': 0.1}),
             'fiber': forms.NumberInput(attrs={'class': 'form-input', 'min': 0, 'step': 0.1}),
             'sodium': forms.NumberInput(attrs={'class': 'form-input', 'min': 0, 'step': 0.1}),
+            'density': forms.NumberInput(attrs={'class': 'form-input', 'min': 0.01, 'step': 0.01}),
+            'grams_per_piece': forms.NumberInput(attrs={'class': 'form-input', 'min': 0.1, 'step': 0.1}),
+            'grams_per_serving': forms.NumberInput(attrs={'class': 'form-input', 'min': 0.1, 'step': 0.1}),
         }
         
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fields['category'].empty_label = "Select Category"
+        # options come from the cached catalogue snapshot instead of a query per render
+        self.fields['category'].choices = catalogue.category_choices("Select Category")
         for field in self.fields:
             self.fields[field].widget.attrs.update({'class': 'form-input'})
 
@@ -32,7 +89,7 @@ class MealEntryForm(forms.ModelForm):
         model = MealEntry
         fields = ['food', 'meal_type', 'quantity', 'unit']
         widgets = {
-            'food': forms.Select(attrs={'class': 'form-input form-select'}),
+            'food': FoodAutocompleteWidget(),
             'meal_type': forms.Select(attrs={'class': 'form-input form-select'}),
             'quantity': forms.NumberInput(attrs={'class': 'form-input', 'min': 0.1, 'step': 0.1}),
             'unit': forms.Select(attrs={'class': 'form-input form-select'}),
@@ -40,8 +97,6 @@ class MealEntryForm(forms.ModelForm):
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fields['food'].queryset = Food.objects.select_related('category').order_by('category__name', 'name')
-        
         # Make labels more user-friendly
         self.fields['food'].label = "Food Item"
         self.fields['meal_type'].label = "Meal"
@@ -49,6 +104,72 @@ class MealEntryForm(forms.ModelForm):
         self.fields['unit'].label = "Unit"
 
 
+# most foods one batch logging request may add
+MAX_BATCH_ENTRIES = 30
+
+class BatchMealEntryForm(forms.Form):
+    """One row of BatchMealEntryFormSet.
+
+    A plain Form rather than MealEntryForm: its ModelChoiceField would look
+    up every row's food on its own, the formset checks them all at once.
+    """
+    food = forms.IntegerField(label="Food Item", widget=FoodAutocompleteWidget())
+    meal_type = forms.ChoiceField(
+        label="Meal", choices=MealEntry.MEAL_TYPES,
+        widget=forms.Select(attrs={'class': 'form-input form-select'}),
+    )
+    quantity = forms.FloatField(
+        min_value=0.1, initial=100,
+        widget=forms.NumberInput(attrs={'class': 'form-input', 'min': 0.1, 'step': 0.1}),
+    )
+    unit = forms.ChoiceField(
+        choices=units.UNIT_CHOICES, initial='g',
+        widget=forms.Select(attrs={'class': 'form-input form-select'}),
+    )
+
+    def __init__(self, *args, meal_type=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # rows left at their initial values count as empty and are skipped
+        self.fields['meal_type'].initial = meal_type or 'breakfast'
+
+class BaseBatchMealEntryFormSet(forms.BaseFormSet):
+    def clean(self):
+        if any(self.errors):
+            return
+        filled = [form for form in self.forms if form.cleaned_data]
+        if not filled:
+            raise ValidationError("Add at least one food.")
+        # one query for every row's food
+        self.foods = Food.objects.only('name').in_bulk({form.cleaned_data['food'] for form in filled})
+        for form in filled:
+            if form.cleaned_data['food'] not in self.foods:
+                form.add_error('food', "Select a valid food.")
+
+    def rows(self):
+        """(meal_type, food_id, quantity, unit) of every filled row, for copying.log_entries."""
+        return [
+            (row['meal_type'], row['food'], row['quantity'], row['unit'])
+            for row in (form.cleaned_data for form in self.forms) if row
+        ]
+
+    @classmethod
+    def from_items(cls, items):
+        """A bound formset for a JSON list of {food, quantity, unit, meal_type} items; none may be empty."""
+        data = {'form-TOTAL_FORMS': len(items), 'form-INITIAL_FORMS': 0}
+        for i, item in enumerate(items):
+            item = item if isinstance(item, dict) else {}
+            for field in ('food', 'meal_type', 'quantity', 'unit'):
+                data[f'form-{i}-{field}'] = item.get(field, 'g' if field == 'unit' else '')
+        return cls(data, form_kwargs={'empty_permitted': False})
+
+BatchMealEntryFormSet = formset_factory(
+    BatchMealEntryForm,
+    formset=BaseBatchMealEntryFormSet,
+    extra=5,
+    max_num=MAX_BATCH_ENTRIES,
+    validate_max=True,
+)
+
 
 class RecipeTemplateForm(forms.ModelForm):
     class Meta:
@@ -64,12 +185,51 @@ class RecipeIngredientForm(forms.ModelForm):
         model = RecipeIngredient
         fields = ['food', 'quantity', 'unit', 'notes']
         widgets = {
-            'food': forms.Select(attrs={'class': 'form-input form-select'}),
+            'food': FoodAutocompleteWidget(),
             'quantity': forms.NumberInput(attrs={'class': 'form-input', 'min': 0.1, 'step': 0.1}),
             'unit': forms.Select(attrs={'class': 'form-input form-select'}),
             'notes': forms.TextInput(attrs={'class': 'form-input', 'placeholder': 'e.g. diced, cooked'})
         }
 
+class MealImportForm(forms.Form):
+    file = forms.FileField(
+        label="Diary file",
+        help_text="CSV with a header row, or JSON Lines: date, meal_type, food, quantity, unit",
+        widget=forms.ClearableFileInput(attrs={'class': 'form-input', 'accept': '.csv,.jsonl,.ndjson,.json'}),
+    )
+    format = forms.ChoiceField(
+        choices=[('', 'Detect from file name'), ('csv', 'CSV'), ('jsonl', 'JSON Lines')],
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-input form-select'}),
+    )
+
+class WeekTemplateForm(forms.Form):
+    name = forms.CharField(
+        max_length=100,
+        widget=forms.TextInput(attrs={'class': 'form-input', 'placeholder': 'e.g. Cutting week'}),
+    )
+    week = forms.DateField(widget=forms.HiddenInput)
+
+class ApplyWeekTemplateForm(forms.Form):
+    start = forms.DateField(
+        label="First week",
+        help_text="Any day of the first week; meals land on the matching weekdays",
+        widget=forms.DateInput(attrs={'class': 'form-input', 'type': 'date'}),
+    )
+    weeks = forms.IntegerField(
+        min_value=1, max_value=MAX_TEMPLATE_WEEKS, initial=4,
+        widget=forms.NumberInput(attrs={'class': 'form-input'}),
+    )
+    policy = forms.ChoiceField(
+        label="Days that already have meals",
+        choices=CONFLICT_POLICIES,
+        widget=forms.Select(attrs={'class': 'form-input form-select'}),
+    )
+
+    def clean_start(self):
+        start = self.cleaned_data['start']
+        return start - timedelta(days=start.weekday())
+
 # Create formset for multiple ingredients
 RecipeIngredientFormSet = inlineformset_factory(
     RecipeTemplate, 
@@ -0,0 +1,150 @@
+"""EXPLAIN the queries of the hot views and point out full table scans.
+
+Used by the `index_advisor` management command. Every hot view (see
+benchmark.py) is requested as a user, its SELECTs are captured and run
+again under EXPLAIN (or EXPLAIN ANALYZE on PostgreSQL), and the plans are
+searched for:
+
+- sequential scans of tables with at least `min_rows` rows, together with
+  the filtered columns no index on that table starts with;
+- sorts the database has to do itself because no index gives the order
+  (SQLite's "USE TEMP B-TREE FOR ORDER BY").
+
+PostgreSQL plans are read from EXPLAIN (FORMAT JSON), SQLite plans from
+EXPLAIN QUERY PLAN. Small tables are always scanned, so the row threshold
+keeps the report to what matters on a real dataset.
+"""
+import json
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from .benchmark import hot_view_urls
+from .models import MealEntry
+
+DEFAULT_MIN_ROWS = 1000
+
+
+def advisor_urls(user):
+    """The benchmarked views plus the food page of the user's most logged food."""
+    urls = hot_view_urls(user)
+    food_id = (MealEntry.objects.filter(meal_plan__user=user).values('food')
+               .annotate(times=Count('pk')).order_by('-times')
+               .values_list('food', flat=True).first())
+    if food_id:
+        urls.append(('food_detail', reverse('nutrition:food_detail', args=[food_id])))
+    return urls
+
+
+def capture(user, urls):
+    """{view name: [distinct SELECT statements]} issued while rendering each url as `user`."""
+    client = Client()
+    client.force_login(user)
+    captured = {}
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        for name, url in urls:
+            client.get(url)  # warm the caches, so only the steady-state queries are explained
+            with CaptureQueriesContext(connection) as queries:
+                client.get(url)
+            statements = []
+            for query in queries.captured_queries:
+                sql = query['sql']
+                if sql.lstrip().upper().startswith('SELECT') and sql not in statements:
+                    statements.append(sql)
+            captured[name] = statements
+    return captured
+
+
+def explain(sql, analyze=False):
+    """Scans and sorts in the plan of `sql`, as dicts with kind, table, filter and rows."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            options = 'ANALYZE, FORMAT JSON' if analyze else 'FORMAT JSON'
+            cursor.execute(f'EXPLAIN ({options}) {sql}')
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return _postgres_findings(plan[0]['Plan'])
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return _sqlite_findings((row[-1] for row in cursor.fetchall()), sql)
+    raise NotImplementedError(f'EXPLAIN is not supported on {connection.vendor}')
+
+
+def _postgres_findings(node):
+    findings = []
+    if node.get('Node Type') == 'Seq Scan':
+        findings.append({
+            'kind': 'scan',
+            'table': node.get('Relation Name'),
+            'filter': node.get('Filter', ''),
+            'rows': node.get('Actual Rows', node.get('Plan Rows')),
+        })
+    if node.get('Node Type') == 'Sort':
+        findings.append({'kind': 'sort', 'table': None, 'filter': ', '.join(node.get('Sort Key', [])), 'rows': None})
+    for child in node.get('Plans', []):
+        findings.extend(_postgres_findings(child))
+    return findings
+
+
+def _sqlite_findings(details, sql):
+    # subqueries name their tables U0, U1, ...; the plan only shows the alias
+    aliases = {alias: table for table, alias in re.findall(r'"(\w+)" (U\d+)\b', sql)}
+    findings = []
+    for detail in details:
+        # SCAN reads every row (also "SCAN t USING INDEX i", which only walks it in order); SEARCH looks rows up
+        match = re.match(r'SCAN (?:TABLE )?(\w+)', detail)
+        if match:
+            table = aliases.get(match.group(1), match.group(1))
+            findings.append({'kind': 'scan', 'table': table, 'filter': '', 'rows': None})
+        elif 'USE TEMP B-TREE FOR ORDER BY' in detail:
+            findings.append({'kind': 'sort', 'table': None, 'filter': detail, 'rows': None})
+    return findings
+
+
+def indexed_columns(table):
+    """Leading column of every index on `table`."""
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return {info['columns'][0] for info in constraints.values() if info['index'] and info['columns']}
+
+
+def table_rows(table):
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}')
+        return cursor.fetchone()[0]
+
+
+def unindexed_columns(table, filter_text):
+    """Columns compared in a scan's filter that no index on the table starts with."""
+    with connection.cursor() as cursor:
+        columns = [column.name for column in connection.introspection.get_table_description(cursor, table)]
+    leading = indexed_columns(table)
+    return [column for column in columns
+            if column not in leading and re.search(rf'\b{re.escape(column)}\b', filter_text)]
+
+
+def advise(user, analyze=False, min_rows=DEFAULT_MIN_ROWS):
+    """{view name: [problem]} for every hot view; a problem is a dict with the query and its finding."""
+    sizes = {}
+    report = {}
+    for name, statements in capture(user, advisor_urls(user)).items():
+        problems = []
+        for sql in statements:
+            for finding in explain(sql, analyze):
+                if finding['kind'] == 'scan':
+                    table = finding['table']
+                    if table not in sizes:
+                        sizes[table] = table_rows(table)
+                    if sizes[table] < min_rows:
+                        continue
+                    finding['table_rows'] = sizes[table]
+                    finding['missing_index'] = unindexed_columns(table, finding['filter'])
+                problems.append(dict(finding, sql=sql))
+        report[name] = problems
+    return report
@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from nutrition.models import MealPlan, MealEntry, RecipeTemplate, RecipeIngredient, fill_grams
+
+
+class Command(BaseCommand):
+    help = 'Recalculate the stored grams of meal entries and recipe ingredients (after unit or portion changes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--food', type=int, action='append', dest='foods',
+                            help='Only rows of this food id (repeatable)')
+        parser.add_argument('--verify', action='store_true', help='Only report how many rows are out of date')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        self.verify = options['verify']
+        self.batch_size = options['batch_size']
+        targets = [
+            (MealEntry, 'meal entries', 'meal_plan_id', MealPlan, 'meal plans'),
+            (RecipeIngredient, 'recipe ingredients', 'recipe_id', RecipeTemplate, 'recipes'),
+        ]
+        for model, label, parent_field, parent_model, parent_label in targets:
+            rows = model.objects.all()
+            if options['foods']:
+                rows = rows.filter(food_id__in=options['foods'])
+            stale, parent_ids = self.backfill(model, rows, parent_field)
+
+            if self.verify:
+                self.stdout.write(f"🔍 {stale} {label} out of date")
+                continue
+            refreshed = self.refresh(parent_model, sorted(parent_ids))
+            self.stdout.write(self.style.SUCCESS(f"✅ Updated {stale} {label}"
+                                                 + (f", refreshed {refreshed} {parent_label}" if refreshed else "")))
+
+    def refresh(self, model, ids):
+        """Recalculate the stored totals of the meal plans or recipes whose rows changed weight."""
+        refreshed = 0
+        for i in range(0, len(ids), self.batch_size):
+            refreshed += model.objects.filter(pk__in=ids[i:i + self.batch_size]).refresh_totals()
+        return refreshed
+
+    def backfill(self, model, rows, parent_field):
+        """Returns (rows out of date, ids of the meal plans or recipes they belong to)."""
+        parent_ids = set()
+
+        # grams are the quantity itself, so one UPDATE fixes all of those
+        stale_grams = rows.filter(unit='g').exclude(grams=F('quantity'))
+        stale = stale_grams.count()
+        if stale and not self.verify:
+            parent_ids.update(stale_grams.values_list(parent_field, flat=True).distinct())
+            stale_grams.update(grams=F('quantity'))
+
+        fields = ['pk', 'food_id', 'quantity', 'unit', 'grams', parent_field]
+        batch = []
+        for row in rows.exclude(unit='g').only(*fields).order_by('pk').iterator(chunk_size=self.batch_size):
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                stale += self.write(model, batch, parent_field, parent_ids)
+                batch = []
+        if batch:
+            stale += self.write(model, batch, parent_field, parent_ids)
+        return stale, parent_ids
+
+    def write(self, model, batch, parent_field, parent_ids):
+        stored = [row.grams for row in batch]
+        fill_grams(batch)
+        changed = [row for row, grams in zip(batch, stored) if abs(row.grams - grams) > 1e-9]
+        if changed and not self.verify:
+            with transaction.atomic():
+                model.objects.bulk_update(changed, ['grams'])
+            parent_ids.update(getattr(row, parent_field) for row in changed)
+        return len(changed)
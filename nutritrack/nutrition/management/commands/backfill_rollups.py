@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from nutrition.models import MealPlan, DailyNutritionRollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the DailyNutritionRollup table from the stored MealPlan totals'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Limit to the plans of one username')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        plans = MealPlan.objects.order_by('pk')
+        if options['user']:
+            plans = plans.filter(user__username=options['user'])
+
+        update_fields = ['user', 'date', 'goal_calories', 'entry_count', 'updated_at'] + DailyNutritionRollup.TOTAL_FIELDS
+        batch = []
+        written = 0
+        for plan in plans.iterator(chunk_size=options['batch_size']):
+            batch.append(DailyNutritionRollup(meal_plan_id=plan.pk, **DailyNutritionRollup.values_from_plan(plan)))
+            if len(batch) >= options['batch_size']:
+                written += self.write(batch, update_fields)
+                batch = []
+        if batch:
+            written += self.write(batch, update_fields)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Wrote {written} daily rollups"))
+
+    @staticmethod
+    def write(batch, update_fields):
+        with transaction.atomic():
+            DailyNutritionRollup.objects.bulk_create(
+                batch,
+                update_conflicts=True,
+                unique_fields=['meal_plan'],
+                update_fields=update_fields,
+            )
+        return len(batch)
@@ -0,0 +1,74 @@
+import json
+import platform
+from datetime import datetime
+
+import django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from nutrition.benchmark import LATENCY_TOLERANCE, find_regressions, run_benchmarks, seed_dataset
+
+
+class Command(BaseCommand):
+    help = '⏱️ Benchmark the hot views (latency + query counts), on a synthetic dataset with --seed-data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed-data', action='store_true',
+                            help='Write a load_data dataset first (by default the data already in the database is used)')
+        parser.add_argument('--users', type=int, default=4, help='Users to seed with --seed-data')
+        parser.add_argument('--days', type=int, default=90, help='Days of meal plans to seed per user')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for --seed-data')
+        parser.add_argument('--user', default='ahmad_nutrition', help='Username whose pages are requested')
+        parser.add_argument('--iterations', type=int, default=10)
+        parser.add_argument('--output', help='Write the JSON report to this file')
+        parser.add_argument('--baseline', help='Earlier JSON report to compare against; regressions fail the command')
+        parser.add_argument('--tolerance', type=float, default=LATENCY_TOLERANCE,
+                            help='Allowed median latency growth against the baseline (0.25 = 25%%)')
+
+    def handle(self, *args, **options):
+        if options['seed_data']:
+            self.stdout.write(f"🌱 Seeding {options['users']} users x {options['days']} days (seed {options['seed']})...")
+            seed_dataset(options['users'], options['days'], options['seed'])
+
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User \"{options['user']}\" does not exist")
+
+        self.stdout.write(f"⏱️ Benchmarking as {user.username}, {options['iterations']} requests per view...")
+        results = run_benchmarks(user, iterations=options['iterations'])
+        report = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'database': connection.vendor,
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'dataset': {key: options[key] for key in ('seed_data', 'users', 'days', 'seed')},
+            'iterations': options['iterations'],
+            'views': results,
+        }
+
+        for name, stats in results.items():
+            self.stdout.write(f"  {name:<20} {stats['median_ms']:>8.1f}ms median  "
+                              f"{stats['p95_ms']:>8.1f}ms p95  {stats['queries']:>3} queries")
+
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read baseline: {e}")
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"📄 Report written to {options['output']}")
+        else:
+            self.stdout.write(json.dumps(report, indent=2))
+
+        problems = find_regressions(results, baseline, options['tolerance'])
+        for problem in problems:
+            self.stdout.write(self.style.ERROR(f"  ❌ {problem}"))
+        if problems:
+            raise CommandError(f"{len(problems)} performance regression(s)")
+        self.stdout.write(self.style.SUCCESS("✅ All views within their query budgets"))
@@ -0,0 +1,87 @@
+import json
+import platform
+from datetime import datetime
+
+import django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from nutrition.benchmark import (
+    ASYNC_VIEWS, SERVERS, asgi_server_available, hot_view_urls, load_test, running_server,
+    seed_dataset, session_cookies,
+)
+
+
+class Command(BaseCommand):
+    help = '🚀 Compare p50/p99 latency of the sync views under WSGI and the async views under ASGI, under concurrent load'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed-data', action='store_true',
+                            help='Write a load_data dataset first (by default the data already in the database is used)')
+        parser.add_argument('--users', type=int, default=4, help='Users to seed with --seed-data')
+        parser.add_argument('--days', type=int, default=90, help='Days of meal plans to seed per user')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for --seed-data')
+        parser.add_argument('--user', default='ahmad_nutrition', help='Username whose pages are requested')
+        parser.add_argument('--servers', nargs='+', choices=list(SERVERS), default=list(SERVERS))
+        parser.add_argument('--requests', type=int, default=200, help='Requests per view and server')
+        parser.add_argument('--concurrency', type=int, default=20, help='Requests in flight at once')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--output', help='Write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        if 'asgi' in options['servers'] and not asgi_server_available():
+            raise CommandError("The ASGI run needs uvicorn: pip install uvicorn (or pass --servers wsgi)")
+        if connection.vendor == 'sqlite' and connection.settings_dict['NAME'] in ('', ':memory:'):
+            raise CommandError("The servers run in their own processes and can't share an in-memory database")
+
+        if options['seed_data']:
+            self.stdout.write(f"🌱 Seeding {options['users']} users x {options['days']} days (seed {options['seed']})...")
+            seed_dataset(options['users'], options['days'], options['seed'])
+
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User \"{options['user']}\" does not exist")
+
+        urls = [(name, url) for name, url in hot_view_urls(user) if name in ASYNC_VIEWS]
+        cookies = session_cookies(user)
+        results = {}
+        for kind in options['servers']:
+            self.stdout.write(f"🚀 {kind.upper()}: {options['requests']} requests per view, "
+                              f"{options['concurrency']} at a time...")
+            try:
+                with running_server(kind, options['port']) as base_url:
+                    results[kind] = load_test(base_url, urls, cookies,
+                                              requests=options['requests'], concurrency=options['concurrency'])
+            except RuntimeError as e:
+                raise CommandError(str(e))
+            for name, stats in results[kind].items():
+                self.stdout.write(f"  {name:<20} {stats['p50_ms']:>8.1f}ms p50  {stats['p99_ms']:>8.1f}ms p99  "
+                                  f"{stats['requests_per_second']:>7.1f} req/s  {stats['errors']} errors")
+
+        if len(results) == 2:
+            self.stdout.write("📊 ASGI vs WSGI:")
+            for name, _ in urls:
+                wsgi, asgi = results['wsgi'][name], results['asgi'][name]
+                self.stdout.write(f"  {name:<20} p50 {asgi['p50_ms'] / wsgi['p50_ms']:.2f}x  "
+                                  f"p99 {asgi['p99_ms'] / wsgi['p99_ms']:.2f}x")
+
+        report = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'database': connection.vendor,
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'dataset': {key: options[key] for key in ('seed_data', 'users', 'days', 'seed')},
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'servers': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"📄 Report written to {options['output']}")
+
+        errors = sum(stats['errors'] for views in results.values() for stats in views.values())
+        if errors:
+            raise CommandError(f"{errors} requests failed")
+        self.stdout.write(self.style.SUCCESS("✅ Done"))
@@ -0,0 +1,38 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from nutrition.transfer import FORMATS, READ_ERRORS, MealImporter, detect_format, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Import a meal diary (CSV or JSON Lines) into a user\'s meal plans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or .jsonl file with date, meal_type, food, quantity, unit')
+        parser.add_argument('--user', required=True, help='Username to import the entries for')
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User \"{options['user']}\" does not exist")
+        fmt = options['format'] or detect_format(options['path'])
+
+        self.stdout.write(f"📥 Importing {options['path']} ({fmt}) for {user.username}...")
+        importer = MealImporter(user, batch_size=options['batch_size'])
+        try:
+            with open(options['path'], newline='', encoding='utf-8') as stream:
+                result = importer.run(read_rows(stream, fmt))
+        except OSError as e:
+            raise CommandError(str(e))
+        except READ_ERRORS as e:
+            raise CommandError(f"Could not read the file ({e}); imported {importer.created} entries before the error")
+
+        for error in result['errors']:
+            self.stdout.write(self.style.WARNING(f"  ⚠️ {error}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Imported {result['created']} entries (totals refreshed for {result['days']} days), "
+            f"skipped {result['skipped']} rows in {result['seconds']:.1f}s "
+            f"({result['rows_per_second']:.0f} rows/s)"
+        ))
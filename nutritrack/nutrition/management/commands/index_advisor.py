@@ -0,0 +1,62 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from nutrition.benchmark import seed_dataset
+from nutrition.index_advisor import DEFAULT_MIN_ROWS, advise
+
+
+class Command(BaseCommand):
+    help = '🔎 EXPLAIN the queries of the hot views and report full table scans and missing indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed-data', action='store_true',
+                            help='Write a load_data dataset first (by default the data already in the database is used)')
+        parser.add_argument('--users', type=int, default=4, help='Users to seed with --seed-data')
+        parser.add_argument('--days', type=int, default=90, help='Days of meal plans to seed per user')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for --seed-data')
+        parser.add_argument('--user', default='ahmad_nutrition', help='Username whose pages are requested')
+        parser.add_argument('--analyze', action='store_true',
+                            help='Run EXPLAIN ANALYZE (PostgreSQL; executes the queries for actual row counts)')
+        parser.add_argument('--min-rows', type=int, default=DEFAULT_MIN_ROWS,
+                            help='Ignore scans of tables smaller than this')
+        parser.add_argument('--sql', action='store_true', help='Print the offending queries')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('postgresql', 'sqlite'):
+            raise CommandError(f"EXPLAIN is not supported on {connection.vendor}")
+        if options['seed_data']:
+            self.stdout.write(f"🌱 Seeding {options['users']} users x {options['days']} days (seed {options['seed']})...")
+            seed_dataset(options['users'], options['days'], options['seed'])
+
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User \"{options['user']}\" does not exist")
+
+        self.stdout.write(f"🔎 Explaining the hot views as {user.username} on {connection.vendor}...")
+        report = advise(user, analyze=options['analyze'], min_rows=options['min_rows'])
+
+        problems = 0
+        for name, findings in report.items():
+            if not findings:
+                self.stdout.write(f"  ✅ {name}")
+                continue
+            self.stdout.write(f"  ⚠️ {name}")
+            for finding in findings:
+                problems += 1
+                if finding['kind'] == 'scan':
+                    line = f"full scan of {finding['table']} ({finding['table_rows']} rows)"
+                    if finding['filter']:
+                        line += f" filtering on {finding['filter']}"
+                    if finding['missing_index']:
+                        line += f" -> no index on {', '.join(finding['missing_index'])}"
+                else:
+                    line = f"sort without an index: {finding['filter']}"
+                self.stdout.write(f"      {line}")
+                if options['sql']:
+                    self.stdout.write(f"        {finding['sql']}")
+
+        if problems:
+            self.stdout.write(self.style.WARNING(f"🔎 {problems} possible index problem(s)"))
+        else:
+            self.stdout.write(self.style.SUCCESS("✅ No full scans of large tables"))
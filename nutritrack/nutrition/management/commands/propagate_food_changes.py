@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from nutrition import propagation
+from nutrition.models import MealPlan
+
+
+class Command(BaseCommand):
+    help = ('Refresh the stored totals of meal plans and recipes using foods that were edited. '
+            'Edits of widely used foods wait for this command, so schedule it, e.g. every minute from cron: '
+            '"* * * * * cd /srv/nutritrack && python manage.py propagate_food_changes --sleep 0.1"')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--food', type=int, action='append', dest='foods',
+                            help='Queue this food id first, e.g. after a bulk update (repeatable)')
+        parser.add_argument('--reweigh', action='store_true',
+                            help='With --food: the portion weights changed, recompute grams too')
+        parser.add_argument('--status', action='store_true', help='Only report how many changes are pending')
+        parser.add_argument('--batch-size', type=int, default=propagation.DEFAULT_BATCH_SIZE)
+        parser.add_argument('--sleep', type=float, default=0,
+                            help='Seconds to pause between batches, to throttle the load on the database')
+        parser.add_argument('--limit', type=int, default=100, help='Changes claimed per round')
+
+    def handle(self, *args, **options):
+        if options['foods']:
+            propagation.queue_changes(options['foods'], reweigh=options['reweigh'])
+
+        if options['status']:
+            pending = propagation.pending()
+            self.stdout.write(f"🔍 {pending.count()} food changes pending "
+                              f"({pending.filter(claimed_at__isnull=False).count()} claimed by a worker)")
+            return
+
+        result = propagation.run(
+            limit=options['limit'], batch_size=options['batch_size'],
+            pause=options['sleep'], progress=self.progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Propagated changes of {result['foods']} foods: {result['plans']} meal plans and "
+            f"{result['recipes']} recipes refreshed, {result['reweighed']} rows reweighed"
+        ))
+
+    def progress(self, model, done, total):
+        label = 'meal plans' if model is MealPlan else 'recipes'
+        self.stdout.write(f"  ⏳ {label}: {done}/{total}")
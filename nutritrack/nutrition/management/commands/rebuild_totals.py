@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from nutrition.models import MealPlan
+
+
+class Command(BaseCommand):
+    help = 'Rebuild (or verify) the stored nutrition totals on every MealPlan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true',
+                            help='Only report plans whose stored totals are out of date')
+        parser.add_argument('--user', help='Limit to the plans of one username')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        # the real totals are summed by the database next to the stored ones
+        plans = MealPlan.objects.with_totals().select_related('user').order_by('pk')
+        if options['user']:
+            plans = plans.filter(user__username=options['user'])
+
+        checked = 0
+        stale = []
+        for plan in plans.iterator(chunk_size=options['batch_size']):
+            checked += 1
+            totals = MealPlan.totals_from_annotations(plan)
+            if not self.is_stale(plan, totals):
+                continue
+            stale.append(plan.pk)
+            if options['verify']:
+                self.stdout.write(f"  ❌ {plan}: stored {plan.calories_total} cal / "
+                                  f"{plan.entry_count} entries, actual {totals['calories_total']} cal / "
+                                  f"{totals['entry_count']} entries")
+
+        if not options['verify']:
+            # refresh_totals also moves updated_at (API ETags), syncs the rollups and drops cached pages
+            batch_size = options['batch_size']
+            for start in range(0, len(stale), batch_size):
+                MealPlan.objects.filter(pk__in=stale[start:start + batch_size]).refresh_totals(batch_size)
+
+        if options['verify']:
+            self.stdout.write(f"🔍 Checked {checked} meal plans, {len(stale)} out of date")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"✅ Checked {checked} meal plans, rebuilt {len(stale)}"))
+
+    @staticmethod
+    def is_stale(plan, totals):
+        for field, value in totals.items():
+            if abs(getattr(plan, field) - value) > 0.01:
+                return True
+        return False
@@ -0,0 +1,195 @@
+"""Per-request performance metrics.
+
+RequestMetricsMiddleware counts the SQL queries of every request and times
+the database, template rendering and the remaining Python work. The numbers
+go out as a Server-Timing header (visible in the browser's network panel)
+and as one log line on the `nutrition.performance` logger. Requests that run
+the same SQL over and over with different parameters are logged as likely
+N+1 queries.
+
+Only counters and the text of repeated statements are kept, so it is cheap
+enough to leave on in production.
+
+The middleware is async-capable, so under ASGI it doesn't force async views
+back onto a thread. Their queries run on the request's database thread
+(sync_to_async), so that is where the query counters are installed.
+
+Django has no production hook around template rendering (the
+template_rendered signal is only sent under the test runner), so
+Template.render is wrapped - but only while at least one request is in
+flight (see timed_templates), never at import time, and outside requests
+management commands and tests see Django's own method.
+"""
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.template.base import Template
+
+logger = logging.getLogger('nutrition.performance')
+
+# metrics of the request being handled in this thread / task
+_current = ContextVar('nutrition_request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        # db time spent inside templates, so it isn't counted twice
+        self.template_db_time = 0.0
+        self.template_depth = 0
+        self.statements = {}
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.db_time += elapsed
+            if self.template_depth:
+                self.template_db_time += elapsed
+            # only reads can be N+1s; batched INSERTs/UPDATEs repeat the same SQL by design
+            if sql.lstrip()[:6].upper() == 'SELECT':
+                statement = self.statements.setdefault(sql, [0, set()])
+                statement[0] += 1
+                # two different parameter sets are enough to tell a loop from a repeated lookup
+                if len(statement[1]) < 2:
+                    statement[1].add(repr(params))
+
+    def repeated_statements(self, threshold):
+        """(sql, times run) for SELECTs run `threshold`+ times with different parameters."""
+        return [
+            (sql, calls) for sql, (calls, distinct_params) in self.statements.items()
+            if calls >= threshold and len(distinct_params) > 1
+        ]
+
+
+def _instrumented_render(render):
+    def wrapper(self, context):
+        metrics = _current.get()
+        if metrics is None:
+            return render(self, context)
+        # only the outermost render is timed; includes and extends are inside it
+        metrics.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            metrics.template_depth -= 1
+            if not metrics.template_depth:
+                metrics.template_time += time.perf_counter() - started
+    return wrapper
+
+
+_patch_lock = threading.Lock()
+_patch = {'requests': 0, 'original': None, 'wrapper': None}
+
+
+@contextmanager
+def timed_templates():
+    """Wrap Template.render while the block runs; concurrent requests share one wrapper."""
+    with _patch_lock:
+        if not _patch['requests']:
+            _patch['original'] = Template.render
+            _patch['wrapper'] = Template.render = _instrumented_render(Template.render)
+        _patch['requests'] += 1
+    try:
+        yield
+    finally:
+        with _patch_lock:
+            _patch['requests'] -= 1
+            # leave it alone if something else has wrapped it since
+            if not _patch['requests'] and Template.render is _patch['wrapper']:
+                Template.render = _patch['original']
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'N_PLUS_ONE_THRESHOLD', 5)
+        self.server_timing = getattr(settings, 'SERVER_TIMING_HEADER', True)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                stack.enter_context(timed_templates())
+                self.count_queries(stack, metrics)
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        stack = ExitStack()
+        try:
+            stack.enter_context(timed_templates())
+            await sync_to_async(self.count_queries)(stack, metrics)
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            _current.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    def count_queries(self, stack, metrics):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(metrics.record_query))
+
+    def finish(self, request, response, metrics, started):
+        total = time.perf_counter() - started
+
+        template_time = metrics.template_time - metrics.template_db_time
+        timings = {
+            'db': metrics.db_time,
+            'tpl': template_time,
+            'app': max(0.0, total - metrics.db_time - template_time),
+            'total': total,
+        }
+        if self.server_timing:
+            response['Server-Timing'] = ', '.join(
+                [f'db;dur={timings["db"] * 1000:.1f};desc="{metrics.queries} queries"']
+                + [f'{name};dur={value * 1000:.1f}' for name, value in timings.items() if name != 'db']
+            )
+        self.log(request, response, metrics, timings)
+        return response
+
+    def log(self, request, response, metrics, timings):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else None
+        fields = {
+            'view': view,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            **{f'{name}_ms': round(value * 1000, 1) for name, value in timings.items()},
+        }
+        logger.info(' '.join(f'{key}={value}' for key, value in fields.items()), extra={'metrics': fields})
+
+        for sql, calls in metrics.repeated_statements(self.threshold):
+            logger.warning(
+                'possible N+1 in %s: %d x %s', view or request.path, calls, sql[:300],
+                extra={'metrics': dict(fields, repeated_sql=sql, repeated_calls=calls)},
+            )
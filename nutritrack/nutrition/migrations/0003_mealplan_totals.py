@@ -0,0 +1,81 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:00
+
+from django.db import migrations, models
+
+
+def scale_factor(entry):
+    # unit scaling as implemented by MealEntry.get_scale_factor() at this point
+    if entry.unit == 'g':
+        return entry.quantity / 100
+    elif entry.unit == 'cup':
+        return entry.quantity * 2.4
+    elif entry.unit == 'tbsp':
+        return entry.quantity * 0.15
+    return entry.quantity
+
+
+def backfill_totals(apps, schema_editor):
+    MealPlan = apps.get_model('nutrition', 'MealPlan')
+    MealEntry = apps.get_model('nutrition', 'MealEntry')
+    for plan in MealPlan.objects.all().iterator():
+        totals = {
+            'calories_total': 0, 'protein_total': 0, 'carbs_total': 0,
+            'fats_total': 0, 'fiber_total': 0, 'sodium_total': 0, 'entry_count': 0,
+        }
+        for entry in MealEntry.objects.filter(meal_plan=plan).select_related('food'):
+            factor = scale_factor(entry)
+            food = entry.food
+            totals['calories_total'] += round(food.calories * factor)
+            totals['protein_total'] += (food.protein or 0) * factor
+            totals['carbs_total'] += (food.carbs or 0) * factor
+            totals['fats_total'] += (food.fats or 0) * factor
+            totals['fiber_total'] += (food.fiber or 0) * factor
+            totals['sodium_total'] += (food.sodium or 0) * factor
+            totals['entry_count'] += 1
+        MealPlan.objects.filter(pk=plan.pk).update(**totals)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrition', '0002_userprofile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mealplan',
+            name='calories_total',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mealplan',
+            name='carbs_total',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mealplan',
+            name='entry_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mealplan',
+            name='fats_total',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mealplan',
+            name='fiber_total',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mealplan',
+            name='protein_total',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mealplan',
+            name='sodium_total',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
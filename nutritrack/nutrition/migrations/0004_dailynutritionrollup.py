@@ -0,0 +1,61 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+TOTAL_FIELDS = [
+    'calories_total', 'protein_total', 'carbs_total', 'fats_total',
+    'fiber_total', 'sodium_total', 'entry_count',
+]
+
+
+def backfill_rollups(apps, schema_editor):
+    MealPlan = apps.get_model('nutrition', 'MealPlan')
+    DailyNutritionRollup = apps.get_model('nutrition', 'DailyNutritionRollup')
+    rollups = (
+        DailyNutritionRollup(
+            meal_plan_id=plan.pk,
+            user_id=plan.user_id,
+            date=plan.date,
+            goal_calories=plan.goal_calories,
+            **{field: getattr(plan, field) for field in TOTAL_FIELDS},
+        )
+        for plan in MealPlan.objects.all().iterator()
+    )
+    DailyNutritionRollup.objects.bulk_create(rollups, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrition', '0003_mealplan_totals'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyNutritionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('calories_total', models.IntegerField(default=0)),
+                ('protein_total', models.FloatField(default=0)),
+                ('carbs_total', models.FloatField(default=0)),
+                ('fats_total', models.FloatField(default=0)),
+                ('fiber_total', models.FloatField(default=0)),
+                ('sodium_total', models.FloatField(default=0)),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('date', models.DateField()),
+                ('goal_calories', models.IntegerField(default=2000)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('meal_plan', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rollup', to='nutrition.mealplan')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date'],
+                'unique_together': {('user', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
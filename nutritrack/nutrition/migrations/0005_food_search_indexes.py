@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:10
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+# Search indexes for Food.objects.search(). They only exist on PostgreSQL,
+# so they are created here instead of in Food.Meta.indexes (which would
+# break migrating the SQLite test database).
+SEARCH_INDEXES = [
+    GinIndex(SearchVector('name', config='english'), name='food_name_search_idx'),
+    GinIndex(OpClass('name', name='gin_trgm_ops'), name='food_name_trgm_idx'),
+]
+
+
+def add_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Food = apps.get_model('nutrition', 'Food')
+    for index in SEARCH_INDEXES:
+        schema_editor.add_index(Food, index)
+
+
+def remove_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Food = apps.get_model('nutrition', 'Food')
+    for index in SEARCH_INDEXES:
+        schema_editor.remove_index(Food, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrition', '0004_dailynutritionrollup'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(add_search_indexes, remove_search_indexes),
+    ]
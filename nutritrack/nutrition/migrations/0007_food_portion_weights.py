@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:31
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrition', '0006_week_templates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='food',
+            name='density',
+            field=models.FloatField(blank=True, help_text='g per ml, for ml/tsp/tbsp/cup (water is 1)', null=True, validators=[django.core.validators.MinValueValidator(0.01)]),
+        ),
+        migrations.AddField(
+            model_name='food',
+            name='grams_per_piece',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(0.1)]),
+        ),
+        migrations.AddField(
+            model_name='food',
+            name='grams_per_serving',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(0.1)]),
+        ),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:35
+
+import math
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+# unit table as in nutrition/units.py at this point (there are no FoodPortions yet)
+ML_PER_UNIT = {'ml': 1.0, 'cup': 240.0, 'tbsp': 15.0, 'tsp': 5.0}
+PORTION_FIELDS = {'piece': 'grams_per_piece', 'serving': 'grams_per_serving'}
+
+
+def grams(row):
+    if row.unit in ML_PER_UNIT:
+        return row.quantity * ML_PER_UNIT[row.unit] * (row.food.density or 1.0)
+    field = PORTION_FIELDS.get(row.unit)
+    return row.quantity * ((field and getattr(row.food, field)) or 100.0)
+
+
+def backfill_grams(apps, schema_editor):
+    for model_name in ['MealEntry', 'RecipeIngredient']:
+        model = apps.get_model('nutrition', model_name)
+        model.objects.filter(unit='g').update(grams=models.F('quantity'))
+        batch = []
+        for row in model.objects.exclude(unit='g').select_related('food').iterator(chunk_size=2000):
+            row.grams = grams(row)
+            batch.append(row)
+            if len(batch) >= 2000:
+                model.objects.bulk_update(batch, ['grams'])
+                batch = []
+        model.objects.bulk_update(batch, ['grams'])
+
+
+def backfill_plan_totals(apps, schema_editor):
+    # ml and tsp entries used to count as 100 g per unit; recompute the stored
+    # totals (same sums as MealPlan.recalculate_totals()) and their rollups
+    MealPlan = apps.get_model('nutrition', 'MealPlan')
+    MealEntry = apps.get_model('nutrition', 'MealEntry')
+    DailyNutritionRollup = apps.get_model('nutrition', 'DailyNutritionRollup')
+    totals = {}
+    for entry in MealEntry.objects.select_related('food').iterator(chunk_size=2000):
+        factor = entry.grams / 100
+        food = entry.food
+        plan = totals.setdefault(entry.meal_plan_id, {
+            'calories_total': 0, 'protein_total': 0, 'carbs_total': 0, 'fats_total': 0,
+            'fiber_total': 0, 'sodium_total': 0, 'entry_count': 0,
+        })
+        plan['calories_total'] += math.floor(food.calories * factor + 0.5)
+        for macro in ['protein', 'carbs', 'fats', 'fiber', 'sodium']:
+            plan[f'{macro}_total'] += (getattr(food, macro) or 0) * factor
+        plan['entry_count'] += 1
+    now = timezone.now()
+    for plan_id, values in totals.items():
+        MealPlan.objects.filter(pk=plan_id).update(updated_at=now, **values)
+        DailyNutritionRollup.objects.filter(meal_plan_id=plan_id).update(updated_at=now, **values)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrition', '0007_food_portion_weights'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mealentry',
+            name='grams',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipeingredient',
+            name='grams',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='FoodPortion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unit', models.CharField(choices=[('ml', 'Milliliters'), ('cup', 'Cup'), ('tbsp', 'Tablespoon'), ('tsp', 'Teaspoon'), ('piece', 'Piece'), ('serving', 'Serving')], max_length=10)),
+                ('grams', models.FloatField(validators=[django.core.validators.MinValueValidator(0.1)])),
+                ('description', models.CharField(blank=True, max_length=100)),
+                ('food', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='portions', to='nutrition.food')),
+            ],
+            options={
+                'ordering': ['food', 'unit'],
+                'unique_together': {('food', 'unit')},
+            },
+        ),
+        migrations.RunPython(backfill_grams, migrations.RunPython.noop),
+        migrations.RunPython(backfill_plan_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:42
+
+import math
+
+from django.db import migrations, models
+
+
+def backfill_recipe_totals(apps, schema_editor):
+    # same sums as RecipeTemplate.recalculate_totals(), from the stored grams
+    RecipeTemplate = apps.get_model('nutrition', 'RecipeTemplate')
+    RecipeIngredient = apps.get_model('nutrition', 'RecipeIngredient')
+    totals = {}
+    for ingredient in RecipeIngredient.objects.select_related('food').iterator(chunk_size=2000):
+        factor = ingredient.grams / 100
+        food = ingredient.food
+        recipe = totals.setdefault(ingredient.recipe_id, {
+            'calories_total': 0, 'protein_total': 0, 'carbs_total': 0, 'fats_total': 0,
+            'fiber_total': 0, 'sodium_total': 0, 'ingredient_count': 0, 'total_grams': 0,
+        })
+        recipe['calories_total'] += math.floor(food.calories * factor + 0.5)
+        for macro in ['protein', 'carbs', 'fats', 'fiber', 'sodium']:
+            recipe[f'{macro}_total'] += (getattr(food, macro) or 0) * factor
+        recipe['ingredient_count'] += 1
+        recipe['total_grams'] += ingredient.grams
+    for recipe_id, values in totals.items():
+        RecipeTemplate.objects.filter(pk=recipe_id).update(**values)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrition', '0008_meal_grams_food_portions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipetemplate',
+            name='calories_total',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='recipetemplate',
+            name='carbs_total',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='recipetemplate',
+            name='fats_total',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='recipetemplate',
+            name='fiber_total',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='recipetemplate',
+            name='ingredient_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='recipetemplate',
+            name='protein_total',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='recipetemplate',
+            name='sodium_total',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='recipetemplate',
+            name='total_grams',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(backfill_recipe_totals, migrations.RunPython.noop),
+    ]
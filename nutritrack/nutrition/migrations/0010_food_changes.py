@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrition', '0009_recipe_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FoodChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reweigh', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('food', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='nutrition.food')),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['processed_at', 'claimed_at'], name='foodchange_pending_idx')],
+            },
+        ),
+    ]
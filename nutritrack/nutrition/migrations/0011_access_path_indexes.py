@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrition', '0010_food_changes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='food',
+            index=models.Index(fields=['category', 'name'], name='food_category_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='food',
+            index=models.Index(condition=models.Q(('is_custom', True)), fields=['created_by', 'name'], name='food_custom_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mealentry',
+            index=models.Index(fields=['meal_plan', 'meal_type'], name='mealentry_plan_meal_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mealentry',
+            index=models.Index(fields=['food', 'meal_plan'], name='mealentry_food_plan_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipetemplate',
+            index=models.Index(fields=['user', '-created_at'], name='recipe_user_created_idx'),
+        ),
+    ]
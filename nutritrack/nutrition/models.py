@@ -1,8 +1,15 @@
-from django.db import models
+import math
+
+from django.db import models, connection, transaction
+from django.db.models import F, Q, Case, When, Sum, Count, FloatField, Value, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Least, Round
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 
+from .cache import invalidate_user, invalidate_users
+from . import units
+
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     profile_image = models.URLField(max_length=255, blank=True, null=True)
@@ -10,6 +17,33 @@ class UserProfile(models.Model):
     def __str__(self):
         return self.user.username
 
+# Database-side nutrition math. These mirror get_scale_factor()/scaled_*() so
+# totals can be summed in one query instead of loading every entry and food.
+# `prefix` is the path from the queried model to the entry/ingredient rows,
+# e.g. 'mealentry__' when annotating MealPlans.
+
+def scale_factor_expression(prefix=''):
+    # rows store their weight in grams (see WeighedQuantity), so no unit logic is needed here
+    return F(f'{prefix}grams') / Value(100.0)
+
+def nutrition_sum_expressions(prefix=''):
+    """Sum() expressions for calories and every macro, keyed by annotation name."""
+    factor = scale_factor_expression(prefix)
+    sums = {
+        'calories_sum': Sum(Round(F(f'{prefix}food__calories') * factor), output_field=FloatField()),
+    }
+    for macro in ['protein', 'carbs', 'fats', 'fiber', 'sodium']:
+        sums[f'{macro}_sum'] = Sum(
+            Coalesce(F(f'{prefix}food__{macro}'), Value(0.0)) * factor, output_field=FloatField()
+        )
+    return {name: Coalesce(expression, Value(0.0)) for name, expression in sums.items()}
+
+def round_calories(value):
+    # halves round up like SQL ROUND() (Python's round() goes to even), so the
+    # per-entry calories add up to the totals summed by the database
+    return math.floor(value + 0.5)
+
+
  #1 FoodCategory Model
 class FoodCategory(models.Model):
     name = models.CharField(max_length=50, unique=True) #uniqueness for the values
@@ -22,6 +56,43 @@ class FoodCategory(models.Model):
     def __str__(self):
         return f"{self.icon} {self.name}" if self.icon else self.name
 
+class FoodQuerySet(models.QuerySet):
+    def search(self, query, user=None):
+        """Foods matching `query`, best matches first.
+
+        On PostgreSQL this uses the full-text and trigram GIN indexes from
+        migration 0005 (typo tolerant); other databases fall back to a
+        case-insensitive substring match. Foods the user logs often get a
+        boost either way.
+        """
+        in_category = Q(category__in=FoodCategory.objects.filter(name__icontains=query).values('id'))
+        if connection.vendor == 'postgresql':
+            foods, relevance = self._postgres_search(query, in_category)
+        else:
+            foods = self.filter(Q(name__icontains=query) | in_category)
+            relevance = Case(When(name__istartswith=query, then=Value(1.0)), default=Value(0.5), output_field=FloatField())
+
+        if user is not None:
+            usage = (
+                MealEntry.objects.filter(food=OuterRef('pk'), meal_plan__user=user)
+                .order_by().values('food').annotate(times=Count('pk')).values('times')
+            )
+            foods = foods.annotate(usage=Coalesce(Subquery(usage), 0))
+            relevance = relevance + Least(F('usage'), 10) * Value(0.1)
+        return foods.annotate(relevance=relevance).order_by('-relevance', 'name', 'pk')
+
+    def _postgres_search(self, query, in_category):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+
+        # same expression as the food_name_search_idx index
+        vector = SearchVector('name', config='english')
+        search_query = SearchQuery(query, config='english', search_type='websearch')
+        foods = self.annotate(search=vector).filter(
+            Q(search=search_query) | Q(name__trigram_word_similar=query) | in_category
+        )
+        relevance = SearchRank(vector, search_query) + TrigramWordSimilarity(query, 'name')
+        return foods, relevance
+
   #2 Food Model
 class Food(models.Model):
     name = models.CharField(max_length=100)
@@ -35,6 +106,12 @@ class Food(models.Model):
     fats = models.FloatField(null=True, blank=True, validators=[MinValueValidator(0)])
     fiber = models.FloatField(null=True, blank=True, validators=[MinValueValidator(0)])
     sodium = models.FloatField(null=True, blank=True, validators=[MinValueValidator(0)])
+
+    # Portion weights for the non-gram units (see units.py); empty means the default
+    density = models.FloatField(null=True, blank=True, validators=[MinValueValidator(0.01)],
+                                help_text="g per ml, for ml/tsp/tbsp/cup (water is 1)")
+    grams_per_piece = models.FloatField(null=True, blank=True, validators=[MinValueValidator(0.1)])
+    grams_per_serving = models.FloatField(null=True, blank=True, validators=[MinValueValidator(0.1)])
     
     # Custom food tracking
     is_custom = models.BooleanField(default=False) #user manually added this food
@@ -42,15 +119,150 @@ class Food(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = FoodQuerySet.as_manager()
+
+    NUTRITION_FIELDS = ['calories', 'protein', 'carbs', 'fats', 'fiber', 'sodium']
+    # fields that change what a non-gram quantity of the food weighs
+    WEIGHT_FIELDS = ['density', 'grams_per_piece', 'grams_per_serving']
     
     class Meta:
         ordering = ['category', 'name']
+        indexes = [
+            # catalogue pages (pagination.CATALOGUE_ORDER) and category filters; Meta.ordering sorts by
+            # category__name through a join, which this index doesn't cover
+            models.Index(fields=['category', 'name'], name='food_category_name_idx'),
+            # a user's custom foods, a small slice of the catalogue
+            models.Index(fields=['created_by', 'name'], condition=Q(is_custom=True), name='food_custom_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_values()
+        return instance
     
     def __str__(self):
         return f"{self.name} ({self.calories} cal/100g)"
 
+    def remember_values(self):
+        # the values as in the database, so saves can tell whether stored totals need refreshing
+        self._loaded_values = {field: self.__dict__[field]
+                               for field in self.NUTRITION_FIELDS + self.WEIGHT_FIELDS if field in self.__dict__}
+
+    def changed_fields(self):
+        """Nutrition and weight fields that differ from what was loaded (none for new foods)."""
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return []
+        return [field for field in self.NUTRITION_FIELDS + self.WEIGHT_FIELDS
+                if field in self.__dict__ and (field not in loaded or loaded[field] != self.__dict__[field])]
+
+    def weights_changed(self):
+        return any(field in self.WEIGHT_FIELDS for field in self.changed_fields())
+
+class MealPlanQuerySet(models.QuerySet):
+    def with_totals(self):
+        """Annotate each plan with calories_sum, protein_sum, ... and num_entries from its entries."""
+        return self.annotate(
+            num_entries=Count('mealentry'),
+            **nutrition_sum_expressions('mealentry__'),
+        )
+
+    def refresh_totals(self, batch_size=500):
+        """Recalculate the stored totals and rollups of every plan in the queryset.
+
+        For bulk writes (bulk_create, queryset deletes) that skip the signals.
+        Returns the number of plans refreshed.
+        """
+        refreshed = 0
+        batch = []
+        for plan in self.with_totals().order_by('pk').iterator(chunk_size=batch_size):
+            for field, value in MealPlan.totals_from_annotations(plan).items():
+                setattr(plan, field, value)
+            plan.updated_at = timezone.now()
+            batch.append(plan)
+            if len(batch) >= batch_size:
+                refreshed += self._save_totals(batch)
+                batch = []
+        if batch:
+            refreshed += self._save_totals(batch)
+        return refreshed
+
+    @staticmethod
+    def _save_totals(plans):
+        rollups = [DailyNutritionRollup(meal_plan_id=plan.pk, **DailyNutritionRollup.values_from_plan(plan))
+                   for plan in plans]
+        invalidate_users(plan.user_id for plan in plans)
+        with transaction.atomic():
+            MealPlan.objects.bulk_update(plans, MealPlan.TOTAL_FIELDS + ['entry_count', 'updated_at'])
+            DailyNutritionRollup.objects.bulk_create(
+                rollups,
+                update_conflicts=True,
+                unique_fields=['meal_plan'],
+                update_fields=['user', 'date', 'goal_calories', 'entry_count', 'updated_at'] + MealPlan.TOTAL_FIELDS,
+            )
+        return len(plans)
+
+class StoredNutrition(models.Model):
+    """Stored calorie and macro totals, summed from a set of entries or ingredients."""
+    calories_total = models.IntegerField(default=0)
+    protein_total = models.FloatField(default=0)
+    carbs_total = models.FloatField(default=0)
+    fats_total = models.FloatField(default=0)
+    fiber_total = models.FloatField(default=0)
+    sodium_total = models.FloatField(default=0)
+
+    TOTAL_FIELDS = ['calories_total', 'protein_total', 'carbs_total', 'fats_total', 'fiber_total', 'sodium_total']
+
+    class Meta:
+        abstract = True
+
+    @staticmethod
+    def totals_from_sums(row):
+        """Turn nutrition_sum_expressions() annotations into values for the stored total fields."""
+        totals = {field.replace('_sum', '_total'): getattr(row, field) for field in nutrition_sum_expressions()}
+        totals['calories_total'] = round(totals['calories_total'])
+        return totals
+
+    def total_calories(self):
+        return self.calories_total #all calories from the foods eaten that day adds up.
+
+    def total_protein(self):
+        return round(self.protein_total, 1)
+    
+    def total_carbs(self):
+        return round(self.carbs_total, 1)
+    
+    def total_fats(self):
+        return round(self.fats_total, 1)
+
+    def total_fiber(self):
+        return round(self.fiber_total, 1)
+
+    def total_sodium(self):
+        return round(self.sodium_total, 1)
+
+
+class NutritionTotals(StoredNutrition):
+    """Stored daily totals shared by MealPlan and its DailyNutritionRollup.
+
+    Kept in sync with the meal entries (see signals.py) so pages can read
+    them without looping over every entry.
+    """
+    entry_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    def calories_remaining(self):
+        return self.goal_calories - self.total_calories()
+    
+    def progress_percentage(self):
+        return min(100, round((self.total_calories() / self.goal_calories) * 100))
+
    #3 MealPlan Model
-class MealPlan(models.Model):
+class MealPlan(NutritionTotals):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     date = models.DateField()
     goal_calories = models.IntegerField(default=2000, validators=[MinValueValidator(1000)])
@@ -59,6 +271,8 @@ class MealPlan(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = MealPlanQuerySet.as_manager()
+
  #Each user can have one meal plan per day.
  #Used to store their calorie goal and notes.    
 
@@ -67,26 +281,86 @@ class MealPlan(models.Model):
         ordering = ['-date']
     def __str__(self):
         return f"{self.user.username} - {self.date}"
-    
-    def total_calories(self):
-        return sum(entry.scaled_calories() for entry in self.mealentry_set.all()) #all calories from the foods eaten that day adds up.
-    
-    def calories_remaining(self):
-        return self.goal_calories - self.total_calories()
-    
-    def total_protein(self):
-        return round(sum(entry.scaled_protein() for entry in self.mealentry_set.all()), 1)
-    
-    def total_carbs(self):
-        return round(sum(entry.scaled_carbs() for entry in self.mealentry_set.all()), 1)
-    
-    def total_fats(self):
-        return round(sum(entry.scaled_fats() for entry in self.mealentry_set.all()), 1)
-    
-    def progress_percentage(self):
-        return min(100, round((self.total_calories() / self.goal_calories) * 100))
+
+    @staticmethod
+    def totals_from_annotations(plan):
+        """Turn with_totals() annotations into values for the stored total fields."""
+        totals = MealPlan.totals_from_sums(plan)
+        totals['entry_count'] = plan.num_entries
+        return totals
+
+    @classmethod
+    def add_to_totals(cls, plan_id, values, entries=1, sign=1):
+        """Shift the stored totals of a plan by the nutrition of added (or removed) entries."""
+        updates = {field: F(field) + sign * values.get(field, 0) for field in cls.TOTAL_FIELDS}
+        updates['entry_count'] = F('entry_count') + sign * entries
+        updates['updated_at'] = timezone.now()
+        cls.objects.filter(pk=plan_id).update(**updates)
+        if not DailyNutritionRollup.objects.filter(meal_plan_id=plan_id).update(**updates):
+            for plan in cls.objects.filter(pk=plan_id):
+                DailyNutritionRollup.sync_plan(plan)
+
+    def recalculate_totals(self):
+        """Rebuild the stored totals from the plan's entries (used after bulk writes)."""
+        totals = self.totals_from_annotations(MealPlan.objects.with_totals().get(pk=self.pk))
+        for field, value in totals.items():
+            setattr(self, field, value)
+        self.updated_at = timezone.now()
+        MealPlan.objects.filter(pk=self.pk).update(updated_at=self.updated_at, **totals)
+        DailyNutritionRollup.sync_plan(self)
+        invalidate_user(self.user_id)
+        return totals
+
+    def meals(self, meal_types=None):
+        """The plan's entries grouped by meal type (see group_by_meal), loaded in one query."""
+        return group_by_meal(self.mealentry_set.select_related('food'), meal_types)
+
+class WeighedQuantity(models.Model):
+    """A quantity of a food in some unit, with its weight in grams stored alongside.
+
+    `grams` is worked out on save() from the unit table and the food's
+    portions (see units.py), so totals don't have to convert units. Code
+    that writes with bulk_create must call fill_grams() first.
+    """
+    grams = models.FloatField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def compute_grams(self):
+        if self.unit == 'g':
+            return self.quantity
+        portions = FoodPortion.weights_for([self.food_id]).get(self.food_id)
+        return units.grams(self.quantity, self.unit, self.food, portions)
+
+    def save(self, *args, **kwargs):
+        self.grams = self.compute_grams()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'grams'}
+        super().save(*args, **kwargs)
+
+    def get_scale_factor(self):
+        # multiple of the per-100g nutrition; unsaved rows work their weight out on the fly
+        return (self.grams or self.compute_grams()) / 100
+
+def fill_grams(items):
+    """Set `grams` on unsaved MealEntry/RecipeIngredient objects before a bulk_create.
+
+    Costs at most two queries (foods and portions of the rows not in grams).
+    """
+    items = list(items)
+    food_ids = {item.food_id for item in items if item.unit != 'g'}
+    foods = Food.objects.only(*units.PORTION_FIELDS.values(), 'density').in_bulk(food_ids) if food_ids else {}
+    portions = FoodPortion.weights_for(food_ids)
+    for item in items:
+        if item.unit == 'g':
+            item.grams = item.quantity
+        else:
+            item.grams = units.grams(item.quantity, item.unit, foods.get(item.food_id), portions.get(item.food_id))
+    return items
+
  #4 MealEntry Model       
-class MealEntry(models.Model):
+class MealEntry(WeighedQuantity):
     MEAL_TYPES = [
         ('breakfast', 'Breakfast'),
         ('lunch', 'Lunch'),
@@ -94,15 +368,7 @@ class MealEntry(models.Model):
         ('snack', 'Snack'),
     ]
     
-    UNIT_CHOICES = [
-        ('g', 'Grams'),
-        ('ml', 'Milliliters'),
-        ('cup', 'Cup'),
-        ('tbsp', 'Tablespoon'),
-        ('tsp', 'Teaspoon'),
-        ('piece', 'Piece'),
-        ('serving', 'Serving'),
-    ]
+    UNIT_CHOICES = units.UNIT_CHOICES
     
     meal_plan = models.ForeignKey(MealPlan, on_delete=models.CASCADE)
     food = models.ForeignKey(Food, on_delete=models.CASCADE)
@@ -114,23 +380,25 @@ class MealEntry(models.Model):
     
     class Meta:
         ordering = ['meal_type', 'added_at']
+        indexes = [
+            # a plan's entries of one meal
+            models.Index(fields=['meal_plan', 'meal_type'], name='mealentry_plan_meal_idx'),
+            # a food's entries and the plans they are in (food_detail, search usage, propagation)
+            models.Index(fields=['food', 'meal_plan'], name='mealentry_food_plan_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember the plan the entry was loaded with so moving it updates both plans
+        instance._loaded_meal_plan_id = instance.__dict__.get('meal_plan_id')
+        return instance
     
     def __str__(self):
         return f"{self.meal_plan.date} - {self.meal_type}: {self.food.name}"
     
-    def get_scale_factor(self):
-        # Convert different units to 100g equivalent
-        if self.unit == 'g':
-            return self.quantity / 100
-        elif self.unit == 'cup':
-            return self.quantity * 2.4  # Approximate conversion
-        elif self.unit == 'tbsp':
-            return self.quantity * 0.15
-        else:
-            return self.quantity  # Default for pieces/servings
-    
     def scaled_calories(self):
-        return round(self.food.calories * self.get_scale_factor())
+        return round_calories(self.food.calories * self.get_scale_factor())
     
     def scaled_protein(self):
         return (self.food.protein or 0) * self.get_scale_factor()
@@ -141,39 +409,128 @@ class MealEntry(models.Model):
     def scaled_fats(self):
         return (self.food.fats or 0) * self.get_scale_factor()
 
+    def scaled_fiber(self):
+        return (self.food.fiber or 0) * self.get_scale_factor()
+
+    def scaled_sodium(self):
+        return (self.food.sodium or 0) * self.get_scale_factor()
+
+    def nutrition_values(self):
+        """This entry's share of the stored MealPlan totals."""
+        factor = self.get_scale_factor()
+        food = self.food
+        values = {'calories_total': round_calories(food.calories * factor)}
+        for macro in ['protein', 'carbs', 'fats', 'fiber', 'sodium']:
+            values[f'{macro}_total'] = (getattr(food, macro) or 0) * factor
+        return values
+
+def group_by_meal(entries, meal_types=None):
+    """Split entries into one section per meal type, in `meal_types` order.
+
+    Each section is a dict with meal_type, label, entries and the calorie
+    subtotal, so templates don't have to filter or sum themselves. Entries
+    should come with their food (select_related) to avoid a query per row.
+    """
+    meals = [{'meal_type': meal_type, 'label': label, 'entries': [], 'calories': 0}
+             for meal_type, label in meal_types or MealEntry.MEAL_TYPES]
+    sections = {meal['meal_type']: meal for meal in meals}
+    for entry in entries:
+        meal = sections.get(entry.meal_type)
+        if meal is not None:
+            meal['entries'].append(entry)
+            meal['calories'] += entry.scaled_calories()
+    return meals
+
+class RecipeTemplateQuerySet(models.QuerySet):
+    def with_totals(self):
+        """Annotate each recipe with calories_sum, protein_sum, ..., grams_sum and num_ingredients."""
+        return self.annotate(
+            num_ingredients=Count('recipeingredient'),
+            grams_sum=Coalesce(Sum('recipeingredient__grams'), Value(0.0)),
+            **nutrition_sum_expressions('recipeingredient__'),
+        )
+
+    def containing(self, food_ids):
+        """Recipes using any of the foods, matched through a subquery so with_totals() still sees every ingredient."""
+        return self.filter(pk__in=RecipeIngredient.objects.filter(food_id__in=food_ids).values('recipe_id'))
+
+    def refresh_totals(self, batch_size=500):
+        """Recalculate the stored totals of every recipe in the queryset.
+
+        For bulk writes and Food nutrition edits that skip the ingredient
+        signals. Returns the number of recipes refreshed.
+        """
+        refreshed = 0
+        batch = []
+        for recipe in self.with_totals().order_by('pk').iterator(chunk_size=batch_size):
+            for field, value in RecipeTemplate.totals_from_annotations(recipe).items():
+                setattr(recipe, field, value)
+            recipe.updated_at = timezone.now()
+            batch.append(recipe)
+            if len(batch) >= batch_size:
+                refreshed += self._save_totals(batch)
+                batch = []
+        if batch:
+            refreshed += self._save_totals(batch)
+        return refreshed
+
+    @staticmethod
+    def _save_totals(recipes):
+        RecipeTemplate.objects.bulk_update(recipes, RecipeTemplate.TOTAL_FIELDS + ['ingredient_count', 'total_grams', 'updated_at'])
+        return len(recipes)
+
  #5 RecipeTemplate Model
-class RecipeTemplate(models.Model):
+class RecipeTemplate(StoredNutrition):
+    """A saved list of ingredients that can be added to a meal in one go.
+
+    The recipe's nutrition, ingredient count and weight are stored on it
+    (kept in step by the ingredient and Food signals, see signals.py), so
+    recipe lists don't have to load the ingredients.
+    """
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     
     ingredients = models.ManyToManyField(Food, through='RecipeIngredient')
+
+    ingredient_count = models.PositiveIntegerField(default=0)
+    total_grams = models.FloatField(default=0)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = RecipeTemplateQuerySet.as_manager()
     
     class Meta:
         ordering = ['name']
+        indexes = [
+            # My Recipes, newest first
+            models.Index(fields=['user', '-created_at'], name='recipe_user_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username}'s {self.name}"
-    
-    def total_calories(self):
-        return sum(ing.scaled_calories() for ing in self.recipeingredient_set.all())
-    
-    def ingredient_count(self):
-        return self.recipeingredient_set.count()
+
+    @staticmethod
+    def totals_from_annotations(recipe):
+        """Turn with_totals() annotations into values for the stored total fields."""
+        totals = RecipeTemplate.totals_from_sums(recipe)
+        totals['ingredient_count'] = recipe.num_ingredients
+        totals['total_grams'] = recipe.grams_sum
+        return totals
+
+    def recalculate_totals(self):
+        """Rebuild the stored totals from the recipe's ingredients."""
+        totals = self.totals_from_annotations(RecipeTemplate.objects.with_totals().get(pk=self.pk))
+        for field, value in totals.items():
+            setattr(self, field, value)
+        self.updated_at = timezone.now()
+        RecipeTemplate.objects.filter(pk=self.pk).update(updated_at=self.updated_at, **totals)
+        return totals
+
   #6 RecipeIngredient Model
-class RecipeIngredient(models.Model):
-    UNIT_CHOICES = [
-        ('g', 'Grams'),
-        ('ml', 'Milliliters'),
-        ('cup', 'Cup'),
-        ('tbsp', 'Tablespoon'),
-        ('tsp', 'Teaspoon'),
-        ('piece', 'Piece'),
-        ('serving', 'Serving'),
-    ]
+class RecipeIngredient(WeighedQuantity):
+    UNIT_CHOICES = units.UNIT_CHOICES
     
     recipe = models.ForeignKey(RecipeTemplate, on_delete=models.CASCADE)
     food = models.ForeignKey(Food, on_delete=models.CASCADE)
@@ -183,19 +540,142 @@ class RecipeIngredient(models.Model):
     
     class Meta:
         unique_together = ('recipe', 'food')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember the recipe the ingredient was loaded with so moving it updates both recipes
+        instance._loaded_recipe_id = instance.__dict__.get('recipe_id')
+        return instance
     
     def __str__(self):
         return f"{self.recipe.name}: {self.quantity}{self.unit} {self.food.name}"
     
-    def get_scale_factor(self):
-        if self.unit == 'g':
-            return self.quantity / 100
-        elif self.unit == 'cup':
-            return self.quantity * 2.4
-        elif self.unit == 'tbsp':
-            return self.quantity * 0.15
-        else:
-            return self.quantity
-    
     def scaled_calories(self):
-        return round(self.food.calories * self.get_scale_factor())
+        return round_calories(self.food.calories * self.get_scale_factor())
+
+
+ #7 DailyNutritionRollup Model
+class DailyNutritionRollup(NutritionTotals):
+    """Narrow per-user, per-day copy of a MealPlan's goal and totals.
+
+    Analytics, the weekly view and the dashboard's recent days read this
+    table instead of MealPlan (notes and all) or joining entries to foods.
+    It is written whenever a plan's totals change; `backfill_rollups`
+    rebuilds it.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    date = models.DateField()
+    meal_plan = models.OneToOneField(MealPlan, on_delete=models.CASCADE, related_name='rollup')
+    goal_calories = models.IntegerField(default=2000)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('user', 'date')  # also the (user, date) range-scan index
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"{self.user_id} - {self.date}: {self.calories_total} cal"
+
+    @classmethod
+    def values_from_plan(cls, plan):
+        values = {'user_id': plan.user_id, 'date': plan.date, 'goal_calories': plan.goal_calories}
+        values.update({field: getattr(plan, field) for field in cls.TOTAL_FIELDS + ['entry_count']})
+        return values
+
+    @classmethod
+    def sync_plan(cls, plan):
+        """Copy a plan's goal and stored totals into its rollup row."""
+        cls.objects.update_or_create(meal_plan_id=plan.pk, defaults=cls.values_from_plan(plan))
+
+
+ #8 WeekTemplate Model
+class WeekTemplate(models.Model):
+    """A saved week of meals that can be stamped onto future weeks (see copying.py)."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    name = models.CharField(max_length=100)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('user', 'name')
+        ordering = ['name']
+
+    def __str__(self):
+        return f"{self.user.username}'s {self.name}"
+
+ #9 WeekTemplateEntry Model
+class WeekTemplateEntry(models.Model):
+    WEEKDAYS = [
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+        (5, 'Saturday'),
+        (6, 'Sunday'),
+    ]
+
+    template = models.ForeignKey(WeekTemplate, on_delete=models.CASCADE, related_name='entries')
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAYS)
+    food = models.ForeignKey(Food, on_delete=models.CASCADE)
+    meal_type = models.CharField(max_length=10, choices=MealEntry.MEAL_TYPES)
+    quantity = models.FloatField(default=100, validators=[MinValueValidator(0.1)])
+    unit = models.CharField(max_length=10, choices=MealEntry.UNIT_CHOICES, default='g')
+
+    class Meta:
+        ordering = ['weekday', 'meal_type', 'pk']
+
+    def __str__(self):
+        return f"{self.template.name} - {self.get_weekday_display()} {self.meal_type}: {self.food.name}"
+
+ #10 FoodPortion Model
+class FoodPortion(models.Model):
+    """Weight of one unit (cup, piece, serving, ...) of a particular food, see units.py."""
+    food = models.ForeignKey(Food, on_delete=models.CASCADE, related_name='portions')
+    unit = models.CharField(max_length=10, choices=units.PORTION_UNIT_CHOICES)
+    grams = models.FloatField(validators=[MinValueValidator(0.1)])
+    description = models.CharField(max_length=100, blank=True)  # e.g. "1 large egg"
+
+    class Meta:
+        unique_together = ('food', 'unit')
+        ordering = ['food', 'unit']
+
+    def __str__(self):
+        return f"1 {self.unit} {self.food.name} = {self.grams}g"
+
+    @classmethod
+    def weights_for(cls, food_ids):
+        """{food_id: {unit: grams}} for the given foods, in one query."""
+        weights = {}
+        if food_ids:
+            for food_id, unit, grams in cls.objects.filter(food_id__in=food_ids).values_list('food_id', 'unit', 'grams'):
+                weights.setdefault(food_id, {})[unit] = grams
+        return weights
+
+
+ #11 FoodChange Model
+class FoodChange(models.Model):
+    """A Food edit whose effect on stored totals hasn't been propagated yet.
+
+    Written by the Food/FoodPortion signals and worked off by
+    `manage.py propagate_food_changes` (see propagation.py). `reweigh`
+    means the food's portion weights changed, so the grams of its entries
+    and ingredients are recomputed before the totals.
+    """
+    food = models.ForeignKey(Food, on_delete=models.CASCADE, related_name='changes')
+    reweigh = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)  # taken by a worker
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['processed_at', 'claimed_at'], name='foodchange_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.food.name} changed {self.created_at:%Y-%m-%d %H:%M}"
@@ -0,0 +1,180 @@
+"""Keyset (cursor) pagination.
+
+Paginator pages with OFFSET, so page n makes the database read and throw
+away every row of the pages before it, and it needs a COUNT(*) on top.
+Here a page instead continues after the sort key of the previous page's
+last row:
+
+    WHERE (category_id, name, id) > (<last row's values>) ORDER BY category_id, name, id LIMIT 21
+
+which an index on the key walks straight to, so every page costs the same.
+The cursor in the "next" link is that last row's key, encoded (datetimes to
+the microsecond, so rows created in the same millisecond aren't skipped).
+`keys` must make the order unique (end them with the pk); a leading '-'
+sorts that key descending and nullable keys sort their NULLs last on every
+database. A key may also be an annotation of the queryset (e.g. a related
+name), which is treated as nullable; no index covers those, so each page
+then joins and sorts every matching row.
+
+Cursors come from the query string, so a decoded cursor is only used when
+it has one value per key and every value converts to its field's type;
+anything else gives the first page (see CursorPage.invalid).
+
+The count is optional: None skips it, 'exact' runs a COUNT(*), and
+'approximate' reads the planner's row estimate on PostgreSQL (one EXPLAIN,
+no scan) and falls back to COUNT(*) elsewhere; either is skipped when the
+first page holds everything. A number passed in (e.g. from the catalogue
+snapshot) is used as is.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import F, Q
+
+DEFAULT_PER_PAGE = 20
+# the food catalogue grouped by category (in category id order, uncategorised last), A-Z within each:
+# the key of the (category, name) index, unlike Food's Meta.ordering, which joins to sort by category name
+CATALOGUE_ORDER = ['category_id', 'name', 'pk']
+
+
+class CursorPage:
+    """One page of results; iterate it like a Paginator page."""
+
+    def __init__(self, object_list, next_cursor=None, count=None, cursor=None, invalid=False):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.count = count
+        self.cursor = cursor
+        # a cursor was given but couldn't be used, so this is the first page
+        self.invalid = invalid
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def is_first(self):
+        return not self.cursor
+
+
+def _json_default(value):
+    # dates and datetimes in full (DjangoJSONEncoder cuts datetimes to milliseconds), Decimals as strings
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values, default=_json_default).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """The raw key values in `cursor`, or None when it is missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        return None
+    return values if isinstance(values, list) else None
+
+
+def _parse(queryset, keys):
+    """(name, descending, nullable, field) for each key."""
+    parsed = []
+    annotations = queryset.query.annotations
+    for key in keys:
+        name = key.lstrip('-')
+        if name in annotations:
+            # annotations (e.g. of a related field over an outer join) may always be NULL
+            parsed.append((name, key.startswith('-'), True, annotations[name].output_field))
+            continue
+        field = queryset.model._meta.pk if name == 'pk' else queryset.model._meta.get_field(name)
+        parsed.append((name, key.startswith('-'), field.null, field))
+    return parsed
+
+
+def _convert(parsed, values):
+    """`values` as the key fields' Python types, or None when they don't fit the keys."""
+    if values is None or len(values) != len(parsed):
+        return None
+    converted = []
+    for (name, descending, nullable, field), value in zip(parsed, values):
+        if value is None:
+            if not nullable:
+                return None
+            converted.append(None)
+            continue
+        if not isinstance(value, (str, int, float, bool)):
+            return None
+        try:
+            converted.append(field.to_python(value))
+        except (ValidationError, TypeError, ValueError):
+            return None
+    return converted
+
+
+def _ordering(parsed):
+    ordering = []
+    for name, descending, nullable, _ in parsed:
+        if nullable:
+            expression = F(name)
+            ordering.append(expression.desc(nulls_last=True) if descending else expression.asc(nulls_last=True))
+        else:
+            ordering.append(f'-{name}' if descending else name)
+    return ordering
+
+
+def _after(parsed, values):
+    """Rows sorting after `values`: equal on the first i keys and past the (i+1)th, for any i."""
+    condition = Q(pk__in=[])
+    equal = Q()
+    for (name, descending, nullable, _), value in zip(parsed, values):
+        if value is not None:
+            past = Q(**{f'{name}__lt' if descending else f'{name}__gt': value})
+            if nullable:
+                past |= Q(**{f'{name}__isnull': True})  # NULLs come last
+            condition |= equal & past
+            equal &= Q(**{name: value})
+        else:
+            # nothing sorts past NULL on this key
+            equal &= Q(**{f'{name}__isnull': True})
+    return condition
+
+
+def approximate_count(queryset):
+    """The planner's row estimate on PostgreSQL, an exact count elsewhere."""
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def paginate(queryset, keys, cursor=None, per_page=DEFAULT_PER_PAGE, count=None):
+    """The page of `queryset`, ordered by `keys`, that follows `cursor` (the first page without one)."""
+    parsed = _parse(queryset, keys)
+    values = _convert(parsed, decode_cursor(cursor))
+
+    page = queryset.order_by(*_ordering(parsed))
+    if values is not None:
+        page = page.filter(_after(parsed, values))
+    rows = list(page[:per_page + 1])
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, name) for name, _, _, _ in parsed])
+
+    if count in ('exact', 'approximate') and values is None and next_cursor is None:
+        count = len(rows)  # everything fits on the first page
+    elif count == 'exact':
+        count = queryset.count()
+    elif count == 'approximate':
+        count = approximate_count(queryset)
+    return CursorPage(rows, next_cursor, count, cursor if values is not None else None,
+                      invalid=bool(cursor) and values is None)
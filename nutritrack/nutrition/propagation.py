@@ -0,0 +1,160 @@
+"""Propagating Food edits into the stored totals that depend on them.
+
+Meal plans and recipes store their nutrition totals (see NutritionTotals
+and RecipeTemplate), so correcting a food's calories, or its portion
+weights, leaves the totals of every plan and recipe using it stale. The
+Food/FoodPortion signals queue a FoodChange for each edit and this module
+works the queue off in the background (`manage.py propagate_food_changes`):
+
+1. claim a set of pending changes, so concurrent workers never take the
+   same ones (SELECT ... FOR UPDATE SKIP LOCKED where the database has it);
+2. for changes with `reweigh`, recompute the stored grams of the food's
+   non-gram entries and ingredients;
+3. find the affected plans and recipes through the indexed food_id
+   columns of MealEntry and RecipeIngredient;
+4. refresh their totals in batches, one transaction per batch, optionally
+   pausing between batches to keep the load on the database down.
+
+Every step is idempotent: a worker that dies leaves its claim behind and
+the changes are picked up again once the claim is older than CLAIM_TIMEOUT.
+
+Foods used by few rows (FOOD_CHANGE_INLINE_LIMIT entries and ingredients)
+are propagated right after the edit commits (process_now, called from the
+signals), so the stored totals never disagree with the live per-entry
+numbers for long. Bigger fan-outs wait for the command, which must run on
+a schedule, e.g. every minute from cron:
+
+    * * * * * cd /srv/nutritrack && python manage.py propagate_food_changes --sleep 0.1
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import FoodChange, MealPlan, MealEntry, RecipeTemplate, RecipeIngredient, fill_grams
+
+CLAIM_TIMEOUT = timedelta(minutes=30)
+DEFAULT_BATCH_SIZE = 500
+# foods used by at most this many entries and ingredients are propagated on commit
+DEFAULT_INLINE_LIMIT = 1000
+
+
+def queue_changes(food_ids, reweigh=False):
+    """Queue foods changed behind the signals' back (e.g. by a queryset update())."""
+    return FoodChange.objects.bulk_create([FoodChange(food_id=food_id, reweigh=reweigh) for food_id in food_ids])
+
+
+def pending():
+    """Changes not processed yet, claimed or not."""
+    return FoodChange.objects.filter(processed_at__isnull=True)
+
+
+def claim(limit=100):
+    """Mark up to `limit` pending changes as taken by this worker and return them."""
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            pending().filter(Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - CLAIM_TIMEOUT))
+            .select_for_update(skip_locked=True)
+            .order_by('pk').values_list('pk', flat=True)[:limit]
+        )
+        FoodChange.objects.filter(pk__in=ids).update(claimed_at=now)
+    return list(FoodChange.objects.filter(pk__in=ids))
+
+
+def reweigh(food_ids, batch_size=DEFAULT_BATCH_SIZE):
+    """Recompute the stored grams of the foods' entries and ingredients. Returns the number changed."""
+    changed = 0
+    for model in [MealEntry, RecipeIngredient]:
+        rows = (model.objects.filter(food_id__in=food_ids).exclude(unit='g')
+                .only('pk', 'food_id', 'quantity', 'unit', 'grams').order_by('pk'))
+        batch = []
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                changed += _save_grams(model, batch)
+                batch = []
+        if batch:
+            changed += _save_grams(model, batch)
+    return changed
+
+
+def _save_grams(model, batch):
+    stored = [row.grams for row in batch]
+    fill_grams(batch)
+    changed = [row for row, grams in zip(batch, stored) if abs(row.grams - grams) > 1e-9]
+    model.objects.bulk_update(changed, ['grams'])
+    return len(changed)
+
+
+def affected(food_ids):
+    """Ids of the meal plans and recipes using any of the foods, as (plan_ids, recipe_ids)."""
+    plan_ids = (MealEntry.objects.filter(food_id__in=food_ids)
+                .order_by('meal_plan_id').values_list('meal_plan_id', flat=True).distinct())
+    recipe_ids = (RecipeIngredient.objects.filter(food_id__in=food_ids)
+                  .order_by('recipe_id').values_list('recipe_id', flat=True).distinct())
+    return list(plan_ids), list(recipe_ids)
+
+
+def refresh(model, ids, batch_size=DEFAULT_BATCH_SIZE, pause=0, progress=None):
+    """Refresh the stored totals of the `model` rows in `ids`, a batch at a time.
+
+    `progress(model, done, total)` is called after every batch and
+    `pause` seconds are slept between batches.
+    """
+    done = 0
+    for i in range(0, len(ids), batch_size):
+        if i and pause:
+            time.sleep(pause)
+        done += model.objects.filter(pk__in=ids[i:i + batch_size]).refresh_totals(batch_size)
+        if progress:
+            progress(model, done, len(ids))
+    return done
+
+
+def process(changes, batch_size=DEFAULT_BATCH_SIZE, pause=0, progress=None):
+    """Propagate claimed changes; returns {'foods', 'reweighed', 'plans', 'recipes'} counts."""
+    food_ids = sorted({change.food_id for change in changes})
+    result = {'foods': len(food_ids), 'reweighed': 0, 'plans': 0, 'recipes': 0}
+    if not food_ids:
+        return result
+    reweigh_ids = sorted({change.food_id for change in changes if change.reweigh})
+    if reweigh_ids:
+        result['reweighed'] = reweigh(reweigh_ids, batch_size)
+
+    plan_ids, recipe_ids = affected(food_ids)
+    result['plans'] = refresh(MealPlan, plan_ids, batch_size, pause, progress)
+    result['recipes'] = refresh(RecipeTemplate, recipe_ids, batch_size, pause, progress)
+    FoodChange.objects.filter(pk__in=[change.pk for change in changes]).update(processed_at=timezone.now())
+    return result
+
+
+def process_now(change):
+    """Claim and process one change in this process when the food is used by few rows.
+
+    Returns True when it was processed; otherwise it stays queued for the command.
+    """
+    limit = getattr(settings, 'FOOD_CHANGE_INLINE_LIMIT', DEFAULT_INLINE_LIMIT)
+    uses = (MealEntry.objects.filter(food_id=change.food_id)[:limit + 1].count()
+            + RecipeIngredient.objects.filter(food_id=change.food_id)[:limit + 1].count())
+    if uses > limit:
+        return False
+    claimed = pending().filter(pk=change.pk, claimed_at__isnull=True).update(claimed_at=timezone.now())
+    if not claimed:
+        return False  # a worker got there first
+    process([change])
+    return True
+
+
+def run(limit=100, batch_size=DEFAULT_BATCH_SIZE, pause=0, progress=None):
+    """Claim and process pending changes until none are left; returns the summed counts."""
+    totals = {'foods': 0, 'reweighed': 0, 'plans': 0, 'recipes': 0}
+    while True:
+        changes = claim(limit)
+        if not changes:
+            return totals
+        for key, value in process(changes, batch_size, pause, progress).items():
+            totals[key] += value
@@ -0,0 +1,163 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.contrib.auth.models import User
+
+from . import propagation
+from .autocomplete import food_index
+from .cache import invalidate_catalogue, invalidate_user
+from .models import (
+    UserProfile, FoodCategory, Food, FoodPortion, MealPlan, MealEntry, DailyNutritionRollup,
+    RecipeTemplate, RecipeIngredient, FoodChange,
+)
+
+
+@receiver(post_save, sender=User)
+def create_user_profile(sender, instance, created, **kwargs):
+    if created:
+        UserProfile.objects.get_or_create(user=instance)
+        # never serve a new user data cached under a reused id
+        invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def save_user_profile(sender, instance, **kwargs):
+    if hasattr(instance, 'userprofile'):
+        instance.userprofile.save()
+
+
+# Keep the stored MealPlan totals in step with its entries.
+# Creates and deletes shift the totals by the entry's own values,
+# edits recalculate the affected plan(s) since the old values are gone.
+
+# set by bulk writers that refresh the totals themselves once they are done
+_totals_deferred = ContextVar('nutrition_totals_deferred', default=False)
+
+
+@contextmanager
+def defer_totals():
+    """Skip the per-entry totals updates; the caller must refresh_totals() the plans it touched."""
+    token = _totals_deferred.set(True)
+    try:
+        yield
+    finally:
+        _totals_deferred.reset(token)
+
+
+@receiver(post_save, sender=MealEntry)
+def update_plan_totals_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw or _totals_deferred.get():
+        return
+    if created:
+        MealPlan.add_to_totals(instance.meal_plan_id, instance.nutrition_values())
+        invalidate_user(instance.meal_plan.user_id)
+        return
+
+    instance.meal_plan.recalculate_totals()
+    old_plan_id = getattr(instance, '_loaded_meal_plan_id', None)
+    if old_plan_id and old_plan_id != instance.meal_plan_id:
+        for old_plan in MealPlan.objects.filter(pk=old_plan_id):
+            old_plan.recalculate_totals()
+    instance._loaded_meal_plan_id = instance.meal_plan_id
+
+
+@receiver(post_delete, sender=MealEntry)
+def update_plan_totals_on_delete(sender, instance, origin=None, **kwargs):
+    if _totals_deferred.get():
+        return
+    # the plan itself is going away with its entries (and rollup)
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin_model in (MealPlan, User):
+        return
+    MealPlan.add_to_totals(instance.meal_plan_id, instance.nutrition_values(), sign=-1)
+    invalidate_user(instance.meal_plan.user_id)
+
+
+@receiver(post_save, sender=MealPlan)
+def sync_rollup_on_plan_save(sender, instance, raw=False, **kwargs):
+    # goal or date changes; totals changes go through MealPlan.add_to_totals()
+    if not raw:
+        DailyNutritionRollup.sync_plan(instance)
+        invalidate_user(instance.user_id)
+
+
+@receiver(post_delete, sender=MealPlan)
+def invalidate_cache_on_plan_delete(sender, instance, **kwargs):
+    invalidate_user(instance.user_id)
+
+
+# Recipes store their totals too; any ingredient change recalculates the recipe.
+
+@receiver(post_save, sender=RecipeIngredient)
+def update_recipe_totals_on_save(sender, instance, raw=False, **kwargs):
+    if raw or _totals_deferred.get():
+        return
+    instance.recipe.recalculate_totals()
+    old_recipe_id = getattr(instance, '_loaded_recipe_id', None)
+    if old_recipe_id and old_recipe_id != instance.recipe_id:
+        RecipeTemplate.objects.filter(pk=old_recipe_id).refresh_totals()
+    instance._loaded_recipe_id = instance.recipe_id
+
+
+@receiver(post_delete, sender=RecipeIngredient)
+def update_recipe_totals_on_delete(sender, instance, origin=None, **kwargs):
+    if _totals_deferred.get():
+        return
+    # the recipe itself is going away with its ingredients
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin_model in (RecipeTemplate, User):
+        return
+    RecipeTemplate.objects.filter(pk=instance.recipe_id).refresh_totals()
+
+
+# Food edits change the totals of every plan and recipe using the food. Recipes
+# are few per food and refreshed right away; the rest is queued as a FoodChange,
+# processed on commit when few rows use the food and otherwise by the scheduled
+# `manage.py propagate_food_changes` (see propagation.py).
+
+@receiver(post_save, sender=Food)
+def queue_food_change(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if not created and instance.changed_fields():
+        reweigh = instance.weights_changed()
+        if not reweigh:
+            RecipeTemplate.objects.containing([instance.pk]).refresh_totals()
+        _propagate_on_commit(FoodChange.objects.create(food=instance, reweigh=reweigh))
+    instance.remember_values()
+
+
+def _propagate_on_commit(change):
+    transaction.on_commit(lambda: propagation.process_now(change))
+
+
+@receiver(post_save, sender=FoodPortion)
+@receiver(post_delete, sender=FoodPortion)
+def queue_portion_change(sender, instance, raw=False, origin=None, **kwargs):
+    # not when the food itself is being deleted
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if raw or origin_model is Food:
+        return
+    _propagate_on_commit(FoodChange.objects.create(food_id=instance.food_id, reweigh=True))
+
+
+@receiver(post_save, sender=Food)
+@receiver(post_delete, sender=Food)
+@receiver(post_save, sender=FoodPortion)
+@receiver(post_delete, sender=FoodPortion)
+def mark_autocomplete_stale(sender, **kwargs):
+    food_index.mark_stale()
+
+
+@receiver(post_save, sender=Food)
+@receiver(post_delete, sender=Food)
+@receiver(post_save, sender=FoodCategory)
+@receiver(post_delete, sender=FoodCategory)
+@receiver(post_save, sender=FoodPortion)
+@receiver(post_delete, sender=FoodPortion)
+def invalidate_catalogue_cache(sender, **kwargs):
+    invalidate_catalogue()
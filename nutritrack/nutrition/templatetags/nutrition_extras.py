@@ -2,15 +2,15 @@ from django import template
 
 register = template.Library()
 
+# Both filters work on lists already in memory (see MealPlan.meals()), so
+# using them in a loop doesn't cost a query per meal type.
+
 @register.filter
 def filter_by_meal_type(meal_entries, meal_type):
     """Filter meal entries by meal type (breakfast, lunch, dinner, snack)"""
-    return meal_entries.filter(meal_type=meal_type)
+    return [entry for entry in meal_entries if entry.meal_type == meal_type]
 
 @register.filter
 def sum_calories(meal_entries):
     """Calculate total calories from meal entries"""
-    total = 0
-    for entry in meal_entries:
-        total += (entry.food.calories * entry.quantity) / 100
-    return round(total, 1)
\ No newline at end of file
+    return sum(entry.scaled_calories() for entry in meal_entries)
@@ -1,3 +1,1232 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from importlib import import_module
+from io import StringIO
+import time
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import AsyncRequestFactory, RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from . import analytics, async_views, catalogue, index_advisor, propagation
+from .benchmark import QUERY_BUDGETS, find_regressions, run_benchmarks, seed_dataset
+from .cache import catalogue_version
+from .copying import apply_week_template, clone_days, clone_entries, save_week_template
+from .forms import CustomFoodForm
+from .management.commands import load_data
+from .middleware import RequestMetricsMiddleware
+from .pagination import encode_cursor, paginate
+from .models import DailyNutritionRollup, Food, FoodCategory, FoodChange, FoodPortion, MealPlan, MealEntry, RecipeTemplate, RecipeIngredient, UserProfile
+
+
+class WeeklyViewQueryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='secret')
+        self.food = Food.objects.create(name='Rice', calories=130, protein=2.7, carbs=28, fats=0.3)
+        self.week_start = date.today() - timedelta(days=date.today().weekday())
+        self.client.force_login(self.user)
+
+    def log_week(self, entries_per_day):
+        for i in range(5):
+            plan, _ = MealPlan.objects.get_or_create(user=self.user, date=self.week_start + timedelta(days=i))
+            for _ in range(entries_per_day):
+                MealEntry.objects.create(meal_plan=plan, food=self.food, meal_type='lunch', quantity=100)
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('nutrition:weekly_view'), {'week': self.week_start.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_query_count_does_not_grow_with_entries(self):
+        self.log_week(entries_per_day=1)
+        few, _ = self.count_queries()
+        self.log_week(entries_per_day=20)
+        many, response = self.count_queries()
+
+        self.assertEqual(few, many)
+        self.assertLessEqual(many, 5)
+        self.assertEqual(response.context['weekly_stats']['days_logged'], 5)
+        self.assertEqual(response.context['weekly_stats']['total_calories'], 5 * 21 * 130)
+
+    def test_missing_days_are_filled_in(self):
+        self.log_week(entries_per_day=2)
+        _, response = self.count_queries()
+
+        days = response.context['weekly_plans']
+        self.assertEqual(len(days), 7)
+        self.assertEqual([day['entries_count'] for day in days], [2, 2, 2, 2, 2, 0, 0])
+        self.assertIsNone(days[6]['plan'].pk)
+
+
+class DayPageQueryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='secret')
+        self.foods = [Food.objects.create(name=f'Food {i}', calories=100 + i) for i in range(4)]
+        self.plan = MealPlan.objects.create(user=self.user, date=date.today())
+        self.client.force_login(self.user)
+
+    def log_meals(self, per_meal):
+        for meal_type, _ in MealEntry.MEAL_TYPES:
+            for food in self.foods[:per_meal]:
+                MealEntry.objects.create(meal_plan=self.plan, food=food, meal_type=meal_type, quantity=100)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_query_count_does_not_grow_with_entries(self):
+        urls = [
+            reverse('nutrition:dashboard'),
+            reverse('nutrition:meal_plan_by_date', args=[self.plan.date.isoformat()]),
+            reverse('nutrition:meal_plan_detail', args=[self.plan.pk]),
+        ]
+        for url in urls:
+            self.count_queries(url)  # builds the catalogue snapshot
+        self.log_meals(per_meal=1)
+        few = [self.count_queries(url)[0] for url in urls]
+        self.log_meals(per_meal=4)  # cache is invalidated, so the dashboard is rebuilt too
+        many = [self.count_queries(url)[0] for url in urls]
+
+        self.assertEqual(few, many)
+
+    def test_meals_are_grouped_with_subtotals(self):
+        self.log_meals(per_meal=2)
+        _, response = self.count_queries(reverse('nutrition:meal_plan_detail', args=[self.plan.pk]))
+        meals = response.context['meals']
+
+        self.assertEqual([meal['meal_type'] for meal in meals], ['breakfast', 'lunch', 'dinner', 'snack'])
+        self.assertEqual([len(meal['entries']) for meal in meals], [2, 2, 2, 2])
+        self.assertEqual(meals[0]['calories'], 201)
+        self.assertContains(response, 'Food 1')
+
+
+class StoredTotalsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='secret')
+        self.client.force_login(self.user)
+        self.oats = Food.objects.create(name='Oats', calories=389, protein=17, carbs=66, fats=7)
+        self.plan = MealPlan.objects.create(user=self.user, date=date.today())
+
+    def rebuild(self, *args):
+        out = StringIO()
+        call_command('rebuild_totals', *args, stdout=out)
+        return out.getvalue()
+
+    def test_rebuild_refreshes_cached_pages_and_api_etags(self):
+        MealEntry.objects.create(meal_plan=self.plan, food=self.oats, meal_type='lunch', quantity=100)
+        MealPlan.objects.filter(pk=self.plan.pk).update(calories_total=1, entry_count=0)
+        url = reverse('nutrition:api_plan_detail', args=[self.plan.date.isoformat()])
+        stale = self.client.get(url)
+        self.assertEqual(self.client.get(reverse('nutrition:dashboard')).context['meal_plan'].calories_total, 1)
+        self.assertIn('1 out of date', self.rebuild('--verify'))
+
+        self.assertIn('rebuilt 1', self.rebuild())
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=stale['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['totals']['calories'], 389)
+        self.assertEqual(self.client.get(reverse('nutrition:dashboard')).context['meal_plan'].calories_total, 389)
+        self.assertEqual(MealPlan.objects.get(pk=self.plan.pk).rollup.calories_total, 389)
+        self.assertIn('0 out of date', self.rebuild('--verify'))
+
+    def assertTotals(self, plan, calories, protein, entry_count):
+        plan = MealPlan.objects.get(pk=plan.pk)
+        self.assertEqual(plan.calories_total, calories)
+        self.assertAlmostEqual(plan.protein_total, protein)
+        self.assertEqual(plan.entry_count, entry_count)
+
+    def test_entry_writes_keep_plan_totals_in_step(self):
+        egg = Food.objects.create(name='Egg', calories=155, protein=13)
+        entry = MealEntry.objects.create(meal_plan=self.plan, food=self.oats, meal_type='breakfast', quantity=100)
+        MealEntry.objects.create(meal_plan=self.plan, food=egg, meal_type='breakfast', quantity=50)
+        self.assertTotals(self.plan, 389 + 78, 17 + 6.5, 2)
+
+        entry.quantity = 50
+        entry.save()
+        self.assertTotals(self.plan, 195 + 78, 8.5 + 6.5, 2)
+
+        tomorrow = MealPlan.objects.create(user=self.user, date=date.today() + timedelta(days=1))
+        entry.meal_plan = tomorrow
+        entry.save()
+        self.assertTotals(self.plan, 78, 6.5, 1)
+        self.assertTotals(tomorrow, 195, 8.5, 1)
+
+        entry.delete()
+        self.assertTotals(tomorrow, 0, 0, 0)
+        self.assertTotals(self.plan, 78, 6.5, 1)
+        self.assertIn('Checked 2 meal plans, 0 out of date', self.rebuild('--verify'))
+
+    def test_grams_migration_recomputes_stored_totals(self):
+        milk = Food.objects.create(name='Milk', calories=64, protein=3.3, density=1.03)
+        MealEntry.objects.create(meal_plan=self.plan, food=milk, meal_type='breakfast', quantity=250, unit='ml')
+        MealEntry.objects.create(meal_plan=self.plan, food=self.oats, meal_type='breakfast', quantity=40)
+        expected = MealPlan.objects.get(pk=self.plan.pk)
+        # before 0008 the ml entry counted as 100 g per unit
+        MealEntry.objects.filter(unit='ml').update(grams=0)
+        MealPlan.objects.filter(pk=self.plan.pk).update(calories_total=16156, protein_total=831.8)
+        DailyNutritionRollup.objects.filter(meal_plan=self.plan).update(calories_total=16156)
+
+        migration = import_module('nutrition.migrations.0008_meal_grams_food_portions')
+        migration.backfill_grams(apps, None)
+        migration.backfill_plan_totals(apps, None)
+        self.assertTotals(self.plan, expected.calories_total, expected.protein_total, 2)
+        self.assertEqual(MealPlan.objects.get(pk=self.plan.pk).rollup.calories_total, expected.calories_total)
+        self.assertIn('0 out of date', self.rebuild('--verify'))
+
+
+class DailyRollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='secret')
+        self.oats = Food.objects.create(name='Oats', calories=389, protein=17, carbs=66, fats=7, fiber=10, sodium=2)
+        self.plan = MealPlan.objects.create(user=self.user, date=date.today(), goal_calories=2000)
+
+    def assertRollupMatchesPlan(self, plan):
+        plan = MealPlan.objects.get(pk=plan.pk)
+        rollup = DailyNutritionRollup.objects.get(meal_plan=plan)
+        self.assertEqual(DailyNutritionRollup.values_from_plan(rollup), DailyNutritionRollup.values_from_plan(plan))
+
+    def test_rollup_follows_entries_and_goal(self):
+        self.assertRollupMatchesPlan(self.plan)
+        entry = MealEntry.objects.create(meal_plan=self.plan, food=self.oats, meal_type='breakfast', quantity=100)
+        MealEntry.objects.create(meal_plan=self.plan, food=self.oats, meal_type='lunch', quantity=50)
+        self.assertRollupMatchesPlan(self.plan)
+        self.assertEqual(self.plan.rollup.calories_total, 584)
+
+        entry.delete()
+        self.assertRollupMatchesPlan(self.plan)
+        self.assertEqual(DailyNutritionRollup.objects.get(meal_plan=self.plan).entry_count, 1)
+
+        self.plan.goal_calories = 1800
+        self.plan.save()
+        self.assertRollupMatchesPlan(self.plan)
+        self.assertEqual(DailyNutritionRollup.objects.get(meal_plan=self.plan).goal_calories, 1800)
+
+        self.plan.delete()
+        self.assertFalse(DailyNutritionRollup.objects.exists())
+
+    def test_backfill_migration_copies_every_plan(self):
+        MealEntry.objects.create(meal_plan=self.plan, food=self.oats, meal_type='breakfast', quantity=100)
+        yesterday = MealPlan.objects.create(user=self.user, date=date.today() - timedelta(days=1))
+        DailyNutritionRollup.objects.all().delete()
+
+        migration = import_module('nutrition.migrations.0004_dailynutritionrollup')
+        migration.backfill_rollups(apps, None)
+        self.assertEqual(DailyNutritionRollup.objects.count(), 2)
+        self.assertRollupMatchesPlan(self.plan)
+        self.assertRollupMatchesPlan(yesterday)
+
+    def test_backfill_command_repairs_rollups(self):
+        MealEntry.objects.create(meal_plan=self.plan, food=self.oats, meal_type='breakfast', quantity=100)
+        DailyNutritionRollup.objects.filter(meal_plan=self.plan).update(calories_total=0, goal_calories=1)
+        call_command('backfill_rollups', stdout=StringIO())
+        self.assertRollupMatchesPlan(self.plan)
+
+
+class LoadDataTests(TestCase):
+    def load(self):
+        out = StringIO()
+        call_command('load_data', users=2, days=3, stdout=out)
+        return out.getvalue()
+
+    def counts(self):
+        return {model.__name__: model.objects.count() for model in (
+            User, UserProfile, FoodCategory, Food, RecipeTemplate, RecipeIngredient,
+            MealPlan, MealEntry, DailyNutritionRollup,
+        )}
+
+    def test_loads_a_consistent_dataset_once(self):
+        self.load()
+        counts = self.counts()
+        self.assertEqual(counts['User'], 2)
+        self.assertEqual(counts['UserProfile'], 2)
+        self.assertEqual(counts['FoodCategory'], len(load_data.CATEGORIES))
+        self.assertEqual(counts['Food'], len({row[0] for row in load_data.FOODS}))
+        self.assertEqual(counts['RecipeTemplate'], len([r for r in load_data.RECIPES if r['user'] in (
+            load_data.USERS[0]['username'], load_data.USERS[1]['username'])]))
+        self.assertGreater(counts['RecipeIngredient'], 0)
+        self.assertTrue(1 <= counts['MealPlan'] <= 6)
+        self.assertGreater(counts['MealEntry'], counts['MealPlan'])
+        self.assertEqual(counts['DailyNutritionRollup'], counts['MealPlan'])
+        self.assertEqual(sum(MealPlan.objects.values_list('entry_count', flat=True)), counts['MealEntry'])
+
+        out = self.load()
+        self.assertEqual(self.counts(), counts)
+        self.assertIn('Meal plans created: 0', out)
+        self.assertIn('Meal entries created: 0', out)
+
+        verify = StringIO()
+        call_command('rebuild_totals', '--verify', stdout=verify)
+        self.assertIn(f"Checked {counts['MealPlan']} meal plans, 0 out of date", verify.getvalue())
+
+
+class CopyEntriesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='secret')
+        self.rice = Food.objects.create(name='Rice', calories=130)
+        self.egg = Food.objects.create(name='Egg', calories=155)
+        self.day = date(2025, 3, 3)
+        self.plan = MealPlan.objects.create(user=self.user, date=self.day, goal_calories=1800)
+        for food, meal_type in [(self.egg, 'breakfast'), (self.rice, 'lunch'), (self.rice, 'lunch')]:
+            MealEntry.objects.create(meal_plan=self.plan, food=food, meal_type=meal_type, quantity=100)
+        self.client.force_login(self.user)
+
+    def test_repeat_day_is_idempotent(self):
+        url = reverse('nutrition:copy_day', args=[self.day.isoformat()])
+        self.client.get(url, {'days': 7})
+        self.client.get(url, {'days': 7})
+
+        plans = MealPlan.objects.filter(user=self.user, date__gt=self.day)
+        self.assertEqual(plans.count(), 7)
+        for plan in plans:
+            self.assertEqual(plan.entry_count, 3)
+            self.assertEqual(plan.calories_total, 155 + 130 * 2)
+            self.assertEqual(plan.goal_calories, 1800)
+
+    def test_query_count_does_not_grow_with_days(self):
+        sources = list(self.plan.mealentry_set.all())
+        with CaptureQueriesContext(connection) as one_day:
+            clone_entries(sources, self.user, [date(2025, 4, 1)])
+        with CaptureQueriesContext(connection) as many_days:
+            clone_entries(sources, self.user, [date(2025, 5, day) for day in range(1, 29)])
+        self.assertEqual(len(one_day), len(many_days))
+
+    def test_recipe_and_date_range_copies(self):
+        recipe = RecipeTemplate.objects.create(user=self.user, name='Egg fried rice')
+        RecipeIngredient.objects.create(recipe=recipe, food=self.rice, quantity=200)
+        RecipeIngredient.objects.create(recipe=recipe, food=self.egg, quantity=50)
+        self.client.post(reverse('nutrition:add_recipe_to_meal', args=[recipe.pk]), {'meal_type': 'dinner'})
+        today = MealPlan.objects.get(user=self.user, date=date.today())
+        self.assertEqual(today.entry_count, 2)
+        self.assertEqual(set(today.mealentry_set.values_list('meal_type', flat=True)), {'dinner'})
+        # a second serving of the same dish is logged again, unlike a copied day
+        self.client.post(reverse('nutrition:add_recipe_to_meal', args=[recipe.pk]), {'meal_type': 'dinner'})
+        self.assertEqual(MealPlan.objects.get(pk=today.pk).entry_count, 4)
+        self.assertEqual(MealPlan.objects.get(pk=today.pk).calories_total, 2 * today.calories_total)
+
+        self.assertEqual(clone_days(self.user, self.day, self.day + timedelta(days=1), date(2025, 6, 1)), 3)
+        self.assertEqual(MealPlan.objects.get(user=self.user, date=date(2025, 6, 1)).calories_total, 415)
+        self.assertFalse(MealPlan.objects.filter(user=self.user, date=date(2025, 6, 2)).exists())
+
+
+class WeekTemplateTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='secret')
+        self.rice = Food.objects.create(name='Rice', calories=130)
+        self.egg = Food.objects.create(name='Egg', calories=155)
+        self.monday = date(2025, 3, 3)
+        for offset, food, meal_type in [(0, self.egg, 'breakfast'), (0, self.rice, 'lunch'), (2, self.rice, 'dinner')]:
+            plan, _ = MealPlan.objects.get_or_create(user=self.user, date=self.monday + timedelta(days=offset))
+            MealEntry.objects.create(meal_plan=plan, food=food, meal_type=meal_type, quantity=100)
+        self.template = save_week_template(self.user, self.monday, 'Usual week')
+        self.first_week = self.monday + timedelta(weeks=1)
+        self.client.force_login(self.user)
+
+    def totals(self, day):
+        plan = MealPlan.objects.get(user=self.user, date=day)
+        return plan.entry_count, plan.calories_total
+
+    def test_apply_to_several_weeks_is_idempotent(self):
+        response = self.client.post(reverse('nutrition:apply_week_template', args=[self.template.pk]),
+                                    {'start': self.first_week + timedelta(days=3), 'weeks': 4, 'policy': 'merge'})
+        self.assertRedirects(response, reverse('nutrition:weekly_view') + f'?week={self.first_week}',
+                             fetch_redirect_response=False)
+        self.assertEqual(apply_week_template(self.template, self.first_week, weeks=4), 0)
+
+        for week in range(4):
+            monday = self.first_week + timedelta(weeks=week)
+            self.assertEqual(self.totals(monday), (2, 285))
+            self.assertEqual(self.totals(monday + timedelta(days=2)), (1, 130))
+        self.assertEqual(MealPlan.objects.filter(user=self.user, date__gt=self.monday + timedelta(days=6)).count(), 8)
+
+    def test_conflict_policies(self):
+        wednesday = self.first_week + timedelta(days=2)
+        plan = MealPlan.objects.create(user=self.user, date=wednesday)
+        MealEntry.objects.create(meal_plan=plan, food=self.egg, meal_type='snack', quantity=200)
+
+        apply_week_template(self.template, self.first_week, policy='skip')
+        self.assertEqual(self.totals(wednesday), (1, 310))
+        self.assertEqual(self.totals(self.first_week), (2, 285))
+
+        apply_week_template(self.template, self.first_week, policy='merge')
+        self.assertEqual(self.totals(wednesday), (2, 440))
+
+        apply_week_template(self.template, self.first_week, policy='replace')
+        self.assertEqual(self.totals(wednesday), (1, 130))
+        self.assertEqual(self.totals(self.first_week), (2, 285))
+
+    def test_query_count_does_not_grow_with_weeks(self):
+        apply_week_template(self.template, self.first_week, weeks=12)
+        with CaptureQueriesContext(connection) as one_week:
+            apply_week_template(self.template, self.first_week, weeks=1, policy='replace')
+        with CaptureQueriesContext(connection) as many_weeks:
+            apply_week_template(self.template, self.first_week, weeks=12, policy='replace')
+        self.assertEqual(len(one_week), len(many_weeks))
+
+
+class UnitConversionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='secret')
+        self.oil = Food.objects.create(name='Olive Oil', calories=884, fats=100, density=0.92)
+        self.egg = Food.objects.create(name='Egg', calories=155, protein=13, grams_per_piece=50)
+        self.soup = Food.objects.create(name='Soup', calories=40)
+        self.plan = MealPlan.objects.create(user=self.user, date=date(2025, 3, 3))
+
+    def add(self, food, quantity, unit):
+        return MealEntry.objects.create(meal_plan=self.plan, food=food, meal_type='lunch', quantity=quantity, unit=unit)
+
+    def test_units_use_food_portion_weights(self):
+        self.assertEqual(self.add(self.oil, 1, 'tbsp').scaled_calories(), 122)  # 15 ml x 0.92 g/ml
+        self.assertEqual(self.add(self.oil, 2, 'tsp').scaled_calories(), 81)
+        self.assertEqual(self.add(self.egg, 2, 'piece').scaled_calories(), 155)
+        self.assertEqual(self.add(self.egg, 1, 'serving').scaled_calories(), 155)  # no serving weight: 100g
+        self.assertEqual(self.add(self.soup, 250, 'ml').scaled_calories(), 100)
+        self.assertEqual(self.add(self.soup, 1, 'cup').scaled_calories(), 96)
+
+    def test_database_totals_match_python(self):
+        entries = [self.add(food, quantity, unit) for food, quantity, unit in [
+            (self.oil, 1.5, 'tbsp'), (self.oil, 3, 'tsp'), (self.egg, 3, 'piece'),
+            (self.soup, 330, 'ml'), (self.soup, 1.5, 'cup'), (self.egg, 120, 'g'),
+        ]]
+        plan = MealPlan.objects.with_totals().get(pk=self.plan.pk)
+
+        self.assertEqual(plan.calories_sum, sum(entry.scaled_calories() for entry in entries))
+        self.assertAlmostEqual(plan.fats_sum, sum(entry.scaled_fats() for entry in entries))
+        self.plan.refresh_from_db()
+        self.assertEqual(self.plan.calories_total, plan.calories_sum)
+
+    def test_food_portions_and_backfill(self):
+        rice = Food.objects.create(name='Rice', calories=130)
+        portion = FoodPortion.objects.create(food=rice, unit='cup', grams=158)
+        entry = self.add(rice, 2, 'cup')
+        self.assertEqual(entry.grams, 316)
+        self.assertEqual(entry.scaled_calories(), 411)
+
+        portion.grams = 180
+        portion.save()
+        out = StringIO()
+        call_command('backfill_grams', food=[rice.pk], stdout=out)
+        entry.refresh_from_db()
+        self.plan.refresh_from_db()
+        self.assertEqual(entry.grams, 360)
+        self.assertEqual(self.plan.calories_total, 468)
+        self.assertIn('Updated 1 meal entries, refreshed 1 meal plans', out.getvalue())
+
+
+class RecipeTotalsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='secret')
+        self.client.force_login(self.user)
+        self.oats = Food.objects.create(name='Oats', calories=389, protein=17, carbs=66)
+        self.milk = Food.objects.create(name='Milk', calories=42, protein=3.4)
+        self.recipe = RecipeTemplate.objects.create(user=self.user, name='Porridge')
+
+    def test_ingredient_changes_update_stored_totals(self):
+        oats = RecipeIngredient.objects.create(recipe=self.recipe, food=self.oats, quantity=50, unit='g')
+        RecipeIngredient.objects.create(recipe=self.recipe, food=self.milk, quantity=1, unit='cup')
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.ingredient_count, 2)
+        self.assertEqual(self.recipe.total_grams, 290)
+        self.assertEqual(self.recipe.calories_total, 195 + 101)
+        self.assertAlmostEqual(self.recipe.protein_total, 8.5 + 8.16)
+
+        oats.quantity = 100
+        oats.save()
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.calories_total, 389 + 101)
+        oats.delete()
+        self.recipe.refresh_from_db()
+        self.assertEqual((self.recipe.ingredient_count, self.recipe.calories_total), (1, 101))
+
+    def test_food_nutrition_edits_refresh_recipes(self):
+        RecipeIngredient.objects.create(recipe=self.recipe, food=self.oats, quantity=100, unit='g')
+        food = Food.objects.get(pk=self.oats.pk)
+        food.name = 'Rolled Oats'
+        with CaptureQueriesContext(connection) as queries:
+            food.save()
+        self.assertEqual(len(queries), 1)  # a rename leaves the totals alone
+
+        food.calories = 379
+        food.save()
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.calories_total, 379)
+
+    def test_recipe_list_query_count_does_not_grow(self):
+        def list_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse('nutrition:my_recipes'))
+            return len(queries)
+
+        RecipeIngredient.objects.create(recipe=self.recipe, food=self.oats, quantity=50, unit='g')
+        baseline = list_queries()
+        for i in range(15):  # one page; more would add the count of the paginated list
+            recipe = RecipeTemplate.objects.create(user=self.user, name=f'Recipe {i}')
+            RecipeIngredient.objects.create(recipe=recipe, food=self.oats, quantity=50, unit='g')
+            RecipeIngredient.objects.create(recipe=recipe, food=self.milk, quantity=200, unit='ml')
+        self.assertEqual(list_queries(), baseline)
+        response = self.client.get(reverse('nutrition:my_recipes'))
+        self.assertContains(response, '279 calories')
+
+
+class FoodChangePropagationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='secret')
+        self.rice = Food.objects.create(name='Rice', calories=130)
+        self.plans = []
+        for day in range(5):
+            plan = MealPlan.objects.create(user=self.user, date=date(2025, 3, 3) + timedelta(days=day))
+            MealEntry.objects.create(meal_plan=plan, food=self.rice, meal_type='lunch', quantity=200, unit='g')
+            MealEntry.objects.create(meal_plan=plan, food=self.rice, meal_type='dinner', quantity=1, unit='cup')
+            self.plans.append(plan)
+        self.recipe = RecipeTemplate.objects.create(user=self.user, name='Rice Bowl')
+        RecipeIngredient.objects.create(recipe=self.recipe, food=self.rice, quantity=1, unit='cup')
+
+    def propagate(self, *args):
+        out = StringIO()
+        call_command('propagate_food_changes', *args, '--batch-size', '2', stdout=out)
+        return out.getvalue()
+
+    def test_nutrition_edit_is_queued_and_propagated(self):
+        self.rice.calories = 150
+        self.rice.save()
+        self.assertEqual(FoodChange.objects.filter(food=self.rice, processed_at=None).count(), 1)
+        self.plans[0].refresh_from_db()
+        self.assertEqual(self.plans[0].calories_total, 260 + 312)  # plans wait for the job
+
+        out = self.propagate()
+        self.assertIn('5 meal plans and 1 recipes refreshed', out)
+        self.assertIn('meal plans: 4/5', out)  # progress per batch
+        for plan in self.plans:
+            plan.refresh_from_db()
+            self.assertEqual(plan.calories_total, 300 + 360)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.calories_total, 360)
+        self.assertFalse(FoodChange.objects.filter(processed_at=None).exists())
+        self.assertIn('0 food changes pending', self.propagate('--status'))
+
+    def test_small_fan_out_is_propagated_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rice.calories = 150
+            self.rice.save()
+        self.plans[0].refresh_from_db()
+        self.assertEqual(self.plans[0].calories_total, 300 + 360)
+        self.assertFalse(propagation.pending().exists())
+
+        with override_settings(FOOD_CHANGE_INLINE_LIMIT=10), self.captureOnCommitCallbacks(execute=True):
+            FoodPortion.objects.create(food=self.rice, unit='cup', grams=158)
+        self.assertEqual(propagation.pending().count(), 1)  # 11 rows use rice: left to the command
+        self.assertIn('5 meal plans and 1 recipes refreshed', self.propagate())
+
+    def test_portion_changes_reweigh_entries(self):
+        FoodPortion.objects.create(food=self.rice, unit='cup', grams=158)
+        self.propagate()
+        entry = MealEntry.objects.get(meal_plan=self.plans[0], unit='cup')
+        self.plans[0].refresh_from_db()
+        self.recipe.refresh_from_db()
+        self.assertEqual(entry.grams, 158)
+        self.assertEqual(self.plans[0].calories_total, 260 + 205)
+        self.assertEqual(self.recipe.total_grams, 158)
+
+    def test_claimed_changes_are_not_taken_twice(self):
+        Food.objects.filter(pk=self.rice.pk).update(calories=150)
+        call_command('propagate_food_changes', food=[self.rice.pk], status=True, stdout=StringIO())
+        claimed = propagation.claim()
+        self.assertEqual(len(claimed), 1)
+        self.assertEqual(propagation.claim(), [])
+        propagation.process(claimed)
+        self.plans[0].refresh_from_db()
+        self.assertEqual(self.plans[0].calories_total, 300 + 360)
+
+
+class IndexAdvisorTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='secret')
+        chicken = Food.objects.create(name='Chicken Breast', calories=165)
+        plan = MealPlan.objects.create(user=self.user, date=date.today() - timedelta(days=1))
+        MealEntry.objects.create(meal_plan=plan, food=chicken, meal_type='lunch', quantity=150)
+
+    def test_reports_full_scans_of_the_hot_views(self):
+        out = StringIO()
+        call_command('index_advisor', user='tester', min_rows=1, stdout=out)
+        self.assertIn('food_detail', out.getvalue())
+        self.assertIn('full scan of nutrition_food (1 rows)', out.getvalue())  # name LIKE '%chicken%'
+
+        out = StringIO()
+        call_command('index_advisor', user='tester', stdout=out)
+        self.assertNotIn('full scan', out.getvalue())
+        # only --seed-data writes to the database
+        self.assertEqual((User.objects.count(), Food.objects.count()), (1, 1))
+
+    def test_postgres_plans_point_at_unindexed_filters(self):
+        plan = {'Node Type': 'Hash Join', 'Plans': [
+            {'Node Type': 'Seq Scan', 'Relation Name': 'nutrition_food', 'Plan Rows': 900,
+             'Filter': '((calories > 100) AND (created_by_id = 1))'},
+            {'Node Type': 'Index Scan', 'Relation Name': 'nutrition_mealplan'},
+        ]}
+        findings = index_advisor._postgres_findings(plan)
+        self.assertEqual([(f['kind'], f['table'], f['rows']) for f in findings], [('scan', 'nutrition_food', 900)])
+        self.assertEqual(index_advisor.unindexed_columns('nutrition_food', findings[0]['filter']), ['calories'])
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='secret')
+        self.client.force_login(self.user)
+        fruit = FoodCategory.objects.create(name='Fruits')
+        grains = FoodCategory.objects.create(name='Grains')
+        for i in range(65):
+            Food.objects.create(name=f'Food {i % 7}', category=[fruit, grains, None][i % 3], calories=i)
+
+    def test_pages_cover_every_row_once_in_order(self):
+        foods = Food.objects.all()
+        expected = list(foods.order_by(F('category_id').asc(nulls_last=True), 'name', 'pk'))
+        seen, cursor = [], None
+        while True:
+            page = paginate(foods, ['category_id', 'name', 'pk'], cursor, per_page=4)
+            seen.extend(page)
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, expected)
+        self.assertEqual(list(paginate(foods, ['category_id', 'name', 'pk'], 'not-a-cursor', per_page=4)),
+                         expected[:4])
+
+    def test_deep_pages_cost_the_same(self):
+        def page_queries(cursor):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse('nutrition:food_search'), {'cursor': cursor or ''})
+            return len(queries), response
+
+        page_queries(None)  # builds the catalogue snapshot
+        first_queries, response = page_queries(None)
+        self.assertEqual(response.context['total_results'], 65)
+        page = response.context['foods']
+        for _ in range(3):
+            queries, response = page_queries(page.next_cursor)
+            self.assertEqual(queries, first_queries)
+            page = response.context['foods']
+        self.assertFalse(page.has_next())
+        self.assertEqual(len(page), 5)
+
+    def test_recipes_and_history_are_paged_newest_first(self):
+        for i in range(25):
+            MealPlan.objects.create(user=self.user, date=date(2025, 1, 1) + timedelta(days=i))
+            RecipeTemplate.objects.create(user=self.user, name=f'Recipe {i}')
+
+        response = self.client.get(reverse('nutrition:my_recipes'))
+        self.assertEqual(response.context['total_recipes'], 25)
+        self.assertEqual(response.context['recipes'].object_list[0].name, 'Recipe 24')
+        response = self.client.get(reverse('nutrition:my_recipes'), {'cursor': response.context['recipes'].next_cursor})
+        self.assertEqual([r.name for r in response.context['recipes']], [f'Recipe {i}' for i in range(4, -1, -1)])
+
+        response = self.client.get(reverse('nutrition:meal_history'))
+        self.assertEqual(response.context['total_days'], 25)
+        self.assertEqual(response.context['days'].object_list[0].date, date(2025, 1, 25))
+        self.assertContains(response, 'data-next-page')
+
+    def test_timestamps_in_the_same_millisecond_are_not_skipped(self):
+        RecipeTemplate.objects.bulk_create([RecipeTemplate(user=self.user, name=f'Recipe {i}') for i in range(10)])
+        created = timezone.now().replace(microsecond=123000)
+        for i, recipe in enumerate(RecipeTemplate.objects.order_by('pk')):
+            # 5 share one timestamp, all 10 share the millisecond
+            RecipeTemplate.objects.filter(pk=recipe.pk).update(created_at=created + timedelta(microseconds=i // 2 * 100))
+        recipes = RecipeTemplate.objects.filter(user=self.user)
+        seen, cursor = [], None
+        while True:
+            page = paginate(recipes, ['-created_at', '-pk'], cursor, per_page=3)
+            seen.extend(page)
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, list(recipes.order_by('-created_at', '-pk')))
+
+    def test_tampered_cursors_give_the_first_page(self):
+        RecipeTemplate.objects.create(user=self.user, name='Porridge')
+        MealPlan.objects.create(user=self.user, date=date(2025, 1, 1))
+        for values in (['not-a-date'], [{'a': 1}, 'x', 3], ['a', 'b'], [None, None], [[1], 'x', 2]):
+            cursor = encode_cursor(values)
+            for name in ('meal_history', 'food_search', 'my_recipes'):
+                response = self.client.get(reverse(f'nutrition:{name}'), {'cursor': cursor})
+                self.assertEqual(response.status_code, 200, (name, values))
+            for name in ('api_recipes', 'api_foods'):
+                response = self.client.get(reverse(f'nutrition:{name}'), {'cursor': cursor})
+                self.assertEqual(response.status_code, 400, (name, values))
+        self.assertTrue(paginate(Food.objects.all(), ['name', 'pk'], encode_cursor(['x', 'y'])).invalid)
+
+    def test_catalogue_is_browsed_along_the_category_name_index(self):
+        apples = FoodCategory.objects.create(name='Apples')
+        Food.objects.create(name='Gala', category=apples, calories=52)
+        first = Food.objects.order_by(F('category_id').asc(nulls_last=True), 'name', 'pk').first()
+        response = self.client.get(reverse('nutrition:food_search'))
+        self.assertEqual(response.context['foods'].object_list[0], first)
+        rows = []
+        cursor = None
+        while True:
+            data = self.client.get(reverse('nutrition:api_foods'), {'cursor': cursor or ''}).json()
+            rows.extend((food['category'], food['name']) for food in data['results'])
+            cursor = data['next']
+            if not cursor:
+                break
+        self.assertEqual(len(rows), 66)
+        self.assertEqual(rows, sorted(rows, key=lambda row: (row[0] is None, row[0] or 0, row[1])))
+        self.assertEqual(rows[-1 - sum(category is None for category, _ in rows)], (apples.pk, 'Gala'))
+        self.assertEqual(self.client.get(reverse('nutrition:food_search'), {'category': 'Nope'})
+                         .context['total_results'], 0)
+
+
+class JsonApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='secret')
+        self.client.force_login(self.user)
+        self.oats = Food.objects.create(name='Oats', calories=389, protein=17)
+        self.plan = MealPlan.objects.create(user=self.user, date=date(2025, 3, 3))
+        MealEntry.objects.create(meal_plan=self.plan, food=self.oats, meal_type='breakfast', quantity=50)
+        self.url = reverse('nutrition:api_plan_detail', args=['2025-03-03'])
+
+    def test_plan_payload_has_stored_totals_and_entries(self):
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['totals']['calories'], 195)
+        self.assertEqual(data['entries'][0]['food_name'], 'Oats')
+        self.assertEqual(data['entries'][0]['calories'], 195)
+
+        data = self.client.get(reverse('nutrition:api_plan_detail', args=['2025-03-04'])).json()
+        self.assertEqual((data['id'], data['entries']), (None, []))
+        self.assertFalse(MealPlan.objects.filter(date=date(2025, 3, 4)).exists())
+        self.assertEqual(self.client.get(reverse('nutrition:api_plans'), {'start': '2025-03-01', 'end': '2025-03-07'})
+                         .json()['plans'][0]['totals']['calories'], 195)
+
+    def test_unchanged_plan_answers_304_without_reading_entries(self):
+        response = self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            unchanged = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertFalse(any('nutrition_mealentry' in query['sql'] for query in queries.captured_queries))
+
+        MealEntry.objects.create(meal_plan=self.plan, food=self.oats, meal_type='snack', quantity=10)
+        changed = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()['totals']['calories'], 195 + 39)
+
+    def test_recipes_foods_and_authentication(self):
+        recipe = RecipeTemplate.objects.create(user=self.user, name='Porridge')
+        RecipeIngredient.objects.create(recipe=recipe, food=self.oats, quantity=80, unit='g')
+        data = self.client.get(reverse('nutrition:api_recipes')).json()
+        self.assertEqual(data['results'][0]['totals']['calories'], 311)
+        response = self.client.get(reverse('nutrition:api_food_detail', args=[self.oats.pk]))
+        self.assertEqual(response.json()['name'], 'Oats')
+
+        self.oats.name = 'Rolled Oats'
+        self.oats.save()
+        self.assertEqual(self.client.get(response.wsgi_request.path, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_food_rename_is_not_hidden_by_if_modified_since(self):
+        response = self.client.get(self.url)
+        self.assertNotIn('Last-Modified', response)
+        since = http_date(time.time() + 60)
+        self.oats.name = 'Rolled Oats'
+        self.oats.save()
+        renamed = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(renamed.status_code, 200)
+        self.assertEqual(renamed.json()['entries'][0]['food_name'], 'Rolled Oats')
+
+        recipe = RecipeTemplate.objects.create(user=self.user, name='Porridge')
+        RecipeIngredient.objects.create(recipe=recipe, food=self.oats, quantity=80, unit='g')
+        url = reverse('nutrition:api_recipe_detail', args=[recipe.pk])
+        self.assertNotIn('Last-Modified', self.client.get(url))
+
+
+class BatchMealLoggingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='secret')
+        self.client.force_login(self.user)
+        self.oats = Food.objects.create(name='Oats', calories=389, protein=17)
+        self.egg = Food.objects.create(name='Egg', calories=155, grams_per_piece=50)
+
+    def post_form(self, day, rows):
+        data = {'form-TOTAL_FORMS': len(rows) + 1, 'form-INITIAL_FORMS': 0}
+        for i, (food, quantity, unit, meal_type) in enumerate(rows):
+            data.update({f'form-{i}-food': food, f'form-{i}-quantity': quantity,
+                         f'form-{i}-unit': unit, f'form-{i}-meal_type': meal_type})
+        # an untouched extra row
+        data.update({f'form-{len(rows)}-food': '', f'form-{len(rows)}-quantity': 100,
+                     f'form-{len(rows)}-unit': 'g', f'form-{len(rows)}-meal_type': 'breakfast'})
+        return self.client.post(reverse('nutrition:log_meal') + f'?date={day}', data)
+
+    def test_form_logs_every_row_and_updates_totals_once(self):
+        rows = [(self.oats.pk, 50, 'g', 'breakfast'), (self.egg.pk, 2, 'piece', 'breakfast'),
+                (self.egg.pk, 1, 'piece', 'breakfast')]
+        response = self.post_form('2025-03-03', rows)
+        self.assertRedirects(response, reverse('nutrition:meal_plan_by_date', args=['2025-03-03']))
+        plan = MealPlan.objects.get(user=self.user, date=date(2025, 3, 3))
+        # the same food twice in one batch is logged twice
+        self.assertEqual(plan.entry_count, 3)
+        self.assertEqual(plan.total_calories(), 195 + 155 + 78)
+        self.assertEqual(plan.rollup.total_calories(), plan.total_calories())
+
+    def test_query_count_does_not_depend_on_the_number_of_rows(self):
+        with CaptureQueriesContext(connection) as few:
+            self.post_form('2025-03-03', [(self.oats.pk, 50, 'g', 'lunch'), (self.egg.pk, 1, 'piece', 'lunch')])
+        with CaptureQueriesContext(connection) as many:
+            self.post_form('2025-03-04', [(self.oats.pk, 50, 'g', 'lunch'), (self.egg.pk, 1, 'piece', 'lunch')] * 6)
+        self.assertEqual(len(few), len(many))
+        self.assertEqual(MealEntry.objects.filter(meal_plan__date=date(2025, 3, 4)).count(), 12)
+
+    def test_unknown_food_rejects_the_whole_batch(self):
+        response = self.post_form('2025-03-03', [(self.oats.pk, 50, 'g', 'lunch'), (9999, 1, 'g', 'lunch')])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['formset'].forms[1].errors['food'], ['Select a valid food.'])
+        self.assertFalse(MealEntry.objects.exists())
+
+        response = self.post_form('2025-03-03', [])
+        self.assertEqual(response.context['formset'].non_form_errors(), ['Add at least one food.'])
+
+    def test_json_endpoint(self):
+        url = reverse('nutrition:api_log_entries', args=['2025-03-03'])
+        response = self.client.post(url, {'items': [
+            {'food': self.oats.pk, 'quantity': 50, 'meal_type': 'breakfast'},
+            {'food': self.egg.pk, 'quantity': 1, 'unit': 'piece', 'meal_type': 'snack'},
+        ]}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.json()['created'], response.json()['totals']['calories']), (2, 195 + 78))
+
+        response = self.client.post(url, {'items': [{'food': self.oats.pk, 'meal_type': 'lunch'}, {}]},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['items']
+        self.assertEqual((sorted(errors[0]), sorted(errors[1])), (['quantity'], ['food', 'meal_type', 'quantity']))
+        self.assertEqual(MealEntry.objects.count(), 2)
+        self.assertEqual(self.client.get(url).status_code, 405)
+
+class NutritionAnalyticsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='secret')
+        self.food = Food.objects.create(name='Oats', calories=100, protein=10, carbs=60, fats=5)
+        self.end = date(2025, 12, 31)
+        self.client.force_login(self.user)
+
+    def log_days(self, days, skip=0):
+        for i in range(skip, days):
+            plan = MealPlan.objects.create(user=self.user, date=self.end - timedelta(days=i), goal_calories=2000)
+            # alternate between meeting (1800 cal) and missing (1000 cal) the goal
+            quantity = 1800 if i % 2 == 0 else 1000
+            MealEntry.objects.create(meal_plan=plan, food=self.food, meal_type='lunch', quantity=quantity)
+
+    def get_report(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('nutrition:nutrition_analytics'), params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.context
+
+    def test_query_budget_is_fixed_for_a_year(self):
+        self.log_days(14)
+        few, _ = self.get_report(start='2025-01-01', end='2025-12-31', granularity='month')
+        self.log_days(365, skip=14)
+        many, context = self.get_report(start='2025-01-01', end='2025-12-31', granularity='month')
+
+        self.assertEqual(few, many)
+        self.assertLessEqual(many, 6)
+        self.assertEqual(context['summary_stats']['days_logged'], 365)
+        self.assertEqual(len(context['rollups']), 12)
+
+    def test_weekly_rollups(self):
+        self.log_days(14)
+        _, context = self.get_report(start='2025-12-18', end='2025-12-31', granularity='week')
+
+        rollups = context['rollups']
+        self.assertEqual(sum(row['days_logged'] for row in rollups), 14)
+        self.assertEqual(rollups[-1]['calories_max'], 1800)
+        self.assertEqual(rollups[-1]['calories_min'], 1000)
+        self.assertEqual(context['summary_stats']['goal_success_rate'], 50)
+        self.assertEqual(context['total_days'], 14)
+
+    def test_rolling_average_covers_seven_calendar_days(self):
+        # 1800 cal on Dec 31 and the 29th, 1000 on the 30th, then nothing logged until Dec 15
+        self.log_days(3)
+        self.log_days(17, skip=16)
+        _, context = self.get_report(start='2025-12-01', end='2025-12-31')
+        rows = {row['date']: row for row in context['analytics_data']}
+        self.assertEqual(rows[date(2025, 12, 31)]['rolling_calories'], round((1800 + 1000 + 1800) / 3))
+        self.assertEqual(rows[date(2025, 12, 15)]['rolling_calories'], 1800)
+        summary = context['summary_stats']
+        self.assertEqual(summary['consistency_score'], summary['goal_success_rate'])
+        self.assertEqual(summary['goal_success_rate'], 75)
+
+    def test_invalid_params_fall_back_to_defaults(self):
+        _, context = self.get_report(start='nope', granularity='year')
+        self.assertEqual(context['granularity'], 'day')
+        self.assertEqual(context['total_days'], 31)
+        self.assertEqual(context['rollups'], [])
+
+
+class FoodSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='secret')
+        self.fruits = FoodCategory.objects.create(name='Fruits')
+        self.apple = Food.objects.create(name='Apple', calories=52, category=self.fruits)
+        self.pineapple = Food.objects.create(name='Pineapple', calories=50, category=self.fruits)
+        self.banana = Food.objects.create(name='Banana', calories=89, category=self.fruits)
+        self.bread = Food.objects.create(name='Bread', calories=265)
+        self.client.force_login(self.user)
+
+    def test_matches_name_and_category(self):
+        self.assertCountEqual(Food.objects.search('apple'), [self.apple, self.pineapple])
+        self.assertCountEqual(Food.objects.search('fruit'), [self.apple, self.pineapple, self.banana])
+
+    def test_users_frequent_foods_rank_first(self):
+        plan = MealPlan.objects.create(user=self.user, date=date.today())
+        for _ in range(6):
+            MealEntry.objects.create(meal_plan=plan, food=self.pineapple, meal_type='snack')
+
+        self.assertEqual(list(Food.objects.search('apple', user=self.user)), [self.pineapple, self.apple])
+        self.assertEqual(list(Food.objects.search('apple')), [self.apple, self.pineapple])
+
+    def test_view_reports_total_results(self):
+        response = self.client.get(reverse('nutrition:food_search'), {'q': 'apple'})
+        self.assertEqual(response.context['total_results'], 2)
+
+
+class FoodAutocompleteTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='secret')
+        self.breast = Food.objects.create(name='Chicken Breast', calories=165, protein=31)
+        self.curry = Food.objects.create(name='Butter Chicken', calories=150)
+        self.chickpeas = Food.objects.create(name='Chickpeas', calories=164)
+        self.client.force_login(self.user)
+
+    def autocomplete(self, query, **params):
+        response = self.client.get(reverse('nutrition:food_autocomplete'), {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [food['name'] for food in response.json()['results']]
+
+    def test_prefix_matches_any_word(self):
+        self.assertEqual(self.autocomplete('chick'), ['Chicken Breast', 'Butter Chicken', 'Chickpeas'])
+        self.assertEqual(self.autocomplete('chicken br'), ['Chicken Breast'])
+        self.assertEqual(self.autocomplete('chick', limit=1), ['Chicken Breast'])
+        self.assertEqual(self.autocomplete(''), [])
+
+    def test_index_follows_food_changes(self):
+        self.assertEqual(self.autocomplete('tofu'), [])
+        tofu = Food.objects.create(name='Tofu', calories=76)
+        self.assertEqual(self.autocomplete('tof'), ['Tofu'])
+        tofu.delete()
+        self.curry.name = 'Chicken Tikka'
+        self.curry.save()
+        self.assertEqual(self.autocomplete('tofu'), [])
+        self.assertEqual(self.autocomplete('tikka'), ['Chicken Tikka'])
+
+    def test_meal_entry_form_does_not_list_every_food(self):
+        plan = MealPlan.objects.create(user=self.user, date=date.today())
+        response = self.client.get(reverse('nutrition:add_meal_entry', args=[plan.id]))
+        self.assertContains(response, 'data-autocomplete-url')
+        self.assertNotContains(response, 'Chickpeas')
+
+
+class MealImportExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='secret')
+        self.rice = Food.objects.create(name='Rice', calories=130, protein=2.7, carbs=28, fats=0.3)
+        self.egg = Food.objects.create(name='Egg', calories=155, protein=13, carbs=1.1, fats=11)
+        self.client.force_login(self.user)
+
+    def import_file(self, content, name):
+        upload = SimpleUploadedFile(name, content.encode())
+        return self.client.post(reverse('nutrition:import_meals'), {'file': upload}).context['result']
+
+    def test_csv_import_creates_plans_entries_and_totals(self):
+        result = self.import_file(
+            'date,meal_type,food,quantity,unit\n'
+            '2025-01-01,breakfast,egg,200,g\n'
+            '2025-01-01,lunch,Rice,100,g\n'
+            '2025-01-02,dinner,Rice,300,g\n'
+            '2025-01-02,dinner,Unicorn,1,piece\n'
+            'yesterday,lunch,Rice,100,g\n',
+            'diary.csv',
+        )
+
+        self.assertEqual((result['created'], result['skipped'], result['days']), (3, 2, 2))
+        self.assertEqual(len(result['errors']), 2)
+        plan = MealPlan.objects.get(user=self.user, date=date(2025, 1, 1))
+        self.assertEqual((plan.calories_total, plan.entry_count), (440, 2))
+        self.assertEqual(plan.rollup.calories_total, 440)
+
+    def test_non_finite_and_huge_quantities_are_skipped(self):
+        result = self.import_file(
+            '{"date": "2025-01-01", "meal_type": "lunch", "food": "Rice", "quantity": NaN}\n'
+            '{"date": "2025-01-01", "meal_type": "lunch", "food": "Rice", "quantity": "inf"}\n'
+            '{"date": "2025-01-01", "meal_type": "lunch", "food": "Rice", "quantity": 1e308}\n'
+            '{"date": "2025-01-01", "meal_type": "lunch", "food": "Rice", "quantity": 100}\n',
+            'diary.jsonl',
+        )
+        self.assertEqual((result['created'], result['skipped']), (1, 3))
+        self.assertIn('quantity must be between 0.1 and', result['errors'][0])
+        plan = MealPlan.objects.get(user=self.user, date=date(2025, 1, 1))
+        self.assertEqual((plan.calories_total, plan.rollup.calories_total), (130, 130))
+
+    def test_export_round_trips_through_jsonl_import(self):
+        plan = MealPlan.objects.create(user=self.user, date=date(2025, 3, 1))
+        MealEntry.objects.create(meal_plan=plan, food=self.rice, meal_type='lunch', quantity=150)
+        MealEntry.objects.create(meal_plan=plan, food=self.egg, meal_type='breakfast', quantity=2, unit='piece')
+
+        response = self.client.get(reverse('nutrition:export_meals'), {'format': 'jsonl'})
+        exported = b''.join(response.streaming_content).decode()
+        self.assertEqual(len(exported.splitlines()), 2)
+
+        plan.delete()
+        result = self.import_file(exported, 'diary.jsonl')
+        self.assertEqual(result['created'], 2)
+        self.assertEqual(MealPlan.objects.get(user=self.user, date=date(2025, 3, 1)).calories_total, 195 + 310)
+
+    def test_unreadable_file_keeps_imported_batches_with_fresh_totals(self):
+        rows = ''.join(f'2025-01-{i % 28 + 1:02d},lunch,Rice,100,g\n' for i in range(1200))
+        content = b'date,meal_type,food,quantity,unit\n' + rows.encode()
+        for broken, problem in ((b'\xff\xfe', 'UTF-8'), (b'2025-01-01,lunch,' + b'x' * 200000 + b',100,g\n', 'Invalid CSV')):
+            MealPlan.objects.all().delete()
+            upload = SimpleUploadedFile('diary.csv', content + broken + b'2025-01-01,lunch,Rice,100,g\n')
+            response = self.client.post(reverse('nutrition:import_meals'), {'file': upload}, follow=True)
+            message = str(list(response.context['messages'])[0])
+            self.assertIn(problem, message)
+            self.assertIn('Imported 1000 entries', message)
+
+            self.assertEqual(MealEntry.objects.count(), 1000)
+            for plan in MealPlan.objects.filter(user=self.user).select_related('rollup'):
+                count = plan.mealentry_set.count()
+                self.assertEqual((plan.entry_count, plan.calories_total), (count, 130 * count))
+                self.assertEqual(plan.rollup.entry_count, count)
+
+
+class HotViewBenchmarkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_dataset(users=4, days=30, seed=42)
+        cls.user = User.objects.get(username='ahmad_nutrition')
+
+    def test_hot_views_stay_within_query_budgets(self):
+        results = run_benchmarks(self.user, iterations=1, warmup=0)
+
+        self.assertEqual(set(results), set(QUERY_BUDGETS))
+        self.assertEqual(find_regressions(results), [])
+
+    def test_slower_or_chattier_views_are_reported(self):
+        results = run_benchmarks(self.user, iterations=1, warmup=0)
+        baseline = {'views': {name: dict(stats, median_ms=stats['median_ms'] / 10, queries=stats['queries'] - 1)
+                              for name, stats in results.items()}}
+
+        problems = find_regressions(results, baseline)
+        self.assertEqual(len(problems), 2 * len(results))
+
+    def test_command_only_seeds_with_seed_data(self):
+        counts = (User.objects.count(), Food.objects.count())
+        out = StringIO()
+        call_command('benchmark', iterations=1, stdout=out)
+        self.assertEqual((User.objects.count(), Food.objects.count()), counts)
+        self.assertNotIn('Seeding', out.getvalue())
+        self.assertIn('"seed_data": false', out.getvalue())
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='secret')
+        self.food = Food.objects.create(name='Oats', calories=100, protein=10, carbs=60, fats=5)
+        for i in range(10):
+            plan = MealPlan.objects.create(user=self.user, date=date.today() - timedelta(days=i))
+            MealEntry.objects.create(meal_plan=plan, food=self.food, meal_type='lunch', quantity=500 + i * 100)
+
+    def get(self, view, path='/', **params):
+        request = AsyncRequestFactory().get(path, params)
+
+        async def auser():
+            return self.user
+        request.auser = auser
+        with CaptureQueriesContext(connection) as queries:
+            response = async_to_sync(view)(request)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_async_pages_render_like_the_sync_ones_within_budget(self):
+        response, queries = self.get(async_views.dashboard)
+        self.assertContains(response, 'Oats')
+        self.assertLessEqual(queries, QUERY_BUDGETS['dashboard'])
+        # cached under the same key as the sync dashboard
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as sync_queries:
+            self.client.get(reverse('nutrition:dashboard'))
+        self.assertLess(len(sync_queries), queries)
+
+        response, queries = self.get(async_views.weekly_view)
+        self.assertContains(response, 'Weekly')
+        self.assertLessEqual(queries, QUERY_BUDGETS['weekly_view'])
+        _, queries = self.get(async_views.nutrition_analytics, granularity='week')
+        self.assertLessEqual(queries, QUERY_BUDGETS['nutrition_analytics'])
+
+    def test_async_report_matches_the_sync_one(self):
+        start, end = date.today() - timedelta(days=30), date.today()
+        for granularity in analytics.GRANULARITIES:
+            self.assertEqual(
+                async_to_sync(analytics.abuild_report)(self.user, start, end, granularity),
+                analytics.build_report(self.user, start, end, granularity),
+            )
+
+    async def test_metrics_middleware_counts_queries_under_asgi(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('nutrition:weekly_view'))
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'], r'desc="[1-9]\d* queries"')
+
+class RequestMetricsMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='secret')
+        self.client.force_login(self.user)
+
+    def test_server_timing_header_counts_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('nutrition:weekly_view'))
+
+        timing = response['Server-Timing']
+        self.assertIn(f'desc="{len(queries)} queries"', timing)
+        for metric in ('db;dur=', 'tpl;dur=', 'app;dur=', 'total;dur='):
+            self.assertIn(metric, timing)
+
+    def test_templates_are_only_wrapped_during_a_request(self):
+        render = Template.render
+
+        def template_view(request):
+            self.assertIsNot(Template.render, render)
+            return HttpResponse(Template('{% for i in items %}{{ i }}{% endfor %}').render(Context({'items': [1, 2]})))
+
+        def outer_view(request):
+            # a second request in flight shares the wrapper and doesn't unwrap it for this one
+            RequestMetricsMiddleware(template_view)(RequestFactory().get('/'))
+            return template_view(request)
+
+        response = RequestMetricsMiddleware(outer_view)(RequestFactory().get('/'))
+        self.assertEqual(response.content, b'12')
+        self.assertIn('tpl;dur=', response['Server-Timing'])
+        self.assertIs(Template.render, render)
+
+    def test_repeated_queries_are_logged_as_n_plus_one(self):
+        foods = [Food.objects.create(name=f'Food {i}', calories=100) for i in range(6)]
+
+        def n_plus_one_view(request):
+            for food in foods:
+                Food.objects.get(pk=food.pk)
+            Food.objects.count()
+            return HttpResponse()
+
+        with self.assertLogs('nutrition.performance', level='WARNING') as logs:
+            RequestMetricsMiddleware(n_plus_one_view)(RequestFactory().get('/'))
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('6 x SELECT', logs.output[0])
+
+    def test_batched_writes_are_not_logged(self):
+        def bulk_view(request):
+            Food.objects.bulk_create([Food(name=f'Food {i}', calories=100) for i in range(12)], batch_size=2)
+            Food.objects.filter(name='Food 1').update(calories=90)
+            Food.objects.filter(name='Food 2').update(calories=80)
+            return HttpResponse()
+
+        with self.assertNoLogs('nutrition.performance', level='WARNING'):
+            RequestMetricsMiddleware(bulk_view)(RequestFactory().get('/'))
+        self.assertEqual(Food.objects.count(), 12)
+
+
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='secret')
+        self.food = Food.objects.create(name='Rice', calories=130)
+        self.client.force_login(self.user)
+
+    def get_dashboard(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('nutrition:dashboard'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.context
+
+    def test_repeat_visits_are_served_from_cache(self):
+        self.get_dashboard()  # creates today's plan
+        first, _ = self.get_dashboard()
+        second, context = self.get_dashboard()
+
+        self.assertLess(second, first)
+        self.assertEqual(context['total_foods'], 1)
+
+    def test_meal_entry_writes_invalidate_the_users_dashboard(self):
+        self.get_dashboard()
+        _, context = self.get_dashboard()
+        plan = context['meal_plan']
+
+        entry = MealEntry.objects.create(meal_plan=plan, food=self.food, meal_type='lunch', quantity=200)
+        _, context = self.get_dashboard()
+        self.assertEqual(context['meal_plan'].calories_total, 260)
+
+        entry.delete()
+        _, context = self.get_dashboard()
+        self.assertEqual(context['meal_plan'].calories_total, 0)
+
+    def test_food_changes_invalidate_the_catalogue(self):
+        self.get_dashboard()
+        Food.objects.create(name='Beans', calories=120)
+        _, context = self.get_dashboard()
+        self.assertEqual(context['total_foods'], 2)
+
+    def test_stats_endpoint_is_staff_only(self):
+        response = self.client.get(reverse('nutrition:cache_stats'))
+        self.assertEqual(response.status_code, 302)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.get_dashboard()
+        stats = self.client.get(reverse('nutrition:cache_stats')).json()
+        self.assertGreaterEqual(stats['dashboard']['misses'], 1)
+        self.assertIn('hit_rate', stats['catalogue'])
+
+
+class CatalogueSnapshotTests(TestCase):
+    def setUp(self):
+        self.fruits = FoodCategory.objects.create(name='Fruits', icon='🍎')
+        self.grains = FoodCategory.objects.create(name='Grains')
+        Food.objects.create(name='Apple', calories=52, category=self.fruits)
+        Food.objects.create(name='Pear', calories=57, category=self.fruits)
+        Food.objects.create(name='Water', calories=0)
+
+    def test_snapshot_is_read_without_queries(self):
+        catalogue.snapshot()
+        with self.assertNumQueries(0):
+            self.assertEqual(catalogue.total_foods(), 3)
+            self.assertEqual([c.name for c in catalogue.categories()], ['Fruits', 'Grains'])
+            self.assertEqual(catalogue.food_count(self.fruits.pk), 2)
+            self.assertEqual(catalogue.food_count(self.grains.pk), 0)
+            CustomFoodForm().as_p()
+
+    def test_food_and_category_writes_bump_the_version(self):
+        version = catalogue_version()
+        Food.objects.create(name='Oats', calories=389, category=self.grains)
+        self.assertNotEqual(catalogue_version(), version)
+        self.assertEqual(catalogue.food_count(self.grains.pk), 1)
+
+        self.grains.delete()
+        self.assertEqual([c.name for c in catalogue.categories()], ['Fruits'])
+        self.assertEqual(catalogue.total_foods(), 4)
+
+    def test_load_data_refreshes_the_catalogue(self):
+        self.assertEqual(catalogue.total_foods(), 3)
+        self.client.force_login(User.objects.create_user(username='tester', password='secret'))
+        self.assertEqual(self.client.get(reverse('nutrition:food_autocomplete'), {'q': 'banan'}).json()['results'], [])
+
+        call_command('load_data', users=0, days=0, stdout=StringIO())
+        self.assertEqual(catalogue.total_foods(), Food.objects.count())
+        self.assertGreater(catalogue.total_foods(), 3)
+        results = self.client.get(reverse('nutrition:food_autocomplete'), {'q': 'banan'}).json()['results']
+        self.assertIn('Banana', [food['name'] for food in results])
@@ -0,0 +1,241 @@
+"""Bulk import and streaming export of a user's meal diary.
+
+Rows look like the export: date (YYYY-MM-DD), meal_type, food (name),
+quantity, unit; extra columns such as calories are ignored on import.
+Both CSV (with a header row) and JSON Lines are accepted.
+
+The importer reads one row at a time and writes in batches: food names and
+plan dates are resolved once per batch from small caches, entries go in
+with bulk_create inside a transaction, and the stored totals of the
+touched days are recalculated once at the end. Batches commit on their
+own, so if reading the file fails part way (READ_ERRORS) the batches
+already written stay, and the totals are refreshed all the same.
+"""
+import csv
+import io
+import json
+import math
+import time
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Lower, Round
+
+from .models import Food, MealPlan, MealEntry, fill_grams, scale_factor_expression
+
+FORMATS = ['csv', 'jsonl']
+EXPORT_FIELDS = ['date', 'meal_type', 'food', 'quantity', 'unit', 'calories', 'protein', 'carbs', 'fats']
+MEAL_TYPES = {key for key, _ in MealEntry.MEAL_TYPES}
+UNITS = {key for key, _ in MealEntry.UNIT_CHOICES}
+# bytes of CSV/JSON Lines text sent to the client at a time
+EXPORT_CHUNK_SIZE = 64 * 1024
+# only the first few problems are reported line by line
+MAX_ERRORS = 50
+# largest quantity accepted per row (10 kg in grams); more is a typo or a broken export
+MAX_QUANTITY = 10000
+# what reading a broken upload raises: bad UTF-8, or csv.Error (e.g. a field over csv.field_size_limit())
+READ_ERRORS = (UnicodeDecodeError, csv.Error)
+
+
+def detect_format(filename):
+    return 'jsonl' if filename.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def read_rows(stream, fmt):
+    """Yield (line number, row dict) from a text stream without reading it all in."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else {'_invalid': line}
+
+
+class FoodLookup:
+    """Case-insensitive food name -> id cache, filled one query per batch of new names."""
+
+    def __init__(self):
+        self.ids = {}
+
+    def resolve(self, names):
+        missing = {name.lower() for name in names} - self.ids.keys()
+        if not missing:
+            return
+        for food_id, name in (Food.objects.annotate(lname=Lower('name'))
+                              .filter(lname__in=missing)
+                              .order_by('-pk')  # the oldest food wins for duplicate names
+                              .values_list('id', 'lname')):
+            self.ids[name] = food_id
+        for name in missing:
+            self.ids.setdefault(name, None)
+
+    def get(self, name):
+        return self.ids.get(name.lower())
+
+
+class MealImporter:
+    def __init__(self, user, batch_size=1000):
+        self.user = user
+        self.batch_size = batch_size
+        self.foods = FoodLookup()
+        self.plan_ids = {}
+        self.first_date = self.last_date = None
+        self.created = 0
+        self.skipped = 0
+        self.errors = []
+
+    def run(self, rows):
+        """Import (line number, row) pairs and return a summary dict.
+
+        When reading `rows` raises, the error propagates; `created` then says
+        how many entries were imported before it.
+        """
+        started = time.monotonic()
+        batch = []
+        try:
+            for line_number, row in rows:
+                batch.append((line_number, row))
+                if len(batch) >= self.batch_size:
+                    self.import_batch(batch)
+                    batch = []
+            if batch:
+                self.import_batch(batch)
+        finally:
+            days = self.refresh_totals()
+
+        seconds = time.monotonic() - started
+        return {
+            'created': self.created,
+            'skipped': self.skipped,
+            'days': days,
+            'seconds': seconds,
+            'rows_per_second': (self.created + self.skipped) / seconds if seconds else 0,
+            'errors': self.errors,
+        }
+
+    def refresh_totals(self):
+        """Recalculate the stored totals of the days seen so far; returns how many."""
+        if not self.first_date:
+            return 0
+        return MealPlan.objects.filter(
+            user=self.user, date__range=[self.first_date, self.last_date],
+        ).refresh_totals()
+
+    def import_batch(self, batch):
+        parsed = []
+        for line_number, row in batch:
+            try:
+                parsed.append((line_number, self.parse_row(row)))
+            except ValueError as e:
+                self.skip(line_number, e)
+        self.foods.resolve(values[2] for _, values in parsed)
+        self.resolve_plans({values[0] for _, values in parsed})
+
+        entries = []
+        for line_number, (day, meal_type, food, quantity, unit) in parsed:
+            food_id = self.foods.get(food)
+            if food_id is None:
+                self.skip(line_number, f'unknown food "{food}"')
+                continue
+            entries.append(MealEntry(
+                meal_plan_id=self.plan_ids[day], food_id=food_id,
+                meal_type=meal_type, quantity=quantity, unit=unit,
+            ))
+
+        fill_grams(entries)
+        with transaction.atomic():
+            MealEntry.objects.bulk_create(entries, batch_size=self.batch_size)
+        self.created += len(entries)
+
+    def parse_row(self, row):
+        if '_invalid' in row:
+            raise ValueError('not a JSON object')
+        try:
+            day = datetime.strptime(str(row.get('date', '')).strip(), '%Y-%m-%d').date()
+        except ValueError:
+            raise ValueError(f'invalid date "{row.get("date")}"')
+        meal_type = str(row.get('meal_type', '')).strip().lower()
+        if meal_type not in MEAL_TYPES:
+            raise ValueError(f'invalid meal_type "{row.get("meal_type")}"')
+        food = str(row.get('food') or '').strip()
+        if not food:
+            raise ValueError('missing food')
+        try:
+            quantity = float(row.get('quantity') or 100)
+        except (TypeError, ValueError):
+            raise ValueError(f'invalid quantity "{row.get("quantity")}"')
+        # float() also reads "nan", "inf" and "1e308", which would poison the stored totals
+        if not math.isfinite(quantity) or not 0.1 <= quantity <= MAX_QUANTITY:
+            raise ValueError(f'quantity must be between 0.1 and {MAX_QUANTITY}')
+        unit = str(row.get('unit') or 'g').strip().lower()
+        if unit not in UNITS:
+            raise ValueError(f'invalid unit "{row.get("unit")}"')
+
+        self.first_date = min(day, self.first_date or day)
+        self.last_date = max(day, self.last_date or day)
+        return day, meal_type, food, quantity, unit
+
+    def resolve_plans(self, days):
+        """Map each date to the user's MealPlan id, creating the missing plans in bulk."""
+        missing = days - self.plan_ids.keys()
+        if not missing:
+            return
+        MealPlan.objects.bulk_create(
+            [MealPlan(user=self.user, date=day) for day in missing],
+            ignore_conflicts=True,
+        )
+        self.plan_ids.update(
+            MealPlan.objects.filter(user=self.user, date__in=missing).values_list('date', 'id')
+        )
+
+    def skip(self, line_number, reason):
+        self.skipped += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(f'line {line_number}: {reason}')
+
+
+def export_rows(user, fmt='csv', chunk_size=2000):
+    """Yield the user's whole diary as CSV or JSON Lines text, oldest day first."""
+    factor = scale_factor_expression()
+    entries = (
+        MealEntry.objects.filter(meal_plan__user=user)
+        .annotate(
+            entry_calories=Round(F('food__calories') * factor),
+            entry_protein=Round(F('food__protein') * factor, 1),
+            entry_carbs=Round(F('food__carbs') * factor, 1),
+            entry_fats=Round(F('food__fats') * factor, 1),
+        )
+        .order_by('meal_plan__date', 'meal_type', 'added_at', 'pk')
+        .values_list('meal_plan__date', 'meal_type', 'food__name', 'quantity', 'unit',
+                     'entry_calories', 'entry_protein', 'entry_carbs', 'entry_fats')
+    )
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == 'csv':
+        writer.writerow(EXPORT_FIELDS)
+    for row in entries.iterator(chunk_size=chunk_size):
+        values = dict(zip(EXPORT_FIELDS, row))
+        values['date'] = values['date'].isoformat()
+        for field in EXPORT_FIELDS[5:]:
+            # ROUND() comes back as Decimal on PostgreSQL
+            if values[field] is not None:
+                values[field] = float(values[field])
+        if fmt == 'jsonl':
+            buffer.write(json.dumps(values) + '\n')
+        else:
+            writer.writerow(values.values())
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
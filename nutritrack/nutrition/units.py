@@ -0,0 +1,58 @@
+"""Quantity units and their conversion to grams.
+
+Food nutrition is stored per 100 g, so an entry or ingredient is worth
+its weight in grams / 100 of its food. The weight is worked out once, when
+the row is saved, and stored in its `grams` column (see WeighedQuantity in
+models.py), so the totals summed by the database are plain
+SUM(grams * food.calories / 100).
+
+A unit's weight comes from, in order: the food's FoodPortion for that unit
+(e.g. 1 cup of cooked rice = 158 g), the food's own density (g/ml, for the
+volume units) or piece/serving weight, and finally the defaults below
+(water density, 100 g per piece or serving). Changing any of them changes
+what existing rows weigh: the edit is queued and `manage.py
+propagate_food_changes` reweighs the rows (`backfill_grams` checks them all).
+"""
+UNIT_CHOICES = [
+    ('g', 'Grams'),
+    ('ml', 'Milliliters'),
+    ('cup', 'Cup'),
+    ('tbsp', 'Tablespoon'),
+    ('tsp', 'Teaspoon'),
+    ('piece', 'Piece'),
+    ('serving', 'Serving'),
+]
+
+# millilitres in one of each volume unit
+ML_PER_UNIT = {
+    'ml': 1.0,
+    'cup': 240.0,
+    'tbsp': 15.0,
+    'tsp': 5.0,
+}
+# portion units and the Food field holding that food's grams per portion
+PORTION_FIELDS = {
+    'piece': 'grams_per_piece',
+    'serving': 'grams_per_serving',
+}
+# units a FoodPortion can give a food-specific weight for
+PORTION_UNIT_CHOICES = [choice for choice in UNIT_CHOICES if choice[0] != 'g']
+DEFAULT_DENSITY = 1.0
+DEFAULT_PORTION_GRAMS = 100.0
+
+
+def grams_per_unit(unit, food=None, portions=None):
+    """Grams in one `unit` of `food` (a Food or None), with `portions` the food's {unit: grams} overrides."""
+    if unit == 'g':
+        return 1.0
+    if portions and unit in portions:
+        return portions[unit]
+    if unit in ML_PER_UNIT:
+        return ML_PER_UNIT[unit] * (getattr(food, 'density', None) or DEFAULT_DENSITY)
+    field = PORTION_FIELDS.get(unit)
+    return (field and getattr(food, field, None)) or DEFAULT_PORTION_GRAMS
+
+
+def grams(quantity, unit, food=None, portions=None):
+    """Weight in grams of `quantity` `unit`s of `food`."""
+    return quantity * grams_per_unit(unit, food, portions)
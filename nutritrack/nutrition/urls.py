@@ -1,6 +1,10 @@
+from django.conf import settings
 from django.urls import path
 from django.contrib.auth.views import LogoutView
-from . import views
+from . import api, async_views, views
+
+# async dashboard, weekly and analytics pages when served over ASGI (see async_views.py)
+pages = async_views if getattr(settings, 'NUTRITION_ASYNC_VIEWS', False) else views
 
 app_name = 'nutrition'
 urlpatterns = [
@@ -11,18 +15,24 @@ urlpatterns = [
     
     
     # Main pages
-    path('', views.dashboard, name='dashboard'),
-    path('dashboard/', views.dashboard, name='dashboard'),
+    path('', pages.dashboard, name='dashboard'),
+    path('dashboard/', pages.dashboard, name='dashboard'),
+    path('stats/cache/', views.cache_stats, name='cache_stats'),
 
     # meal plans
     path('meal-plan/<int:plan_id>/', views.meal_plan_detail, name='meal_plan_detail'),
     path('date/<str:date_str>/', views.meal_plan_by_date, name='meal_plan_by_date'),
-    path('weekly/', views.weekly_view, name='weekly_view'),
+    path('weekly/', pages.weekly_view, name='weekly_view'),
+    path('history/', views.meal_history, name='meal_history'),
     path('copy_day/<str:date_str>/', views.copy_day, name='copy_day'),
-    path('analytics/', views.nutrition_analytics, name='nutrition_analytics'),
+    path('week-templates/', views.week_templates, name='week_templates'),
+    path('week-templates/create/', views.create_week_template, name='create_week_template'),
+    path('week-templates/<int:template_id>/apply/', views.apply_template, name='apply_week_template'),
+    path('analytics/', pages.nutrition_analytics, name='nutrition_analytics'),
 
     # food management
     path('food/search/', views.food_search, name='food_search'),
+    path('food/autocomplete/', views.food_autocomplete, name='food_autocomplete'),
     path('food/add-custom/', views.add_custom_food, name='add_custom_food'),
     path('food/<int:food_id>/', views.food_detail, name='food_detail'),
     path('food/<int:food_id>/quick-add/', views.quick_add_food, name='quick_add_food'),
@@ -30,6 +40,7 @@ urlpatterns = [
   # Meal entries
     path('meal-entry/add/<int:meal_plan_id>/', views.add_meal_entry, name='add_meal_entry'),
     path('meal-entry/add/<int:meal_plan_id>/<str:meal_type>/', views.add_meal_entry, name='add_meal_entry'),
+    path('meal-entry/batch/', views.log_meal, name='log_meal'),
     path('meal-entry/edit/<int:entry_id>/', views.edit_meal_entry, name='edit_meal_entry'), 
     path('meal-entry/delete/<int:entry_id>/', views.delete_meal_entry, name='delete_meal_entry'),
     
@@ -43,6 +54,19 @@ urlpatterns = [
     # Quick actions
     path('copy-yesterday/', views.copy_yesterday, name='copy_yesterday'),
 
+    # JSON API
+    path('api/v1/plans/', api.plans, name='api_plans'),
+    path('api/v1/plans/<str:date_str>/', api.plan_detail, name='api_plan_detail'),
+    path('api/v1/plans/<str:date_str>/entries/', api.log_entries, name='api_log_entries'),
+    path('api/v1/foods/', api.foods, name='api_foods'),
+    path('api/v1/foods/<int:food_id>/', api.food_detail, name='api_food_detail'),
+    path('api/v1/recipes/', api.recipes, name='api_recipes'),
+    path('api/v1/recipes/<int:recipe_id>/', api.recipe_detail, name='api_recipe_detail'),
+
+    # Diary import / export
+    path('diary/import/', views.import_meals, name='import_meals'),
+    path('diary/export/', views.export_meals, name='export_meals'),
+
   # about ;
   
    path('about/', views.about_developer, name='about_developer'),
@@ -4,8 +4,8 @@ from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.contrib.auth.views import LoginView, LogoutView
-from .models import MealPlan, Food, FoodCategory, MealEntry, RecipeTemplate, RecipeIngredient
-from django.db.models import Q
+from .models import MealPlan, Food, FoodCategory, MealEntry, RecipeTemplate, RecipeIngredient, DailyNutritionRollup
+from django.db.models import Q, Prefetch
 from datetime import date, timedelta
 from datetime import datetime
 from .forms import CustomFoodForm, MealEntryForm, RecipeTemplateForm, RecipeIngredientFormSet
@@ -17,6 +17,20 @@ from django.utils.timezone import make_aware
 from django.contrib.auth import login
 from .forms import CustomUserCreationForm
 from .models import UserProfile
+from . import analytics
+from .autocomplete import food_index, DEFAULT_LIMIT, MAX_LIMIT
+from django.http import JsonResponse, StreamingHttpResponse
+from .forms import MealImportForm
+from . import transfer
+import io
+from . import cache as nutrition_cache
+from . import catalogue
+from django.contrib.admin.views.decorators import staff_member_required
+from .copying import clone_entries, following_days, MAX_REPEAT_DAYS, save_week_template, apply_week_template
+from .forms import WeekTemplateForm, ApplyWeekTemplateForm
+from .models import WeekTemplate
+from django.db.models import Count
+from django.urls import reverse
 
 
 def register(request):
@@ -55,36 +69,45 @@ class CustomLoginView(LoginView):
 #        form = UserCreationForm()
 #    return render(request, 'auth/register.html', {'form': form})
 
+# Meal types for templates, in the order the sections are shown
+MEAL_SECTIONS = [
+    ('breakfast', 'Breakfast'),
+    ('lunch', 'Lunch'),
+    ('dinner', 'Dinner'),
+    ('snack', 'Snacks'),
+]
+
 @login_required
 def dashboard(request):
     today = date.today()
-    
-    # Get or create today's meal plan
-    meal_plan, created = MealPlan.objects.get_or_create(
-        user=request.user,
-        date=today,
-        defaults={'goal_calories': 2000}
-    )
 
-    # Meal types for template
-    meal_types = [
-        ('breakfast', 'Breakfast'),
-        ('lunch', 'Lunch'),
-        ('dinner', 'Dinner'),
-        ('snack', 'Snacks'),
-    ]
-    
-    context = {
-        'meal_plan': meal_plan,
-        'meal_types': meal_types,
-        'total_foods': Food.objects.count(),
-        'food_categories': FoodCategory.objects.all(),
-        'recent_plans': MealPlan.objects.filter(
+    def build_user_data():
+        # Get or create today's meal plan
+        meal_plan, created = MealPlan.objects.get_or_create(
+            user=request.user,
+            date=today,
+            defaults={'goal_calories': 2000}
+        )
+        recent_plans = DailyNutritionRollup.objects.filter(
             user=request.user
         ).exclude(date=today).order_by('-date')[:7]
-    }
+        return {
+            'meal_plan': meal_plan,
+            'meals': meal_plan.meals(MEAL_SECTIONS),
+            'recent_plans': list(recent_plans),
+        }
+
+    # cached until the user's meals or the food catalogue change (see cache.py);
+    # the catalogue version is part of the name because the meals show food names
+    context = nutrition_cache.user_cached(
+        'dashboard', request.user.pk, f'summary:{today}:{nutrition_cache.catalogue_version()}', build_user_data)
+    context = dict(context, total_foods=catalogue.total_foods(), food_categories=catalogue.categories())
     return render(request, 'nutrition/dashboard.html', context)
 
+@staff_member_required
+def cache_stats(request):
+    return JsonResponse(nutrition_cache.cache_stats())
+
 @login_required
 def copy_yesterday(request):
     today = date.today()
@@ -92,28 +115,16 @@ def copy_yesterday(request):
     
     try:
         yesterday_plan = MealPlan.objects.get(user=request.user, date=yesterday)
-        today_plan, created = MealPlan.objects.get_or_create(
-            user=request.user,
-            date=today,
-            defaults={
+        # Copy meal entries (skipping foods already logged for the same meal today)
+        copied = clone_entries(
+            yesterday_plan.mealentry_set.all(), request.user, [today],
+            plan_defaults={
                 'goal_calories': yesterday_plan.goal_calories,
                 'notes': f"Copied from {yesterday}"
-            }
+            },
         )
         
-        # Copy meal entries
-        for entry in yesterday_plan.mealentry_set.all():
-            MealEntry.objects.get_or_create(
-                meal_plan=today_plan,
-                food=entry.food,
-                meal_type=entry.meal_type,
-                defaults={
-                    'quantity': entry.quantity,
-                    'unit': entry.unit
-                }
-            )
-        
-        messages.success(request, f"Copied {yesterday_plan.mealentry_set.count()} items from yesterday!")
+        messages.success(request, f"Copied {copied} items from yesterday!")
         
     except MealPlan.DoesNotExist:
         messages.error(request, "No meal plan found for yesterday.")
@@ -125,49 +136,62 @@ def meal_plan_detail(request, plan_id):
     meal_plan = get_object_or_404(MealPlan, id=plan_id, user=request.user)
     
     # Group entries by meal type
-    entries_by_meal = {}
-    for meal_type, display_name in [('breakfast', 'Breakfast'), ('lunch', 'Lunch'), 
-                                   ('dinner', 'Dinner'), ('snack', 'Snacks')]:
-        entries_by_meal[meal_type] = meal_plan.mealentry_set.filter(meal_type=meal_type)
-    
     context = {
         'meal_plan': meal_plan,
-        'entries_by_meal': entries_by_meal,
+        'meals': meal_plan.meals(MEAL_SECTIONS),
     }
     return render(request, 'nutrition/meal_plan_detail.html', context)
 
 from django.core.paginator import Paginator
+from .pagination import paginate, DEFAULT_PER_PAGE, CATALOGUE_ORDER
 
 @login_required
 def food_search(request):
     query = request.GET.get('q', '')
     category = request.GET.get('category', '')
     
-    foods = Food.objects.all()
+    foods = Food.objects.select_related('category')
     
     if query:
-        foods = foods.filter(
-            Q(name__icontains=query) | 
-            Q(category__name__icontains=query)
-        )
+        # ranked full-text/trigram search on PostgreSQL, substring match elsewhere
+        foods = foods.search(query, user=request.user)
     
     if category:
         foods = foods.filter(category__name=category)
     
-    # Pagination
-    paginator = Paginator(foods, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    if query:
+        # matches are ranked, so they are paged by number
+        paginator = Paginator(foods, DEFAULT_PER_PAGE)
+        page_obj = paginator.get_page(request.GET.get('page'))
+        total_results = paginator.count
+    else:
+        # browsing the catalogue: cursor pages along the (category, name) index, counts from the snapshot
+        if category:
+            selected = next((c for c in catalogue.categories() if c.name == category), None)
+            total_results = catalogue.food_count(selected.pk) if selected is not None else 0
+        else:
+            total_results = catalogue.total_foods()
+        page_obj = paginate(foods, CATALOGUE_ORDER, request.GET.get('cursor'), count=total_results)
     
     context = {
         'foods': page_obj,
         'query': query,
         'selected_category': category,
-        'categories': FoodCategory.objects.all(),
-        'total_results': foods.count(),
+        'categories': catalogue.categories(),
+        'total_results': total_results,
     }
     return render(request, 'nutrition/food_search.html', context)
 
+@login_required
+def food_autocomplete(request):
+    # JSON suggestions for the food pickers, served from the in-memory prefix index
+    try:
+        limit = min(int(request.GET.get('limit', DEFAULT_LIMIT)), MAX_LIMIT)
+    except ValueError:
+        limit = DEFAULT_LIMIT
+    results = food_index.search(request.GET.get('q', ''), limit=max(limit, 1))
+    return JsonResponse({'results': results})
+
 @login_required
 def add_custom_food(request):
     if request.method == 'POST':
@@ -184,11 +208,43 @@ def add_custom_food(request):
     
     context = {
         'form': form,
-        'categories': FoodCategory.objects.all(),
+        'categories': catalogue.categories(),
     }
     return render(request, 'nutrition/add_custom_food.html', context)
 
 
+@login_required
+def import_meals(request):
+    result = None
+    if request.method == 'POST':
+        form = MealImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            fmt = form.cleaned_data['format'] or transfer.detect_format(upload.name)
+            # decode the upload as it is read instead of loading it into memory
+            stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+            importer = transfer.MealImporter(request.user)
+            try:
+                result = importer.run(transfer.read_rows(stream, fmt))
+            except transfer.READ_ERRORS as e:
+                problem = 'The file must be UTF-8 encoded text' if isinstance(e, UnicodeDecodeError) else f'Invalid CSV ({e})'
+                messages.error(request, f'{problem}. Imported {importer.created} entries before the error.')
+            else:
+                messages.success(request, f"Imported {result['created']} entries, skipped {result['skipped']} rows.")
+    else:
+        form = MealImportForm()
+
+    return render(request, 'nutrition/import_meals.html', {'form': form, 'result': result})
+
+@login_required
+def export_meals(request):
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in transfer.FORMATS:
+        fmt = 'csv'
+    content_type = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    response = StreamingHttpResponse(transfer.export_rows(request.user, fmt), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="nutritrack-{request.user.username}.{fmt}"'
+    return response
 
 
 from .forms import MealEntryForm
@@ -257,6 +313,44 @@ def quick_add_food(request, food_id):
     }
     return render(request, 'nutrition/quick_add_food.html', context)
 
+from .forms import BatchMealEntryFormSet
+from .copying import log_entries
+
+@login_required
+def log_meal(request):
+    """Log several foods at once: one Food lookup, one insert and one totals update for the lot.
+
+    ?date= picks the day (today by default), ?meal_type= the meal the rows start on.
+    """
+    day = date.today()
+    if request.GET.get('date'):
+        try:
+            day = datetime.strptime(request.GET['date'], "%Y-%m-%d").date()
+        except ValueError:
+            messages.error(request, "Invalid date format.")
+            return redirect('nutrition:dashboard')
+    meal_type = request.GET.get('meal_type')
+    if meal_type not in dict(MealEntry.MEAL_TYPES):
+        meal_type = None
+
+    if request.method == 'POST':
+        formset = BatchMealEntryFormSet(request.POST, form_kwargs={'meal_type': meal_type})
+        if formset.is_valid():
+            logged = log_entries(request.user, day, formset.rows())
+            messages.success(request, f'Added {logged} foods to {day:%B %d}!')
+            if day == date.today():
+                return redirect('nutrition:dashboard')
+            return redirect('nutrition:meal_plan_by_date', date_str=day.isoformat())
+    else:
+        formset = BatchMealEntryFormSet(form_kwargs={'meal_type': meal_type})
+
+    context = {
+        'formset': formset,
+        'day': day,
+        'meal_type': meal_type,
+    }
+    return render(request, 'nutrition/log_meal.html', context)
+
 @login_required
 def edit_meal_entry(request, entry_id):
     entry = get_object_or_404(MealEntry, id=entry_id, meal_plan__user=request.user)
@@ -291,14 +385,20 @@ def delete_meal_entry(request, entry_id):
     return render(request, 'nutrition/delete_meal_entry.html', context)
 
 from .forms import RecipeTemplateForm, RecipeIngredientFormSet
+from .signals import defer_totals
 
 @login_required
 def my_recipes(request):
-    recipes = RecipeTemplate.objects.filter(user=request.user).order_by('-created_at')
+    # totals are stored on the recipe; the ingredients are only loaded for their names
+    recipes = RecipeTemplate.objects.filter(user=request.user).prefetch_related(
+        Prefetch('recipeingredient_set',
+                 queryset=RecipeIngredient.objects.select_related('food').only('recipe_id', 'food__name'))
+    )
+    page = paginate(recipes, ['-created_at', '-pk'], request.GET.get('cursor'), count='exact')
     
     context = {
-        'recipes': recipes,
-        'total_recipes': recipes.count(),
+        'recipes': page,
+        'total_recipes': page.count,
     }
     return render(request, 'nutrition/my_recipes.html', context)
 
@@ -313,7 +413,9 @@ def create_recipe(request):
             
             ingredient_formset = RecipeIngredientFormSet(request.POST, instance=recipe)
             if ingredient_formset.is_valid():
-                ingredient_formset.save()
+                with defer_totals():
+                    ingredient_formset.save()
+                recipe.recalculate_totals()
 
                 messages.success(request, f'Recipe "{recipe.name}" created successfully!')
                 return redirect('nutrition:recipe_detail', recipe.id)
@@ -328,7 +430,6 @@ def create_recipe(request):
     context = {
         'recipe_form': recipe_form,
         'ingredient_formset': ingredient_formset,
-        'foods': Food.objects.all().order_by('category', 'name'),
     }
     return render(request, 'nutrition/create_recipe.html', context)
 
@@ -340,7 +441,7 @@ def recipe_detail(request, recipe_id):
     context = {
         'recipe': recipe,
         'ingredients': ingredients,
-        'total_ingredients': ingredients.count(),
+        'total_ingredients': recipe.ingredient_count,
     }
     return render(request, 'nutrition/recipe_detail.html', context)
 
@@ -359,17 +460,9 @@ def add_recipe_to_meal(request, recipe_id):
     if request.method == 'POST':
         meal_type = request.POST.get('meal_type', 'lunch')
         
-        # Add all recipe ingredients as separate meal entries
-        added_count = 0
-        for ingredient in recipe.recipeingredient_set.all():
-            MealEntry.objects.create(
-                meal_plan=meal_plan,
-                food=ingredient.food,
-                meal_type=meal_type,
-                quantity=ingredient.quantity,
-                unit=ingredient.unit
-            )
-            added_count += 1
+        # Add all recipe ingredients as separate meal entries (every time: a dish eaten twice is logged twice)
+        added_count = clone_entries(recipe.recipeingredient_set.all(), request.user, [today], meal_type=meal_type,
+                                    policy='append')
         
         messages.success(request, f'Added recipe "{recipe.name}" ({added_count} ingredients) to {meal_type}!')
         return redirect('nutrition:dashboard')
@@ -383,32 +476,30 @@ def add_recipe_to_meal(request, recipe_id):
 from django.db.models import Sum
 from django.utils import timezone
 
-@login_required
-def weekly_view(request):
-    today = date.today()
-  
+def week_start_for(request, today):
+    """Monday of the current week, or the ?week= date when there is a valid one."""
     week_str = request.GET.get('week')
     if week_str:
         try:
-            week_start = datetime.strptime(week_str, '%Y-%m-%d').date()
+            return datetime.strptime(week_str, '%Y-%m-%d').date()
         except ValueError:
             # If invalid date in param, fallback to current week
-            week_start = today - timedelta(days=today.weekday())
-    else:
-        today = date.today()
-        week_start = today - timedelta(days=today.weekday())
-    week_end = week_start + timedelta(days=6)
+            pass
+    return today - timedelta(days=today.weekday())
+
 
+def week_context(user, week_start, today, rollups):
+    """Context of weekly_view from the week's DailyNutritionRollup rows."""
+    week_end = week_start + timedelta(days=6)
     prev_week = week_start - timedelta(days=7)
-    
-    # Get meal plans for the week
+
+    # missing days get unsaved rollups (their totals default to zero)
+    plans_by_date = {plan.date: plan for plan in rollups}
+
     weekly_plans = []
     for i in range(7):
         day = week_start + timedelta(days=i)
-        try:
-            plan = MealPlan.objects.get(user=request.user, date=day)
-        except MealPlan.DoesNotExist:
-            plan = MealPlan(user=request.user, date=day, goal_calories=2000)
+        plan = plans_by_date.get(day) or DailyNutritionRollup(user=user, date=day, goal_calories=2000)
         
         weekly_plans.append({
             'date': day,
@@ -416,14 +507,11 @@ def weekly_view(request):
             'is_today': day == today,
             'is_future': day > today,
             'day_name': day.strftime('%A'),
-            'entries_count': plan.mealentry_set.count() if plan.pk else 0
+            'entries_count': plan.entry_count
         })
     
     # Weekly stats
-    actual_plans = MealPlan.objects.filter(
-        user=request.user,
-        date__range=[week_start, week_end]
-    )
+    actual_plans = list(plans_by_date.values())
 
     total_calories = sum(plan.total_calories() for plan in actual_plans)
     avg_calories = total_calories / 7 if actual_plans else 0
@@ -435,13 +523,13 @@ def weekly_view(request):
     weekly_stats = {
         'total_calories': total_calories,
         'avg_calories': avg_calories,
-        'days_logged': actual_plans.count(),
+        'days_logged': len(actual_plans),
         'goal_calories': goal_calories,
         'progress': progress,  # add this line
         
     }
 
-    context = {
+    return {
         'weekly_plans': weekly_plans,
         'weekly_stats': weekly_stats,
         'week_start': week_start,
@@ -450,6 +538,18 @@ def weekly_view(request):
         'prev_week': prev_week,
 
     }
+
+@login_required
+def weekly_view(request):
+    today = date.today()
+    week_start = week_start_for(request, today)
+
+    # Get the week's daily rollups in one range query
+    rollups = DailyNutritionRollup.objects.filter(
+        user=request.user,
+        date__range=[week_start, week_start + timedelta(days=6)]
+    )
+    context = week_context(request.user, week_start, today, rollups)
     return render(request, 'nutrition/weekly_view.html', context)
 
 
@@ -482,65 +582,27 @@ def meal_plan_by_date(request, date_str=None):
         'next_date': next_date,
         'is_today': selected_date == date.today(),
         'is_future': selected_date > date.today(),
-        'meal_types': [
-            ('breakfast', 'Breakfast'),
-            ('lunch', 'Lunch'), 
-            ('dinner', 'Dinner'),
-            ('snack', 'Snacks'),
-        ]
+        'meals': meal_plan.meals(MEAL_SECTIONS),
     }
     return render(request, 'nutrition/daily_view.html', context)
 
-@login_required
-def nutrition_analytics(request):
-    """30-day nutrition analytics"""
-    end_date = date.today()
-    start_date = end_date - timedelta(days=30)
-    
-    # Get meal plans for last 30 days
-    plans = MealPlan.objects.filter(
-        user=request.user,
-        date__range=[start_date, end_date]
-    ).order_by('date')
-    
-    # Calculate daily averages and trends
-    analytics_data = []
-    total_calories = 0
-    total_protein = 0
-    total_days = 0
-    
-    for plan in plans:
-        daily_data = {
-            'date': plan.date,
-            'calories': plan.total_calories(),
-            'protein': plan.total_protein(),
-            'carbs': plan.total_carbs(),
-            'fats': plan.total_fats(),
-            'goal_met': plan.total_calories() >= (plan.goal_calories * 0.8),
-            'progress': plan.progress_percentage()
-        }
-        analytics_data.append(daily_data)
-        
-        total_calories += daily_data['calories']
-        total_protein += daily_data['protein']
-        total_days += 1
-    
-    # Summary statistics
-    summary_stats = {
-        'avg_calories': round(total_calories / total_days) if total_days > 0 else 0,
-        'avg_protein': round(total_protein / total_days, 1) if total_days > 0 else 0,
-        'days_logged': total_days,
-        'goal_success_rate': len([d for d in analytics_data if d['goal_met']]) / total_days * 100 if total_days > 0 else 0,
-        'best_day': max(analytics_data, key=lambda x: x['calories']) if analytics_data else None,
-        'consistency_score': len([d for d in analytics_data if d['progress'] > 80]) / total_days * 100 if total_days > 0 else 0
-    }
-    
-    context = {
-        'analytics_data': analytics_data,
-        'summary_stats': summary_stats,
+def analytics_context(report, start_date, end_date, granularity):
+    analytics_data = report['analytics_data']
+    return {
+        **report,
+        'start_date': start_date,
+        'end_date': end_date,
+        'granularity': granularity,
         'date_range': f"{start_date.strftime('%b %d')} - {end_date.strftime('%b %d, %Y')}",
         'chart_data': [{'date': d['date'].isoformat(), 'calories': d['calories']} for d in analytics_data]
     }
+
+@login_required
+def nutrition_analytics(request):
+    """Nutrition analytics for ?start=&end=&granularity= (defaults to the last 30 days)"""
+    start_date, end_date, granularity = analytics.parse_params(request.GET)
+    report = analytics.build_report(request.user, start_date, end_date, granularity)
+    context = analytics_context(report, start_date, end_date, granularity)
     return render(request, 'nutrition/analytics.html', context)
 
 @login_required
@@ -595,33 +657,80 @@ def quick_add_food(request, food_id):
 def copy_day(request, date_str):
     # Convert the date string (YYYY-MM-DD) to a datetime object
     try:
-        date = datetime.strptime(date_str, "%Y-%m-%d").date()
+        source_date = datetime.strptime(date_str, "%Y-%m-%d").date()
     except ValueError:
         messages.error(request, "Invalid date format.")
         return redirect("nutrition:weekly_view")
 
     # Find the meal plan for that day
-    meal_plan = MealPlan.objects.filter(user=request.user, date=date).first()
+    meal_plan = MealPlan.objects.filter(user=request.user, date=source_date).first()
     if not meal_plan:
         messages.error(request, "No meal plan found for that date to copy.")
         return redirect("nutrition:weekly_view")
 
-    # Create a new meal plan for the next day
-    next_day = date + timedelta(days=1)
-    copied_plan, created = MealPlan.objects.get_or_create(
-        user=request.user,
-        date=next_day,
+    # Copy all meal entries to the next day, or the next ?days=N days
+    try:
+        days = min(max(int(request.GET.get('days', 1)), 1), MAX_REPEAT_DAYS)
+    except ValueError:
+        days = 1
+    target_dates = following_days(source_date, days)
+    copied = clone_entries(
+        meal_plan.mealentry_set.all(), request.user, target_dates,
+        plan_defaults={'goal_calories': meal_plan.goal_calories},
     )
 
-    # Copy all meal entries from the selected day to the next day
-    for entry in meal_plan.meal_entries.all():
-        entry.pk = None  # Clone the entry
-        entry.meal_plan = copied_plan
-        entry.save()
-
-    messages.success(request, f"Copied meal plan from {date} to {next_day}.")
+    if days == 1:
+        messages.success(request, f"Copied meal plan from {source_date} to {target_dates[0]} ({copied} items).")
+    else:
+        messages.success(request, f"Repeated meal plan from {source_date} for the next {days} days ({copied} items).")
     return redirect("nutrition:weekly_view")
 
+@login_required
+def meal_history(request):
+    """Every logged day, newest first, read from the rollups a cursor page at a time."""
+    days = DailyNutritionRollup.objects.filter(user=request.user)
+    page = paginate(days, ['-date'], request.GET.get('cursor'), count='approximate')
+    return render(request, 'nutrition/meal_history.html', {'days': page, 'total_days': page.count})
+
+@login_required
+def week_templates(request):
+    templates = WeekTemplate.objects.filter(user=request.user).annotate(entry_count=Count('entries'))
+    context = {
+        'templates': templates,
+        'apply_form': ApplyWeekTemplateForm(initial={'start': date.today() + timedelta(days=7 - date.today().weekday())}),
+    }
+    return render(request, 'nutrition/week_templates.html', context)
+
+@login_required
+def create_week_template(request):
+    if request.method != 'POST':
+        return redirect('nutrition:week_templates')
+    form = WeekTemplateForm(request.POST)
+    if not form.is_valid():
+        messages.error(request, "Please give the template a name.")
+        return redirect('nutrition:weekly_view')
+    week_start = form.cleaned_data['week']
+    template = save_week_template(request.user, week_start, form.cleaned_data['name'])
+    messages.success(request, f'Saved the week of {week_start} as "{template.name}".')
+    return redirect('nutrition:week_templates')
+
+@login_required
+def apply_template(request, template_id):
+    template = get_object_or_404(WeekTemplate, id=template_id, user=request.user)
+    if request.method != 'POST':
+        return redirect('nutrition:week_templates')
+    form = ApplyWeekTemplateForm(request.POST)
+    if not form.is_valid():
+        messages.error(request, "Please choose a start date and between 1 and "
+                                f"{form.fields['weeks'].max_value} weeks.")
+        return redirect('nutrition:week_templates')
+    first_week = form.cleaned_data['start']
+    weeks = form.cleaned_data['weeks']
+    added = apply_week_template(template, first_week, weeks, form.cleaned_data['policy'])
+    messages.success(request, f'Applied "{template.name}" to {weeks} week{"s" if weeks > 1 else ""} '
+                              f'from {first_week} ({added} items added).')
+    return redirect(f"{reverse('nutrition:weekly_view')}?week={first_week}")
+
 def about_developer(request):
     """About the developer page"""
     context = {
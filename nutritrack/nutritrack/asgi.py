@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nutritrack.settings')
+# serve the async versions of the dashboard, weekly and analytics pages (nutrition/async_views.py)
+os.environ.setdefault('NUTRITION_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # full-text / trigram food search
     'nutrition',
 ]
 
@@ -48,6 +49,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'nutrition.middleware.RequestMetricsMiddleware',  # Server-Timing + query counts
 ]
 
 ROOT_URLCONF = 'nutritrack.urls'
@@ -134,3 +136,56 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Cache (dashboard data, see nutrition/cache.py)
+# CACHE_BACKEND=locmem (per process, the default with DEBUG), file (the default
+# otherwise, shared by the workers of one host) or redis; CACHE_LOCATION is the
+# directory for file and the URL for redis (needs the `redis` package)
+
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'nutritrack'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', os.path.join(BASE_DIR, 'cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+}
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem' if DEBUG else 'file')
+_cache_backend, _cache_location = CACHE_BACKENDS[CACHE_BACKEND]
+CACHES = {
+    'default': {
+        'BACKEND': _cache_backend,
+        'LOCATION': os.environ.get('CACHE_LOCATION', _cache_location),
+    }
+}
+# a locmem write only bumps the generation in its own worker, so there cached
+# pages just get a short lifetime as a backstop (like AUTOCOMPLETE_TTL)
+NUTRITION_CACHE_TIMEOUT = 30 if CACHE_BACKEND == 'locmem' else 60 * 15
+
+# Food edits (nutrition/propagation.py): propagated on commit when at most this many
+# entries and ingredients use the food, otherwise by the scheduled propagate_food_changes
+
+FOOD_CHANGE_INLINE_LIMIT = 1000
+
+# Async dashboard, weekly and analytics views (nutrition/async_views.py); asgi.py turns them on
+
+NUTRITION_ASYNC_VIEWS = os.environ.get('NUTRITION_ASYNC_VIEWS') == '1'
+
+# Per-request performance metrics (nutrition/middleware.py)
+# a WARNING for likely N+1 queries, plus one INFO line per request with PERFORMANCE_LOG_LEVEL=INFO
+
+N_PLUS_ONE_THRESHOLD = 5  # same SQL this many times with different params
+SERVER_TIMING_HEADER = True
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'nutrition.performance': {
+            'handlers': ['console'],
+            'level': os.environ.get('PERFORMANCE_LOG_LEVEL', 'WARNING'),  # INFO for every request
+            'propagate': False,
+        },
+    },
+}
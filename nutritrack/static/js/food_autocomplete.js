@@ -0,0 +1,113 @@
+// Food autocomplete for FoodAutocompleteWidget
+// Listeners are delegated from the document so cloned recipe ingredient forms work too.
+(function() {
+    let debounceTimer;
+    let lastRequest = 0;
+
+    function widgetFor(element) {
+        return element.closest('.food-autocomplete');
+    }
+
+    function hideResults(widget) {
+        const list = widget.querySelector('.food-autocomplete-results');
+        list.innerHTML = '';
+        list.hidden = true;
+    }
+
+    function selectFood(widget, food) {
+        const hidden = widget.querySelector('input[type="hidden"]');
+        hidden.value = food.id;
+        hidden.dataset.calories = food.calories;
+        hidden.dataset.protein = food.protein;
+        hidden.dataset.carbs = food.carbs;
+        hidden.dataset.fats = food.fats;
+        hidden.dataset.density = food.density || '';
+        hidden.dataset.gramsPerPiece = food.grams_per_piece || '';
+        hidden.dataset.gramsPerServing = food.grams_per_serving || '';
+        hidden.dataset.portions = JSON.stringify(food.portions || {});
+        widget.querySelector('.food-autocomplete-input').value = food.name;
+        hideResults(widget);
+        // let the nutrition previews recalculate
+        hidden.dispatchEvent(new Event('change', { bubbles: true }));
+    }
+
+    function showResults(widget, results) {
+        const list = widget.querySelector('.food-autocomplete-results');
+        list.innerHTML = '';
+        results.forEach(food => {
+            const item = document.createElement('li');
+            item.textContent = food.name + ' (' + food.calories + ' cal/100g)';
+            item.addEventListener('mousedown', function(e) {
+                e.preventDefault();
+                selectFood(widget, food);
+            });
+            list.appendChild(item);
+        });
+        list.hidden = results.length === 0;
+    }
+
+    function lookup(widget, query) {
+        const requestId = ++lastRequest;
+        const url = widget.dataset.autocompleteUrl + '?q=' + encodeURIComponent(query);
+        fetch(url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+            .then(response => response.json())
+            .then(data => {
+                // ignore answers to queries the user has already typed past
+                if (requestId === lastRequest) {
+                    showResults(widget, data.results);
+                }
+            })
+            .catch(() => hideResults(widget));
+    }
+
+    document.addEventListener('input', function(e) {
+        if (!e.target.classList.contains('food-autocomplete-input')) return;
+        const widget = widgetFor(e.target);
+        const hidden = widget.querySelector('input[type="hidden"]');
+        // typing invalidates the previous choice until a suggestion is picked
+        if (hidden.value) {
+            hidden.value = '';
+            hidden.dispatchEvent(new Event('change', { bubbles: true }));
+        }
+
+        const query = e.target.value.trim();
+        clearTimeout(debounceTimer);
+        if (!query) {
+            hideResults(widget);
+            return;
+        }
+        debounceTimer = setTimeout(() => lookup(widget, query), 150);
+    });
+
+    document.addEventListener('focusout', function(e) {
+        if (e.target.classList.contains('food-autocomplete-input')) {
+            hideResults(widgetFor(e.target));
+        }
+    });
+
+    document.addEventListener('keydown', function(e) {
+        if (!e.target.classList.contains('food-autocomplete-input') || e.key !== 'Enter') return;
+        const first = widgetFor(e.target).querySelector('.food-autocomplete-results li');
+        if (first) {
+            // pick the top suggestion instead of submitting the form
+            e.preventDefault();
+            first.dispatchEvent(new MouseEvent('mousedown'));
+        }
+    });
+
+    // Multiplier for the per-100g nutrition of the food chosen in `hidden`,
+    // the same conversion as nutrition/units.py (volume table comes from the widget)
+    function scaleFactor(hidden, quantity, unit) {
+        const mlPerUnit = JSON.parse(widgetFor(hidden).dataset.mlPerUnit || '{}');
+        const portions = JSON.parse(hidden.dataset.portions || '{}');
+        let grams = 1;
+        if (unit === 'g') grams = 1;
+        else if (unit in portions) grams = portions[unit];
+        else if (unit in mlPerUnit) grams = mlPerUnit[unit] * (parseFloat(hidden.dataset.density) || 1);
+        else if (unit === 'piece') grams = parseFloat(hidden.dataset.gramsPerPiece) || 100;
+        else if (unit === 'serving') grams = parseFloat(hidden.dataset.gramsPerServing) || 100;
+        return quantity * grams / 100;
+    }
+
+    window.FoodAutocomplete = { selectFood: selectFood, scaleFactor: scaleFactor };
+})();
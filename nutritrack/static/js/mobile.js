@@ -232,6 +232,51 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    // Infinite scroll for paged lists (MOBILE ONLY)
+    // Lists marked data-infinite-scroll load the page behind their [data-next-page]
+    // link when the pagination bar scrolls into view, and append its items.
+    if (isMobileDevice() && 'IntersectionObserver' in window) {
+        document.querySelectorAll('[data-infinite-scroll]').forEach(list => {
+            let pagination = document.querySelector('[data-pagination]');
+            let loading = false;
+            if (!list.id || !pagination) return;
+
+            const observer = new IntersectionObserver(function(entries) {
+                const nextLink = pagination && pagination.querySelector('[data-next-page]');
+                if (!entries[0].isIntersecting || loading || !nextLink) return;
+                loading = true;
+                nextLink.textContent = 'Loading...';
+
+                fetch(nextLink.href, { credentials: 'same-origin' })
+                    .then(response => response.text())
+                    .then(html => {
+                        const page = new DOMParser().parseFromString(html, 'text/html');
+                        const nextList = page.getElementById(list.id);
+                        if (nextList) {
+                            Array.from(nextList.children).forEach(item => list.appendChild(item));
+                        }
+                        const nextPagination = page.querySelector('[data-pagination]');
+                        observer.unobserve(pagination);
+                        if (nextPagination && nextPagination.querySelector('[data-next-page]')) {
+                            pagination.replaceWith(nextPagination);
+                            pagination = nextPagination;
+                            observer.observe(pagination);
+                        } else {
+                            pagination.remove();
+                            pagination = null;
+                        }
+                    })
+                    .catch(() => {
+                        // leave the link for a normal page load
+                        nextLink.textContent = 'Next »';
+                    })
+                    .finally(() => { loading = false; });
+            }, { rootMargin: '200px' });
+
+            observer.observe(pagination);
+        });
+    }
+
     // Offline detection (works on all devices)
     const offlineIndicator = document.createElement('div');
     offlineIndicator.className = 'offline-indicator';